@@ -0,0 +1,133 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+from sqlmodel import Session, select
+
+from models import AnalysisCacheEntry
+
+# Cache configuration (override via environment)
+CACHE_DIR = os.getenv("ANALYSIS_CACHE_DIR", "analysis_cache")
+CACHE_TTL_HOURS = int(os.getenv("ANALYSIS_CACHE_TTL_HOURS", "168"))
+CACHE_MAX_ENTRIES = int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", "500"))
+
+# In-process counters, exposed through /api/cache/stats
+_stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+
+def hash_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def normalize_job_description(text: str) -> str:
+    """Collapse whitespace so re-pasted JDs map to the same key."""
+    return re.sub(r'\s+', ' ', text or "").strip()
+
+
+def make_cache_key(resume_digest: str, job_description: str, prompt_version: str, model: str) -> str:
+    """
+    Content-addressed key for an analysis.
+    Any change to the resume bytes, the JD text, the prompt or the model yields a new key.
+    """
+    hasher = hashlib.sha256()
+    for part in (resume_digest, normalize_job_description(job_description), prompt_version, model):
+        hasher.update(part.encode("utf-8"))
+        hasher.update(b"\x00")
+    return hasher.hexdigest()
+
+
+def _is_expired(entry: AnalysisCacheEntry, now: datetime) -> bool:
+    return entry.created_at < now - timedelta(hours=CACHE_TTL_HOURS)
+
+
+def _remove_entry(session: Session, entry: AnalysisCacheEntry):
+    if entry.docx_path and os.path.exists(entry.docx_path):
+        try:
+            os.remove(entry.docx_path)
+        except OSError:
+            pass
+    session.delete(entry)
+    _stats["evictions"] += 1
+
+
+def get_cached_analysis(session: Session, cache_key: str) -> Optional[Tuple[Dict, str]]:
+    """
+    Returns (analysis_result, cached_docx_path) on a hit, None on a miss.
+    Expired entries and entries whose DOCX has disappeared count as misses.
+    """
+    entry = session.get(AnalysisCacheEntry, cache_key)
+    now = datetime.now()
+
+    if entry is None:
+        _stats["misses"] += 1
+        return None
+
+    if _is_expired(entry, now) or not os.path.exists(entry.docx_path):
+        _remove_entry(session, entry)
+        session.commit()
+        _stats["misses"] += 1
+        return None
+
+    entry.last_accessed_at = now
+    entry.hit_count += 1
+    session.add(entry)
+    session.commit()
+
+    _stats["hits"] += 1
+    return json.loads(entry.result_json), entry.docx_path
+
+
+def store_analysis(session: Session, cache_key: str, result: Dict, docx_path: str):
+    """Persist an analysis result together with a copy of its converted DOCX."""
+    # Don't cache failed/empty analyses, the next attempt should hit the LLM again
+    if not result.get("sections"):
+        return
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    cached_docx = os.path.join(CACHE_DIR, f"{cache_key}.docx")
+    shutil.copy2(docx_path, cached_docx)
+
+    entry = session.get(AnalysisCacheEntry, cache_key)
+    now = datetime.now()
+    if entry is None:
+        entry = AnalysisCacheEntry(cache_key=cache_key, result_json="", docx_path=cached_docx)
+    entry.result_json = json.dumps(result)
+    entry.docx_path = cached_docx
+    entry.created_at = now
+    entry.last_accessed_at = now
+    session.add(entry)
+    session.commit()
+    _stats["stores"] += 1
+
+    evict(session)
+
+
+def evict(session: Session):
+    """Drop expired entries, then the least recently used ones above CACHE_MAX_ENTRIES."""
+    now = datetime.now()
+    cutoff = now - timedelta(hours=CACHE_TTL_HOURS)
+
+    for entry in session.exec(select(AnalysisCacheEntry).where(AnalysisCacheEntry.created_at < cutoff)).all():
+        _remove_entry(session, entry)
+    session.commit()
+
+    entries = session.exec(
+        select(AnalysisCacheEntry).order_by(AnalysisCacheEntry.last_accessed_at.desc())
+    ).all()
+    for entry in entries[CACHE_MAX_ENTRIES:]:
+        _remove_entry(session, entry)
+    session.commit()
+
+
+def cache_stats() -> Dict:
+    lookups = _stats["hits"] + _stats["misses"]
+    return {
+        **_stats,
+        "hit_rate": round(_stats["hits"] / lookups, 3) if lookups else 0.0,
+        "ttl_hours": CACHE_TTL_HOURS,
+        "max_entries": CACHE_MAX_ENTRIES,
+    }
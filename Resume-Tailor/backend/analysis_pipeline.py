@@ -0,0 +1,68 @@
+import shutil
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from sqlmodel import Session
+
+from analysis_cache import make_cache_key, get_cached_analysis, store_analysis
+from conversion import convert_pdf_to_docx
+from scratch import scratch, with_ext
+from tailor import analyze_gaps_async, ANALYSIS_MODELS, ANALYSIS_CACHE_VERSION
+from workers import run_io
+
+StageCallback = Optional[Callable[[str], Awaitable[None]]]
+
+
+async def run_analysis(
+    session: Session,
+    pdf_path: str,
+    resume_digest: str,
+    job_description: str,
+    on_stage: StageCallback = None,
+) -> Tuple[Dict, str]:
+    """
+    Cache lookup -> PDF to DOCX -> gap analysis -> scoring.
+    Shared by the synchronous /analyze endpoint and the background job workers.
+    Returns (analysis_result, docx_path). on_stage is awaited with
+    "converted", "analyzed" and "scored" as the pipeline progresses.
+    """
+    async def notify(stage: str):
+        if on_stage:
+            await on_stage(stage)
+
+    # Same resume + same JD (+ same prompt/model) -> reuse the stored analysis and DOCX
+    cache_key = make_cache_key(resume_digest, job_description, ANALYSIS_CACHE_VERSION, ANALYSIS_MODELS)
+    cached = await run_io(get_cached_analysis, session, cache_key)
+
+    if cached:
+        analysis_result, cached_docx_path = cached
+        docx_path = with_ext(pdf_path, ".docx")
+        await run_io(shutil.copy2, cached_docx_path, docx_path)
+        await notify("scored")
+        return analysis_result, docx_path
+
+    # 1. Convert PDF to customizable format (DOCX)
+    docx_path, _ = await convert_pdf_to_docx(pdf_path)
+    await notify("converted")
+
+    # 2. Analyze gaps and score using LLM
+    analysis_result = await analyze_gaps_async(docx_path, job_description, pdf_path=pdf_path, on_progress=notify)
+    await run_io(store_analysis, session, cache_key, analysis_result, docx_path)
+    await notify("scored")
+
+    return analysis_result, docx_path
+
+
+def analysis_response(analysis_result: Dict, pdf_path: str, docx_path: str) -> Dict:
+    # We return the filename (with session ID) so the frontend can send it back for the next step
+    return {
+        "message": "Analysis complete",
+        "sections": analysis_result.get("sections", []),
+        "initial_score": analysis_result.get("initial_score", 0),
+        "projected_score": analysis_result.get("projected_score", 0),
+        "score_breakdown": analysis_result.get("score_breakdown", []),
+        "company_name": analysis_result.get("company_name", "Unknown Company"),
+        "job_title": analysis_result.get("job_title", "Unknown Role"),
+        "token_usage": analysis_result.get("token_usage", {}),
+        "filename": scratch.handle_for(pdf_path), # Scratch handle, sent back by /generate and /api/resume/save
+        "temp_docx_path": docx_path
+    }
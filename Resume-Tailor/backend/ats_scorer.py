@@ -0,0 +1,281 @@
+"""
+Local ATS keyword scorer.
+
+Scores how well a resume covers a job description without an LLM call, so initial_score and
+projected_score are deterministic and take milliseconds. Keywords come from the posting:
+skills found through a synonym dictionary ("k8s" and "Kubernetes" are the same keyword),
+salient single terms and two-word phrases the posting repeats. Boilerplate sentences (benefits,
+equal opportunity) are ignored. Each keyword is weighted TF-IDF style: log-scaled frequency in
+the posting, boosted for skills and requirement sentences, with generic posting vocabulary
+("team", "experience") down-weighted in place of a corpus IDF.
+
+The resume is matched with BM25 term saturation, so a second mention of a keyword is worth
+less than the first. The projected score applies the proposed edits to the text in memory
+(replace/append, as apply_edits_to_document does) and scores again. Texts are reduced to
+arrays of keyword ids and counted with np.bincount, so scoring is a few vector operations.
+"""
+import math
+import re
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from prompt_budget import BOILERPLATE_CUES, REQUIREMENT_CUES, split_sentences
+
+# Bump when the dictionary or weighting changes, it is part of the analysis cache key
+SCORER_VERSION = "1"
+
+MAX_KEYWORDS = 40
+SKILL_BOOST = 2.0
+REQUIREMENT_BOOST = 1.5
+GENERIC_WEIGHT = 0.25
+# BM25 saturation and length normalization against a typical resume
+BM25_K1 = 0.5
+BM25_B = 0.25
+AVG_RESUME_TERMS = 400
+
+# Canonical skill -> other ways postings and resumes write it
+SKILL_SYNONYMS: Dict[str, Tuple[str, ...]] = {
+    "javascript": ("js", "ecmascript", "es6"),
+    "typescript": ("ts",),
+    "python": ("python3",),
+    "golang": ("go lang",),
+    "c++": ("cpp",),
+    "c#": ("csharp", "c sharp"),
+    "node.js": ("node", "nodejs", "node js"),
+    "react": ("react.js", "reactjs", "react js"),
+    "next.js": ("nextjs", "next js"),
+    "vue": ("vue.js", "vuejs"),
+    "angular": ("angularjs", "angular.js"),
+    "django": (),
+    "flask": (),
+    "fastapi": ("fast api",),
+    "spring": ("spring boot", "springboot"),
+    ".net": ("dotnet", "asp.net"),
+    "sql": (),
+    "postgresql": ("postgres", "psql"),
+    "mysql": (),
+    "mongodb": ("mongo",),
+    "redis": (),
+    "elasticsearch": ("elastic search", "opensearch"),
+    "kafka": ("apache kafka",),
+    "spark": ("apache spark", "pyspark"),
+    "airflow": ("apache airflow",),
+    "docker": (),
+    "kubernetes": ("k8s",),
+    "terraform": (),
+    "ansible": (),
+    "aws": ("amazon web services",),
+    "gcp": ("google cloud", "google cloud platform"),
+    "azure": ("microsoft azure",),
+    "ci/cd": ("cicd", "ci cd", "continuous integration", "continuous delivery", "continuous deployment"),
+    "git": ("github", "gitlab"),
+    "linux": ("unix",),
+    "rest api": ("restful", "rest apis", "restful apis", "restful api"),
+    "graphql": (),
+    "grpc": (),
+    "microservices": ("microservice", "micro services"),
+    "distributed systems": ("distributed system",),
+    "machine learning": ("ml",),
+    "deep learning": (),
+    "artificial intelligence": ("ai",),
+    "natural language processing": ("nlp",),
+    "large language models": ("llm", "llms", "large language model"),
+    "computer vision": (),
+    "pytorch": ("torch",),
+    "tensorflow": (),
+    "scikit-learn": ("sklearn", "scikit learn"),
+    "pandas": (),
+    "numpy": (),
+    "data analysis": ("data analytics",),
+    "data engineering": ("data pipelines", "etl", "elt"),
+    "tableau": (),
+    "power bi": ("powerbi",),
+    "excel": ("microsoft excel", "ms excel"),
+    "agile": ("scrum", "kanban"),
+    "project management": ("program management",),
+    "product management": (),
+    "stakeholder management": (),
+    "figma": (),
+    "ux": ("user experience", "ux design"),
+    "ui": ("user interface", "ui design"),
+    "seo": ("search engine optimization",),
+    "salesforce": ("sfdc",),
+    "java": (),
+    "kotlin": (),
+    "swift": (),
+    "rust": (),
+    "ruby": ("ruby on rails", "rails"),
+    "php": ("laravel",),
+    "html": ("html5",),
+    "css": ("css3", "sass", "scss"),
+    "tailwind": ("tailwindcss", "tailwind css"),
+}
+
+STOPWORDS = set("""
+a an and are as at be been but by can could do does for from has have having he her his how i if in
+into is it its just may me might more most much must my no not of on or our ours out over per shall
+she should so some such than that the their them then there these they this those through to too
+own under up us very was we were what when where which while who whom why will with within would you
+your yours also etc e.g i.e including include includes plus well both each other any all able
+""".split())
+
+# Words every posting uses: still keywords, at a quarter of the weight
+GENERIC_TERMS = set("""
+experience experienced years year team teams work working strong ability skills skill knowledge
+understanding excellent good great role company candidate candidates responsibilities requirements
+required preferred requirement environment new using use build building develop developing
+development ensure help join looking opportunity support within across related relevant work-life
+communication collaborate collaboration passionate proven track record solid deep degree bachelor
+time level senior junior lead manage management business best practices high quality
+""".split())
+
+_TERM = re.compile(r"[a-z][a-z0-9+#_]*(?:[./\-][a-z0-9+#_]+)*")
+
+_ALIASES: Dict[str, str] = {}
+for _canonical, _variants in SKILL_SYNONYMS.items():
+    for _alias in (_canonical,) + _variants:
+        _ALIASES[_alias] = _canonical.replace(" ", "_")
+# Multi-word aliases are rewritten to one token before tokenizing, longest first
+_PHRASES = re.compile(
+    r"(?<![a-z0-9])(" + "|".join(re.escape(a) for a in sorted((a for a in _ALIASES if " " in a), key=len, reverse=True)) + r")(?![a-z0-9])"
+)
+SKILLS = set(_ALIASES.values())
+
+_stats = {"scored": 0, "total_ms": 0.0}
+
+
+def terms(text: str) -> List[str]:
+    """Lowercased terms with skill aliases mapped to their canonical token."""
+    lowered = _PHRASES.sub(lambda m: _ALIASES[m.group(1)], (text or "").lower())
+    result = []
+    for token in _TERM.findall(lowered):
+        if token in _ALIASES:
+            result.append(_ALIASES[token])
+            continue
+        # "python/django", unless the slash is part of a skill ("ci/cd")
+        for part in token.split("/"):
+            if part in _ALIASES:
+                result.append(_ALIASES[part])
+            elif part and part not in STOPWORDS and len(part) > 1:
+                result.append(part)
+    return result
+
+
+def _with_bigrams(tokens: List[str]) -> List[str]:
+    return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+
+def extract_keywords(job_description: str) -> Dict[str, float]:
+    """Keyword -> weight for the posting, at most MAX_KEYWORDS, heaviest first."""
+    counts: Dict[str, int] = {}
+    required = set()
+    for sentence in split_sentences(job_description):
+        lowered = sentence.lower()
+        if any(cue in lowered for cue in BOILERPLATE_CUES):
+            continue
+        tokens = terms(sentence)
+        is_requirement = any(cue in lowered for cue in REQUIREMENT_CUES)
+        for term in tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])
+                              if a not in SKILLS and b not in SKILLS and a not in GENERIC_TERMS and b not in GENERIC_TERMS]:
+            counts[term] = counts.get(term, 0) + 1
+            if is_requirement:
+                required.add(term)
+
+    weights = {}
+    for term, count in counts.items():
+        # Phrases only count when the posting repeats them
+        if " " in term and count < 2:
+            continue
+        weight = 1 + math.log(count)
+        if term in SKILLS:
+            weight *= SKILL_BOOST
+        elif term in GENERIC_TERMS:
+            weight *= GENERIC_WEIGHT
+        if term in required:
+            weight *= REQUIREMENT_BOOST
+        weights[term] = weight
+    top = sorted(weights.items(), key=lambda item: (-item[1], item[0]))[:MAX_KEYWORDS]
+    return dict(top)
+
+
+def apply_edits_to_text(text: str, edits: List) -> str:
+    """The resume text as it reads after the edits, mirroring apply_edits_to_document."""
+    for edit in edits:
+        if isinstance(edit, dict):
+            action, target, content = edit.get("action"), edit.get("target_text"), edit.get("new_content")
+        else:
+            action, target, content = edit.action, edit.target_text, edit.new_content
+        if not target or not content or target not in text:
+            continue
+        if action == "replace":
+            text = text.replace(target, content)
+        elif action == "append":
+            text = text.replace(target, f"{target} {content}")
+    return text
+
+
+def _term_counts(text: str, vocabulary: Dict[str, int]) -> Tuple[np.ndarray, int]:
+    tokens = terms(text)
+    ids = np.fromiter((vocabulary[t] for t in _with_bigrams(tokens) if t in vocabulary), dtype=np.intp)
+    return np.bincount(ids, minlength=len(vocabulary)), len(tokens)
+
+
+def _coverage(counts: np.ndarray, length: int, weights: np.ndarray) -> float:
+    """Weighted BM25 saturation of each keyword, 0-100."""
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * length / AVG_RESUME_TERMS)
+    saturation = counts * (BM25_K1 + 1) / (counts + norm) / (BM25_K1 + 1)
+    return float(100 * weights @ saturation / weights.sum())
+
+
+def _display(term: str) -> str:
+    return term.replace("_", " ")
+
+
+def score_resume(resume_text: str, job_description: str, edits: List = ()) -> Dict:
+    """
+    initial_score for the resume, projected_score once `edits` are applied, a short
+    reasoning and the per-keyword breakdown (heaviest keywords first).
+    """
+    started = time.perf_counter()
+    keywords = extract_keywords(job_description)
+    if not keywords:
+        return {"initial_score": 0, "projected_score": 0, "reasoning": "No keywords found in the job description.", "keywords": []}
+
+    vocabulary = {term: index for index, term in enumerate(keywords)}
+    weights = np.fromiter(keywords.values(), dtype=float)
+    before, before_length = _term_counts(resume_text, vocabulary)
+    after, after_length = _term_counts(apply_edits_to_text(resume_text, list(edits)), vocabulary)
+
+    initial = round(_coverage(before, before_length, weights))
+    # Edits that only add length shouldn't lower the projection
+    projected = max(initial, round(_coverage(after, after_length, weights)))
+
+    breakdown = [
+        {
+            "keyword": _display(term),
+            "weight": round(float(weight), 2),
+            "skill": term in SKILLS,
+            "resume_count": int(before[index]),
+            "projected_count": int(after[index]),
+        }
+        for index, (term, weight) in enumerate(keywords.items())
+    ]
+    missing = [k["keyword"] for k in breakdown if not k["projected_count"]]
+    added = [k["keyword"] for k in breakdown if k["projected_count"] and not k["resume_count"]]
+    matched = sum(1 for k in breakdown if k["resume_count"])
+    reasoning = f"Resume matches {matched} of {len(breakdown)} key job description terms."
+    if added:
+        reasoning += f" Proposed edits add: {', '.join(added[:5])}."
+    if missing:
+        reasoning += f" Still missing: {', '.join(missing[:5])}."
+
+    _stats["scored"] += 1
+    _stats["total_ms"] += (time.perf_counter() - started) * 1000
+    return {"initial_score": initial, "projected_score": projected, "reasoning": reasoning, "keywords": breakdown}
+
+
+def scorer_stats() -> Dict:
+    scored = _stats["scored"]
+    return {"scored": scored, "avg_ms": round(_stats["total_ms"] / scored, 2) if scored else 0}
@@ -0,0 +1,83 @@
+"""
+In-process cache of authenticated identities, keyed by bearer token.
+
+A token seen before skips both the JWT signature check and the user lookup. Entries live
+until the token's own `exp` or IDENTITY_CACHE_TTL_SECONDS, whichever comes first, so a
+deleted or deactivated account loses access within that TTL; the least recently used
+entries are evicted beyond IDENTITY_CACHE_SIZE. Only IDENTITY_FIELDS are kept, never the
+password hash or anything else from the user row.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+IDENTITY_CACHE_SIZE = int(os.getenv("IDENTITY_CACHE_SIZE", "10000"))
+IDENTITY_CACHE_TTL_SECONDS = float(os.getenv("IDENTITY_CACHE_TTL_SECONDS", "300"))
+
+# What request handlers read from the authenticated user
+IDENTITY_FIELDS = ("id", "email")
+
+
+def identity_of(user) -> Dict:
+    return {field: getattr(user, field) for field in IDENTITY_FIELDS}
+
+
+class IdentityCache:
+    def __init__(self, max_entries: int = IDENTITY_CACHE_SIZE, ttl_seconds: float = IDENTITY_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict() # token -> (expires_at, identity)
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0}
+
+    def get(self, token: str) -> Optional[Dict]:
+        if self.max_entries <= 0:
+            return None
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                self._counters["misses"] += 1
+                return None
+            expires_at, identity = entry
+            if expires_at <= now:
+                del self._entries[token]
+                self._counters["expired"] += 1
+                self._counters["misses"] += 1
+                return None
+            self._entries.move_to_end(token)
+            self._counters["hits"] += 1
+            return identity
+
+    def put(self, token: str, identity: Dict, token_expires_at: Optional[float]):
+        """Cache a verified identity; token_expires_at is the JWT `exp` as a unix timestamp."""
+        if self.max_entries <= 0:
+            return
+        expires_at = time.time() + self.ttl_seconds
+        if token_expires_at is not None:
+            expires_at = min(expires_at, token_expires_at)
+        with self._lock:
+            self._entries[token] = (expires_at, identity)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                **self._counters,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hit_rate": round(self._counters["hits"] / lookups, 3) if lookups else 0.0,
+            }
+
+
+identity_cache = IdentityCache()
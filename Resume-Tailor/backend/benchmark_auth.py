@@ -0,0 +1,62 @@
+"""
+Per-request authentication overhead, with and without the identity cache.
+
+Resolves the same bearer token repeatedly the way get_current_user does, once with
+the cache disabled (JWT decode + user lookup every time) and once with it enabled.
+
+Usage:
+    python benchmark_auth.py [--requests 2000] [--users 50]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+# Point the app at a scratch database before main creates its engines
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_auth.db')}"
+
+from datetime import timedelta
+
+from sqlmodel import Session
+
+from auth_cache import identity_cache
+from database import async_session_factory, engine, init_db
+from main import create_access_token, resolve_user
+from models import User
+
+
+async def resolve_all(tokens, requests: int) -> float:
+    started = time.perf_counter()
+    async with async_session_factory() as session:
+        for i in range(requests):
+            user = await resolve_user(tokens[i % len(tokens)], session)
+            assert user is not None
+    return time.perf_counter() - started
+
+
+def main(requests: int, users: int):
+    init_db()
+    with Session(engine) as session:
+        for i in range(users):
+            session.add(User(email=f"bench{i}@example.com", hashed_password="x"))
+        session.commit()
+    tokens = [create_access_token({"sub": f"bench{i}@example.com"}, timedelta(minutes=30)) for i in range(users)]
+
+    max_entries = identity_cache.max_entries
+    identity_cache.max_entries = 0
+    uncached = asyncio.run(resolve_all(tokens, requests))
+    identity_cache.max_entries = max_entries
+    cached = asyncio.run(resolve_all(tokens, requests))
+
+    for label, seconds in (("no cache", uncached), ("cache", cached)):
+        print(f"{label:>9}: {seconds / requests * 1e6:8.1f} us per request ({requests / seconds:8.0f} req/s)")
+    print(f"speedup: {uncached / cached:.1f}x, cache stats: {identity_cache.stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark per-request auth overhead.")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--users", type=int, default=50)
+    args = parser.parse_args()
+    main(args.requests, args.users)
@@ -0,0 +1,90 @@
+"""
+Write-contention benchmark for the SQLite engine profiles in database.py.
+
+Runs concurrent usage-log writers (the /analyze path) next to tracker-style readers
+against a fresh database, once with SQLite's default settings and once with the
+production profile (WAL, synchronous=NORMAL, busy timeout, mmap, pool).
+
+Usage:
+    python benchmark_db.py [--writers 8] [--readers 4] [--seconds 5]
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session, SQLModel, func, select
+
+from database import create_db_engine
+from models import Application, UsageLog, User
+
+
+def run_profile(profile: str, writers: int, readers: int, seconds: float):
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = create_db_engine(f"sqlite:///{path}", profile=profile, echo=False)
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        user = User(email="bench@example.com", hashed_password="x")
+        session.add(user)
+        session.commit()
+        for i in range(200):
+            session.add(Application(user_id=user.id, company_name=f"Company {i}", job_role="Engineer"))
+        session.commit()
+        user_id = user.id
+
+    counts = {"writes": 0, "reads": 0, "locked": 0}
+    latencies = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def writer(n: int):
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                with Session(engine) as session:
+                    session.add(UsageLog(ip_address=f"10.0.0.{n}"))
+                    session.commit()
+                with lock:
+                    counts["writes"] += 1
+                    latencies.append(time.perf_counter() - started)
+            except OperationalError:
+                with lock:
+                    counts["locked"] += 1
+
+    def reader():
+        while time.perf_counter() < deadline:
+            try:
+                with Session(engine) as session:
+                    session.exec(select(Application).where(Application.user_id == user_id)).all()
+                    session.exec(select(func.count()).select_from(UsageLog)).one()
+                with lock:
+                    counts["reads"] += 1
+            except OperationalError:
+                with lock:
+                    counts["locked"] += 1
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    threads += [threading.Thread(target=reader) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95)] * 1000 if latencies else 0.0
+    print(f"{profile:>10}: {counts['writes'] / seconds:8.0f} writes/s {counts['reads'] / seconds:8.0f} reads/s "
+          f"p95 write {p95:6.1f} ms, {counts['locked']} 'database is locked' errors")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark SQLite write contention.")
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    for profile in ("default", "production"):
+        run_profile(profile, args.writers, args.readers, args.seconds)
@@ -0,0 +1,76 @@
+"""
+Compare the streaming DOCX extractor against the python-docx one.
+
+Usage:
+    python benchmark_extraction.py [files or folders ...] [--repeat 5]
+
+Defaults to the converted resumes in saved_resumes/ and any temp_*.docx in the
+current folder. Reports per-file timings and whether both produce identical text.
+"""
+import argparse
+import glob
+import os
+import statistics
+import time
+
+from docx_extract import extract_structured_text
+from tailor import extract_text_with_python_docx
+
+
+def collect_corpus(paths):
+    if not paths:
+        paths = ["saved_resumes"] + glob.glob("temp_*.docx")
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, "*.docx"))))
+        elif path.endswith(".docx") and os.path.exists(path):
+            files.append(path)
+    return [f for f in files if not os.path.basename(f).startswith("~$")]
+
+
+def time_call(fn, path, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(path)
+        timings.append((time.perf_counter() - start) * 1000)
+    return result, statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark DOCX text extraction.")
+    parser.add_argument("paths", nargs="*")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    files = collect_corpus(args.paths)
+    if not files:
+        print("No .docx files found.")
+        return
+
+    total_old = total_new = 0.0
+    mismatches = []
+    print(f"{'file':50} {'python-docx ms':>15} {'streaming ms':>13} {'speedup':>8}")
+    for path in files:
+        old_text, old_ms = time_call(extract_text_with_python_docx, path, args.repeat)
+        new_text, new_ms = time_call(lambda p: extract_structured_text(p).text, path, args.repeat)
+        total_old += old_ms
+        total_new += new_ms
+        if old_text != new_text:
+            mismatches.append(path)
+        print(f"{os.path.basename(path)[:50]:50} {old_ms:15.1f} {new_ms:13.1f} {old_ms / max(new_ms, 1e-6):7.1f}x")
+
+    print(f"\n{len(files)} files: python-docx {total_old:.1f} ms, streaming {total_new:.1f} ms "
+          f"({total_old / max(total_new, 1e-6):.1f}x faster)")
+    if mismatches:
+        print(f"Text differs for {len(mismatches)} file(s):")
+        for path in mismatches:
+            print(f"  {path}")
+    else:
+        print("Identical text for every file.")
+
+
+if __name__ == "__main__":
+    main()
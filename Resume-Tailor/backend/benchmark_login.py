@@ -0,0 +1,91 @@
+"""
+Login load test: concurrent POST /auth/login against the app in-process.
+
+Reports login throughput and latency per concurrency level, and how late a 10 ms
+timer on the event loop fires meanwhile (should stay near zero, hashing runs in the
+hash pool). Use --rounds to compare BCRYPT_ROUNDS settings.
+
+Usage:
+    python benchmark_login.py [--logins 64] [--concurrency 1 4 16] [--rounds 12]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_login.db')}"
+
+import httpx
+from sqlmodel import Session
+
+import passwords
+from database import engine, init_db
+from models import User
+from workers import hash_pool
+
+
+async def loop_lag_monitor(stop: asyncio.Event, samples: list):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(0.01)
+        samples.append(time.perf_counter() - started - 0.01)
+
+
+async def run_level(app, users: int, logins: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, lag, failures = [], [], 0
+    stop = asyncio.Event()
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def login(i: int):
+            nonlocal failures
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.post(
+                    "/auth/login", json={"email": f"bench{i % users}@example.com", "password": "Bench-passw0rd"}
+                )
+                latencies.append(time.perf_counter() - started)
+                if response.status_code != 200:
+                    failures += 1
+
+        monitor = asyncio.create_task(loop_lag_monitor(stop, lag))
+        started = time.perf_counter()
+        await asyncio.gather(*(login(i) for i in range(logins)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await monitor
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p95 = latencies[int(len(latencies) * 0.95)] * 1000
+    print(f"concurrency {concurrency:>3}: {logins / elapsed:7.1f} logins/s, p50 {p50:7.1f} ms, p95 {p95:7.1f} ms, "
+          f"max loop lag {max(lag, default=0) * 1000:6.1f} ms, {failures} failed")
+
+
+def main(logins: int, levels, rounds: int):
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    passwords.BCRYPT_ROUNDS = rounds
+    from main import app
+
+    init_db()
+    users = 16
+    hashed = passwords.get_password_hash("Bench-passw0rd", rounds)
+    with Session(engine) as session:
+        for i in range(users):
+            session.add(User(email=f"bench{i}@example.com", hashed_password=hashed))
+        session.commit()
+
+    print(f"bcrypt rounds {rounds}, {hash_pool.max_workers} hash workers, queue limit {hash_pool.max_queue}")
+    for concurrency in levels:
+        asyncio.run(run_level(app, users, logins, concurrency))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test POST /auth/login.")
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--rounds", type=int, default=passwords.BCRYPT_ROUNDS)
+    args = parser.parse_args()
+    main(args.logins, args.concurrency, args.rounds)
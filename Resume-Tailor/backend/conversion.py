@@ -0,0 +1,85 @@
+import asyncio
+import os
+import time
+from typing import Dict, Tuple
+
+from pdf_handler import count_pdf_pages, parse_pdf_pages, build_docx_from_layouts, convert_pdf_with_timings
+from scratch import with_ext
+from workers import CPU_WORKERS, run_cpu, run_io
+
+# Documents with at least this many pages get their pages parsed in parallel
+PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "2"))
+# Upper bound on page chunks per document, so one long upload can't take the whole pool
+MAX_PAGE_CHUNKS = int(os.getenv("PDF_MAX_PAGE_CHUNKS", str(CPU_WORKERS)))
+
+STAGES = ["open_ms", "analyze_ms", "parse_pages_ms", "make_docx_ms", "sanitize_ms", "save_ms", "total_ms"]
+
+_stats = {"conversions": 0, "parallel": 0, "pages": 0, "stage_totals_ms": {stage: 0.0 for stage in STAGES}}
+
+
+def _page_chunks(page_count: int, chunks: int):
+    """Split [0, page_count) into `chunks` contiguous ranges of near equal size."""
+    size, extra = divmod(page_count, chunks)
+    start = 0
+    for i in range(chunks):
+        end = start + size + (1 if i < extra else 0)
+        yield start, end
+        start = end
+
+
+def _record(timings: Dict, page_count: int, parallel: bool):
+    _stats["conversions"] += 1
+    _stats["pages"] += page_count
+    if parallel:
+        _stats["parallel"] += 1
+    for stage in STAGES:
+        _stats["stage_totals_ms"][stage] += timings.get(stage, 0.0)
+
+
+async def convert_pdf_to_docx(pdf_path: str) -> Tuple[str, Dict]:
+    """
+    Convert an uploaded PDF in the warm CPU pool.
+    Multi-page documents are parsed as page chunks on several workers, then one
+    worker assembles, sanitizes (in memory) and saves the DOCX.
+    Returns (docx_path, timings). Timings of parallel stages are wall-clock,
+    i.e. the slowest chunk.
+    """
+    started = time.perf_counter()
+    page_count = await run_io(count_pdf_pages, pdf_path)
+    chunks = min(MAX_PAGE_CHUNKS, page_count)
+
+    if page_count < PARALLEL_MIN_PAGES or chunks < 2:
+        docx_path, timings = await run_cpu(convert_pdf_with_timings, pdf_path)
+        parallel = False
+    else:
+        docx_path = with_ext(pdf_path, ".docx")
+        parsed = await asyncio.gather(*(
+            run_cpu(parse_pdf_pages, pdf_path, start, end) for start, end in _page_chunks(page_count, chunks)
+        ))
+        layouts = [layout for layout, _ in parsed]
+        timings = {
+            stage: max(chunk_timings[stage] for _, chunk_timings in parsed)
+            for stage in ("open_ms", "analyze_ms", "parse_pages_ms")
+        }
+        timings.update(await run_cpu(build_docx_from_layouts, pdf_path, layouts, docx_path))
+        parallel = True
+
+    timings["total_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    timings["pages"] = page_count
+    timings["chunks"] = chunks if parallel else 1
+    _record(timings, page_count, parallel)
+    print(f"Converted {os.path.basename(pdf_path)}: {timings}")
+    return docx_path, timings
+
+
+def conversion_stats() -> Dict:
+    count = _stats["conversions"]
+    return {
+        "conversions": count,
+        "parallel_conversions": _stats["parallel"],
+        "pages": _stats["pages"],
+        "avg_stage_ms": {
+            stage: round(total / count, 1) if count else 0.0
+            for stage, total in _stats["stage_totals_ms"].items()
+        },
+    }
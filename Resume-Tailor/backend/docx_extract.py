@@ -0,0 +1,298 @@
+"""
+Streaming DOCX text extraction.
+
+Reads word/document.xml straight out of the zip with lxml iterparse (plus the
+referenced header and footer parts) instead of building python-docx proxies for
+every paragraph, row and cell. Produces the same text, in the same order, as the
+python-docx based extractor in tailor.py, plus a structural map of where each
+line came from so later stages don't have to walk the XML again.
+"""
+import posixpath
+import zipfile
+from typing import Dict, List, Optional, Tuple
+
+from lxml import etree
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+R_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+OFFICE_DOCUMENT_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"
+
+
+def _w(tag: str) -> str:
+    return f"{{{W_NS}}}{tag}"
+
+
+BODY, P, R, T, HYPERLINK = _w("body"), _w("p"), _w("r"), _w("t"), _w("hyperlink")
+TBL, TR, TC, TC_PR = _w("tbl"), _w("tr"), _w("tc"), _w("tcPr")
+TXBX, SECT_PR, P_PR = _w("txbxContent"), _w("sectPr"), _w("pPr")
+TAB, PTAB, BR, CR, NO_BREAK_HYPHEN = _w("tab"), _w("ptab"), _w("br"), _w("cr"), _w("noBreakHyphen")
+HEADER_REF, FOOTER_REF = _w("headerReference"), _w("footerReference")
+W_TYPE, W_VAL = _w("type"), _w("val")
+R_ID = f"{{{R_NS}}}id"
+
+
+class TextBlock:
+    """
+    One line of extracted text and where it lives.
+
+    kind is "paragraph", "cell" or "textbox". paragraphs holds the document-order
+    index of every w:p that contributed to the line, counted per part the same way
+    docx_index.build_paragraph_index walks it. Table blocks also carry the table
+    index and the row/grid column of the cell.
+    """
+
+    __slots__ = ("id", "kind", "part", "part_name", "text", "paragraphs", "table", "row", "col", "in_textbox")
+
+    def __init__(self, id: str, kind: str, part: str, part_name: str, text: str, paragraphs: List[int],
+                 table: Optional[int] = None, row: Optional[int] = None, col: Optional[int] = None):
+        self.id = id
+        self.kind = kind
+        self.part = part # body | header | footer
+        self.part_name = part_name # e.g. word/header1.xml
+        self.text = text
+        self.paragraphs = paragraphs
+        self.table = table
+        self.row = row
+        self.col = col
+        self.in_textbox = kind == "textbox"
+
+    def to_dict(self) -> Dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class ExtractedDocument:
+    """Ordered text blocks of a DOCX file."""
+
+    def __init__(self, blocks: List[TextBlock]):
+        self.blocks = blocks
+
+    @property
+    def text(self) -> str:
+        return "\n".join(block.text for block in self.blocks)
+
+    def structure(self) -> List[Dict]:
+        return [block.to_dict() for block in self.blocks]
+
+
+# --- Text of individual elements (mirrors python-docx's Paragraph.text) ---
+
+def _run_text(r) -> str:
+    parts = []
+    for child in r:
+        tag = child.tag
+        if tag == T:
+            parts.append(child.text or "")
+        elif tag == TAB or tag == PTAB:
+            parts.append("\t")
+        elif tag == BR:
+            # Only line breaks produce text, page and column breaks don't
+            if child.get(W_TYPE, "textWrapping") == "textWrapping":
+                parts.append("\n")
+        elif tag == CR:
+            parts.append("\n")
+        elif tag == NO_BREAK_HYPHEN:
+            parts.append("-")
+    return "".join(parts)
+
+
+def _paragraph_text(p) -> str:
+    parts = []
+    for child in p:
+        if child.tag == R:
+            parts.append(_run_text(child))
+        elif child.tag == HYPERLINK:
+            parts.extend(_run_text(r) for r in child if r.tag == R)
+    return "".join(parts)
+
+
+def _textbox_paragraph_text(p) -> str:
+    # Textboxes are read from direct w:r/w:t only, as the previous extractor did
+    return "".join(t.text for r in p if r.tag == R for t in r if t.tag == T and t.text)
+
+
+def _is_vmerge_continuation(tc) -> bool:
+    tc_pr = tc.find(TC_PR)
+    if tc_pr is None:
+        return False
+    v_merge = tc_pr.find(_w("vMerge"))
+    return v_merge is not None and v_merge.get(W_VAL, "continue") == "continue"
+
+
+def _grid_span(tc) -> int:
+    tc_pr = tc.find(TC_PR)
+    span = tc_pr.find(_w("gridSpan")) if tc_pr is not None else None
+    return int(span.get(W_VAL, "1")) if span is not None else 1
+
+
+# --- Block builders ---
+
+class _PartExtractor:
+    """Collects blocks for one part (document body, a header or a footer)."""
+
+    def __init__(self, part: str, part_name: str):
+        self.part = part
+        self.part_name = part_name
+        self.paragraphs: List[TextBlock] = []
+        self.cells: List[TextBlock] = []
+        self.textboxes: List[TextBlock] = []
+        self.p_count = 0
+        self.table_count = 0
+        self.textbox_count = 0
+
+    def add_top_level(self, element, scan_textboxes: bool):
+        """Handle one direct child of w:body / w:hdr / w:ftr, including everything inside it."""
+        p_index = {p: self.p_count + i for i, p in enumerate(element.iter(P))}
+        self.p_count += len(p_index)
+
+        if element.tag == P:
+            text = _paragraph_text(element)
+            if text.strip():
+                idx = p_index[element]
+                self.paragraphs.append(TextBlock(f"{self.part_name}#p{idx}", "paragraph", self.part, self.part_name, text, [idx]))
+        elif element.tag == TBL:
+            self._add_table(element, p_index)
+
+        if scan_textboxes:
+            for txbx in element.iter(TXBX):
+                textbox = self.textbox_count
+                self.textbox_count += 1
+                for p in txbx:
+                    if p.tag != P:
+                        continue
+                    text = _textbox_paragraph_text(p)
+                    if text.strip():
+                        idx = p_index[p]
+                        self.textboxes.append(TextBlock(f"{self.part_name}#x{textbox}p{idx}", "textbox", self.part, self.part_name, text, [idx]))
+
+    def _add_table(self, tbl, p_index: Dict):
+        table = self.table_count
+        self.table_count += 1
+        for row_idx, tr in enumerate(c for c in tbl if c.tag == TR):
+            col = 0
+            for tc in tr:
+                if tc.tag != TC:
+                    continue
+                span = _grid_span(tc)
+                # A vertically merged cell's text belongs to the cell where the merge starts
+                if not _is_vmerge_continuation(tc):
+                    texts, indexes = [], []
+                    for p in tc:
+                        if p.tag != P:
+                            continue
+                        text = _paragraph_text(p)
+                        if text.strip():
+                            texts.append(text)
+                            indexes.append(p_index[p])
+                    cell_text = " ".join(texts)
+                    if cell_text.strip():
+                        self.cells.append(TextBlock(
+                            f"{self.part_name}#t{table}r{row_idx}c{col}", "cell", self.part, self.part_name,
+                            cell_text, indexes, table=table, row=row_idx, col=col,
+                        ))
+                col += span
+
+
+def _read_rels(zf: zipfile.ZipFile, part_name: str) -> Dict[str, str]:
+    """rId -> absolute part name for the relationships of part_name."""
+    folder, filename = posixpath.split(part_name)
+    rels_name = posixpath.join(folder, "_rels", filename + ".rels")
+    if rels_name not in zf.namelist():
+        return {}
+    root = etree.fromstring(zf.read(rels_name))
+    rels = {}
+    for rel in root.iter(f"{{{PKG_REL_NS}}}Relationship"):
+        if rel.get("TargetMode") == "External":
+            continue
+        target = rel.get("Target", "")
+        path = target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join(folder, target))
+        rels[rel.get("Id")] = path
+    return rels
+
+
+def _main_document_part(zf: zipfile.ZipFile) -> str:
+    root = etree.fromstring(zf.read("_rels/.rels"))
+    for rel in root.iter(f"{{{PKG_REL_NS}}}Relationship"):
+        if rel.get("Type") == OFFICE_DOCUMENT_REL:
+            return rel.get("Target").lstrip("/")
+    return "word/document.xml"
+
+
+def _default_references(sect_pr) -> Tuple[Optional[str], Optional[str]]:
+    header = footer = None
+    for ref in sect_pr:
+        if ref.tag in (HEADER_REF, FOOTER_REF) and ref.get(W_TYPE) == "default":
+            if ref.tag == HEADER_REF:
+                header = ref.get(R_ID)
+            else:
+                footer = ref.get(R_ID)
+    return header, footer
+
+
+def _resolve_section_parts(sections: List[Tuple[Optional[str], Optional[str]]], rels: Dict[str, str], which: int) -> List[str]:
+    """Part names of each section's primary header (which=0) or footer (which=1), linked sections inherit."""
+    parts, current = [], None
+    for refs in sections:
+        r_id = refs[which]
+        if r_id is not None and r_id in rels:
+            current = rels[r_id]
+        if current is not None and current not in parts:
+            parts.append(current)
+    return parts
+
+
+def _extract_header_footer(zf: zipfile.ZipFile, part_name: str, part: str) -> _PartExtractor:
+    extractor = _PartExtractor(part, part_name)
+    root = etree.fromstring(zf.read(part_name))
+    for child in root:
+        extractor.add_top_level(child, scan_textboxes=False)
+    return extractor
+
+
+def extract_structured_text(docx_path: str) -> ExtractedDocument:
+    """
+    Single streaming pass over the document body, then the (small) header and footer
+    parts. Output order matches the python-docx extractor: headers, body paragraphs,
+    body tables, footers, textboxes.
+    """
+    with zipfile.ZipFile(docx_path) as zf:
+        document_part = _main_document_part(zf)
+        body = _PartExtractor("body", document_part)
+        sections: List[Tuple[Optional[str], Optional[str]]] = []
+
+        with zf.open(document_part) as stream:
+            for _, element in etree.iterparse(stream, events=("end",), huge_tree=True):
+                parent = element.getparent()
+                if parent is None or parent.tag != BODY:
+                    continue
+
+                if element.tag == SECT_PR:
+                    sections.append(_default_references(element))
+                else:
+                    if element.tag == P:
+                        p_pr = element.find(P_PR)
+                        sect_pr = p_pr.find(SECT_PR) if p_pr is not None else None
+                        if sect_pr is not None:
+                            sections.append(_default_references(sect_pr))
+                    body.add_top_level(element, scan_textboxes=True)
+
+                # Processed: drop it (and anything before it) to keep memory flat
+                element.clear()
+                while element.getprevious() is not None:
+                    del parent[0]
+
+        rels = _read_rels(zf, document_part)
+        headers = [_extract_header_footer(zf, name, "header") for name in _resolve_section_parts(sections, rels, 0)]
+        footers = [_extract_header_footer(zf, name, "footer") for name in _resolve_section_parts(sections, rels, 1)]
+
+    blocks: List[TextBlock] = []
+    for header in headers:
+        blocks.extend(header.paragraphs)
+        blocks.extend(header.cells)
+    blocks.extend(body.paragraphs)
+    blocks.extend(body.cells)
+    for footer in footers:
+        blocks.extend(footer.paragraphs)
+        blocks.extend(footer.cells)
+    blocks.extend(body.textboxes)
+    return ExtractedDocument(blocks)
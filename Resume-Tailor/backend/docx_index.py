@@ -0,0 +1,189 @@
+import re
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from docx.oxml.ns import qn
+from docx.text.paragraph import Paragraph
+
+_WHITESPACE = re.compile(r'\s+')
+
+# (run index, character index within that run) for every character of the normalized text
+OffsetMap = List[Tuple[int, int]]
+
+
+def normalize_text(text: str) -> str:
+    """Same normalization as tailor.normalize_text: collapse whitespace, strip ends."""
+    return _WHITESPACE.sub(' ', text).strip()
+
+
+def build_offset_map(paragraph: Paragraph) -> Tuple[str, OffsetMap]:
+    """
+    Normalized text of the paragraph's runs plus, for each normalized character,
+    the run and position it came from. Lets a match found in normalized text be
+    spliced back into the original runs without touching their formatting.
+    """
+    chars: List[str] = []
+    offsets: OffsetMap = []
+    for run_idx, run in enumerate(paragraph.runs):
+        for char_idx, ch in enumerate(run.text):
+            if ch.isspace():
+                if not chars or chars[-1] == ' ':
+                    continue
+                ch = ' '
+            chars.append(ch)
+            offsets.append((run_idx, char_idx))
+
+    if chars and chars[-1] == ' ':
+        chars.pop()
+        offsets.pop()
+    return ''.join(chars), offsets
+
+
+class ParagraphEntry:
+    """One paragraph of the document with its normalized text and where it lives."""
+
+    __slots__ = ("paragraph", "location", "norm_text", "_offsets")
+
+    def __init__(self, paragraph: Paragraph, location: str):
+        self.paragraph = paragraph
+        self.location = location # body | table | header | footer | textbox
+        self.norm_text = normalize_text(paragraph.text)
+        self._offsets: Optional[Tuple[str, OffsetMap]] = None
+
+    @property
+    def offsets(self) -> Tuple[str, OffsetMap]:
+        if self._offsets is None:
+            self._offsets = build_offset_map(self.paragraph)
+        return self._offsets
+
+    def refresh(self):
+        """Recompute after the paragraph has been edited."""
+        self.norm_text = normalize_text(self.paragraph.text)
+        self._offsets = None
+
+
+def _location(p_element, part_location: str) -> str:
+    txbx, tc = qn('w:txbxContent'), qn('w:tc')
+    parent = p_element.getparent()
+    while parent is not None:
+        if parent.tag == txbx:
+            return "textbox"
+        if parent.tag == tc:
+            return "table"
+        parent = parent.getparent()
+    return part_location
+
+
+def _header_footer_parts(doc) -> Iterable[Tuple[object, str]]:
+    """Every distinct header/footer definition, without creating missing ones."""
+    seen: Set[int] = set()
+    for section in doc.sections:
+        for attr, location in (
+            ("header", "header"), ("first_page_header", "header"), ("even_page_header", "header"),
+            ("footer", "footer"), ("first_page_footer", "footer"), ("even_page_footer", "footer"),
+        ):
+            hf = getattr(section, attr)
+            # Accessing a linked header's content would add an empty definition
+            if hf.is_linked_to_previous:
+                continue
+            element = hf._element
+            if id(element) in seen:
+                continue
+            seen.add(id(element))
+            yield hf, location
+
+
+def build_paragraph_index(doc) -> List[ParagraphEntry]:
+    """
+    Walk the XML once and index every paragraph: body, table cells (including
+    nested tables), headers, footers and textboxes. Works on lxml elements directly,
+    so python-docx never rebuilds row.cells proxies.
+    """
+    entries: List[ParagraphEntry] = []
+    p_tag = qn('w:p')
+
+    containers = [(doc._body, doc.element.body, "body")]
+    containers.extend((hf, hf._element, location) for hf, location in _header_footer_parts(doc))
+
+    for parent, root, location in containers:
+        for p_element in root.iter(p_tag):
+            entries.append(ParagraphEntry(Paragraph(p_element, parent), _location(p_element, location)))
+    return entries
+
+
+class AhoCorasick:
+    """
+    Multi-pattern substring matcher: after build(), search() finds every added
+    pattern occurring in a text in a single pass over that text.
+    """
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Set[int]] = [set()]
+
+    def add(self, pattern: str, value: int):
+        if not pattern:
+            return
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(set())
+            state = nxt
+        self._output[state].add(value)
+
+    def build(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = self._goto[fallback].get(ch, 0)
+                self._output[nxt] |= self._output[self._fail[nxt]]
+
+    def search(self, text: str) -> Set[int]:
+        found: Set[int] = set()
+        state = 0
+        goto, fail, output = self._goto, self._fail, self._output
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if output[state]:
+                found |= output[state]
+        return found
+
+
+def splice_across_runs(paragraph: Paragraph, norm_target: str, replacement: str, offsets: Tuple[str, OffsetMap] = None) -> bool:
+    """
+    Replace a target that spans several runs. The replacement goes into the run
+    where the match starts, the matched text is cut out of the following runs, and
+    every run keeps its own formatting.
+    """
+    norm_text, offset_map = offsets if offsets is not None else build_offset_map(paragraph)
+    start = norm_text.find(norm_target)
+    if start < 0 or not norm_target:
+        return False
+
+    runs = paragraph.runs
+    start_run, start_char = offset_map[start]
+    end_run, end_char = offset_map[start + len(norm_target) - 1]
+
+    if start_run == end_run:
+        text = runs[start_run].text
+        runs[start_run].text = text[:start_char] + replacement + text[end_char + 1:]
+        return True
+
+    runs[start_run].text = runs[start_run].text[:start_char] + replacement
+    for run_idx in range(start_run + 1, end_run):
+        runs[run_idx].text = ""
+    runs[end_run].text = runs[end_run].text[end_char + 1:]
+    return True
@@ -0,0 +1,195 @@
+"""
+Content-addressed store for generated files (tailored DOCX, exported PDF).
+
+Each file is stored once under DOWNLOADS_DIR/<first two hex chars>/<sha256><ext> and
+served from /download/<sha256><ext>/<filename>. Because the URL names the content, a
+download never changes: responses carry the digest as a strong ETag and
+`Cache-Control: immutable`, If-None-Match is answered without touching the disk,
+identical outputs share one file, and Range requests (resumed downloads) are served
+by Starlette's FileResponse, which hands the file to the server via the
+`http.response.pathsend` extension (sendfile) when the server offers it.
+
+A file's mtime is its last use (publishing the same bytes again or serving them bumps
+it). collect_downloads(), run from the scratch GC loop, deletes files unused for
+DOWNLOADS_TTL_HOURS and then the least recently used ones while the store is above
+DOWNLOADS_MAX_MB; files used in the last few minutes are never evicted.
+"""
+import hashlib
+import io
+import os
+import re
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+DOWNLOADS_DIR = os.getenv("DOWNLOADS_DIR", "downloads")
+DOWNLOAD_BASE_URL = os.getenv("DOWNLOAD_BASE_URL", "http://localhost:8000")
+# Read size when the server can't sendfile; bigger chunks mean fewer thread hops per download
+DOWNLOAD_CHUNK_SIZE = int(os.getenv("DOWNLOAD_CHUNK_SIZE", str(1024 * 1024)))
+DOWNLOAD_CACHE_CONTROL = "private, max-age=31536000, immutable"
+DOWNLOADS_TTL_HOURS = float(os.getenv("DOWNLOADS_TTL_HOURS", "168"))
+DOWNLOADS_MAX_MB = int(os.getenv("DOWNLOADS_MAX_MB", "4096"))
+
+# Files published or served this recently survive size-cap eviction
+ACTIVE_GRACE_SECONDS = 300
+
+MEDIA_TYPES = {
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    ".pdf": "application/pdf",
+}
+
+_DOWNLOAD_ID = re.compile(r"^([0-9a-f]{64})(\.docx|\.pdf)$")
+
+_counters = {"expired": 0, "evicted": 0, "freed_bytes": 0}
+_last_run: Dict = {}
+
+
+def file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def stored_path(digest: str, ext: str) -> str:
+    return os.path.join(DOWNLOADS_DIR, digest[:2], digest + ext)
+
+
+def _move_into_store(src_path: str, digest: str, ext: str) -> str:
+    dest = stored_path(digest, ext)
+    if os.path.exists(dest):
+        os.remove(src_path) # Same bytes are already published
+        touch(dest)
+    else:
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        os.replace(src_path, dest)
+    return digest + ext
+
+
+def touch(path: str):
+    """Mark a stored file as used, so the GC keeps it."""
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def publish_file(path: str) -> str:
+    """Move a finished file into the store and return its download id ("<sha256><ext>")."""
+    ext = os.path.splitext(path)[1].lower()
+    return _move_into_store(path, file_digest(path), ext)
+
+
+def publish_bytes(data: bytes, ext: str) -> str:
+    """Store in-memory output (e.g. a python-docx save into BytesIO) and return its download id."""
+    digest = hashlib.sha256(data).hexdigest()
+    if os.path.exists(stored_path(digest, ext)):
+        touch(stored_path(digest, ext))
+        return digest + ext
+    os.makedirs(os.path.join(DOWNLOADS_DIR, digest[:2]), exist_ok=True)
+    # Write next to the destination and rename, so readers never see a partial file
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.join(DOWNLOADS_DIR, digest[:2]), suffix=".part")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    return _move_into_store(tmp_path, digest, ext)
+
+
+def publish_document(document, ext: str = ".docx") -> str:
+    """Serialize a python-docx Document in memory and store it, no scratch file needed."""
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return publish_bytes(buffer.getvalue(), ext)
+
+
+def download_url(download_id: str, filename: str) -> str:
+    return f"{DOWNLOAD_BASE_URL}/download/{download_id}/{quote(filename)}"
+
+
+def parse_download_id(download_id: str) -> Optional[Tuple[str, str]]:
+    """(digest, ext) for a well-formed id, None otherwise. Never lets a path through."""
+    match = _DOWNLOAD_ID.match(download_id)
+    return (match.group(1), match.group(2)) if match else None
+
+
+def etag_for(digest: str) -> str:
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], digest: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag_for(digest) in candidates
+
+
+def _stored_files() -> List[Tuple[float, int, str]]:
+    files = []
+    if not os.path.isdir(DOWNLOADS_DIR):
+        return files
+    for shard in os.scandir(DOWNLOADS_DIR):
+        if not shard.is_dir():
+            continue
+        for entry in os.scandir(shard.path):
+            try:
+                if entry.is_file():
+                    stat_result = entry.stat()
+                    files.append((stat_result.st_mtime, stat_result.st_size, entry.path))
+            except FileNotFoundError:
+                continue # Removed while we were looking
+    return files
+
+
+def _remove(path: str) -> bool:
+    try:
+        os.remove(path)
+        return True
+    except OSError:
+        return False
+
+
+def collect_downloads(
+    now: Optional[float] = None,
+    ttl_seconds: Optional[float] = None,
+    max_bytes: Optional[int] = None,
+) -> Dict:
+    """Delete files (and abandoned .part files) unused for the TTL, then LRU-evict down to max_bytes."""
+    global _last_run
+    now = now or time.time()
+    ttl_seconds = DOWNLOADS_TTL_HOURS * 3600 if ttl_seconds is None else ttl_seconds
+    max_bytes = DOWNLOADS_MAX_MB * 1024 * 1024 if max_bytes is None else max_bytes
+    expired = evicted = freed = 0
+    live = []
+    for mtime, size, path in _stored_files():
+        if now - mtime > ttl_seconds:
+            if _remove(path):
+                expired += 1
+                freed += size
+        elif not path.endswith(".part"):
+            live.append((mtime, size, path))
+
+    total = sum(size for _, size, _ in live)
+    for mtime, size, path in sorted(live):
+        if total <= max_bytes:
+            break
+        if now - mtime < ACTIVE_GRACE_SECONDS:
+            break # Everything from here on was just published or downloaded
+        if _remove(path):
+            evicted += 1
+            freed += size
+            total -= size
+
+    _counters["expired"] += expired
+    _counters["evicted"] += evicted
+    _counters["freed_bytes"] += freed
+    _last_run = {"at": now, "expired": expired, "evicted": evicted, "freed_bytes": freed, "bytes_in_use": total}
+    if expired or evicted:
+        print(f"Downloads GC: {expired} expired, {evicted} evicted, {freed / 1e6:.1f} MB freed")
+    return _last_run
+
+
+def download_stats() -> Dict:
+    return {**_counters, "last_run": _last_run}
@@ -0,0 +1,210 @@
+"""
+SQLite-backed analysis job queue.
+
+The API tier only enqueues jobs (POST /analyze with background=true) and reads their
+status. Worker processes claim queued jobs, run the analysis pipeline and record each
+stage (uploaded -> converted -> analyzed -> scored) so clients can follow progress.
+
+Run dedicated workers with:
+    python jobs.py --processes 2 --concurrency 4
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import traceback
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlmodel import Session, select, update
+
+from database import engine, init_db
+from models import AnalysisJob
+
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "0.5"))
+JOB_WORKER_CONCURRENCY = int(os.getenv("JOB_WORKER_CONCURRENCY", "4"))
+JOB_STALE_AFTER_SECONDS = int(os.getenv("JOB_STALE_AFTER_SECONDS", "600"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "2"))
+
+STAGES = ["uploaded", "converted", "analyzed", "scored"]
+
+
+# --- Queue operations (used by both the API and the workers) ---
+
+def enqueue_job(session: Session, pdf_path: str, job_description: str, resume_digest: str, user_id: Optional[int] = None) -> AnalysisJob:
+    job = AnalysisJob(
+        id=uuid.uuid4().hex,
+        pdf_path=pdf_path,
+        job_description=job_description,
+        resume_digest=resume_digest,
+        user_id=user_id,
+    )
+    session.add(job)
+    session.commit()
+    session.refresh(job)
+    return job
+
+
+def get_job(session: Session, job_id: str) -> Optional[AnalysisJob]:
+    return session.get(AnalysisJob, job_id)
+
+
+def job_visible_to(job: AnalysisJob, user_id: Optional[int]) -> bool:
+    """
+    A signed-in user's job is only visible to that user. Anonymous jobs have no owner to
+    check: their random 128-bit id works as a bearer capability, so only share it with the
+    client that queued the job.
+    """
+    return job.user_id is None or job.user_id == user_id
+
+
+def update_job(job_id: str, **fields):
+    fields["updated_at"] = datetime.now()
+    with Session(engine) as session:
+        session.execute(update(AnalysisJob).where(AnalysisJob.id == job_id).values(**fields))
+        session.commit()
+
+
+def claim_next_job(worker_id: str) -> Optional[AnalysisJob]:
+    """
+    Atomically move the oldest queued job to running.
+    The conditional UPDATE means two workers can never claim the same job.
+    """
+    with Session(engine) as session:
+        candidate = session.exec(
+            select(AnalysisJob.id).where(AnalysisJob.status == "queued").order_by(AnalysisJob.created_at).limit(1)
+        ).first()
+        if candidate is None:
+            return None
+
+        claimed = session.execute(
+            update(AnalysisJob)
+            .where(AnalysisJob.id == candidate, AnalysisJob.status == "queued")
+            .values(status="running", worker_id=worker_id, attempts=AnalysisJob.attempts + 1, updated_at=datetime.now())
+        )
+        session.commit()
+        if claimed.rowcount != 1:
+            return None # Another worker won the race, try again on the next poll
+
+        return session.get(AnalysisJob, candidate)
+
+
+def requeue_stale_jobs() -> int:
+    """Give jobs from crashed workers another try, or fail them after JOB_MAX_ATTEMPTS."""
+    cutoff = datetime.now() - timedelta(seconds=JOB_STALE_AFTER_SECONDS)
+    with Session(engine) as session:
+        stale = session.exec(
+            select(AnalysisJob).where(AnalysisJob.status == "running", AnalysisJob.updated_at < cutoff)
+        ).all()
+        for job in stale:
+            if job.attempts >= JOB_MAX_ATTEMPTS:
+                job.status = "failed"
+                job.error = "Worker stopped responding"
+            else:
+                job.status = "queued"
+                job.worker_id = None
+            job.updated_at = datetime.now()
+            session.add(job)
+        session.commit()
+        return len(stale)
+
+
+def job_status(job: AnalysisJob) -> Dict:
+    status = {
+        "job_id": job.id,
+        "status": job.status,
+        "stage": job.stage,
+        "stages": STAGES,
+        "created_at": job.created_at,
+        "updated_at": job.updated_at,
+    }
+    if job.status == "done" and job.result_json:
+        status["result"] = json.loads(job.result_json)
+    if job.status == "failed":
+        status["error"] = job.error
+    return status
+
+
+# --- Worker side ---
+
+async def process_job(job: AnalysisJob):
+    # Imported here so the API process doesn't load the conversion stack just to enqueue
+    from analysis_pipeline import run_analysis, analysis_response
+    from workers import run_io
+
+    async def on_stage(stage: str):
+        await run_io(update_job, job.id, stage=stage)
+
+    try:
+        with Session(engine) as session:
+            analysis_result, docx_path = await run_analysis(
+                session, job.pdf_path, job.resume_digest, job.job_description, on_stage=on_stage
+            )
+        result = analysis_response(analysis_result, job.pdf_path, docx_path)
+        await run_io(update_job, job.id, status="done", stage="scored", result_json=json.dumps(result))
+    except Exception as e:
+        traceback.print_exc()
+        await run_io(update_job, job.id, status="failed", error=str(e))
+
+
+async def worker_loop(concurrency: int = JOB_WORKER_CONCURRENCY):
+    """Claim and process jobs forever, at most `concurrency` at a time."""
+    from workers import run_io, start_pools
+
+    worker_id = f"{os.getpid()}-{uuid.uuid4().hex[:6]}"
+    slots = asyncio.Semaphore(concurrency)
+    running: set = set()
+    start_pools()
+    print(f"Analysis worker {worker_id} started (concurrency={concurrency})")
+
+    last_stale_check = datetime.min
+    while True:
+        if datetime.now() - last_stale_check > timedelta(seconds=60):
+            await run_io(requeue_stale_jobs)
+            last_stale_check = datetime.now()
+
+        await slots.acquire()
+        job = await run_io(claim_next_job, worker_id)
+        if job is None:
+            slots.release()
+            await asyncio.sleep(JOB_POLL_INTERVAL)
+            continue
+
+        task = asyncio.create_task(process_job(job))
+        running.add(task)
+        task.add_done_callback(running.discard)
+        task.add_done_callback(lambda _: slots.release())
+
+
+def worker_main(concurrency: int = JOB_WORKER_CONCURRENCY):
+    init_db()
+    try:
+        asyncio.run(worker_loop(concurrency))
+    except KeyboardInterrupt:
+        pass
+
+
+def spawn_workers(processes: int, concurrency: int = JOB_WORKER_CONCURRENCY) -> List[multiprocessing.Process]:
+    # Not daemonic: each worker owns its own conversion process pool
+    ctx = multiprocessing.get_context("spawn")
+    procs = []
+    for _ in range(processes):
+        proc = ctx.Process(target=worker_main, args=(concurrency,))
+        proc.start()
+        procs.append(proc)
+    return procs
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run resume analysis job workers.")
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=JOB_WORKER_CONCURRENCY)
+    args = parser.parse_args()
+
+    if args.processes == 1:
+        worker_main(args.concurrency)
+    else:
+        for proc in spawn_workers(args.processes, args.concurrency):
+            proc.join()
@@ -0,0 +1,242 @@
+"""
+Shared gateway for every OpenAI chat completion the backend makes.
+
+Creating an `openai.OpenAI()` per call throws away its connection pool, so every request
+paid a new TCP + TLS handshake. The gateway keeps one sync and one async client (the async
+one per event loop, like the worker pools' semaphores) on keep-alive httpx pools and adds:
+- connect/read timeouts from LLM_CONNECT_TIMEOUT / LLM_TIMEOUT_SECONDS,
+- retries on 429, 5xx, timeouts and dropped connections with full-jitter exponential
+  backoff (never shorter than the server's Retry-After), instead of the SDK's own retries,
+- a concurrency cap per model (LLM_MAX_CONCURRENCY, overridable per model through
+  LLM_MODEL_CONCURRENCY="gpt-4o=4,gpt-4o-mini=16"), so one busy model can't take every
+  connection or run into its rate limit on its own.
+OPENAI_BASE_URL points it at any OpenAI-compatible server (a local stub in the tests).
+"""
+import asyncio
+import os
+import random
+import threading
+import time
+from typing import AsyncIterator, Dict, List, Optional
+
+import httpx
+import openai
+
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "120"))
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "10"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "0.5"))
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "20"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "32"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_MODEL_CONCURRENCY = os.getenv("LLM_MODEL_CONCURRENCY", "")
+
+RETRYABLE_ERRORS = (openai.RateLimitError, openai.InternalServerError, openai.APIConnectionError)
+
+
+def parse_model_limits(spec: str) -> Dict[str, int]:
+    """"gpt-4o=4, gpt-4o-mini=16" -> {"gpt-4o": 4, "gpt-4o-mini": 16}"""
+    limits = {}
+    for item in spec.split(","):
+        model, _, limit = item.partition("=")
+        if model.strip() and limit.strip().isdigit():
+            limits[model.strip()] = max(1, int(limit))
+    return limits
+
+
+def _retry_after(error: Exception) -> float:
+    response = getattr(error, "response", None)
+    if response is None:
+        return 0.0
+    try:
+        return float(response.headers.get("retry-after", 0))
+    except ValueError:
+        return 0.0 # HTTP-date form, fall back to our own backoff
+
+
+class LLMGateway:
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        max_retries: int = LLM_MAX_RETRIES,
+        backoff_base: float = LLM_BACKOFF_BASE,
+        backoff_max: float = LLM_BACKOFF_MAX,
+        default_concurrency: int = LLM_MAX_CONCURRENCY,
+        model_concurrency: Optional[Dict[str, int]] = None,
+    ):
+        # Read lazily: main loads .env after this module is imported
+        self._base_url = base_url
+        self._api_key = api_key
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.default_concurrency = default_concurrency
+        self.model_concurrency = parse_model_limits(LLM_MODEL_CONCURRENCY) if model_concurrency is None else model_concurrency
+
+        self._lock = threading.Lock()
+        self._sync_client: Optional[openai.OpenAI] = None
+        self._sync_limits: Dict[str, threading.BoundedSemaphore] = {}
+        self._async_client: Optional[openai.AsyncOpenAI] = None
+        self._async_limits: Dict[str, asyncio.Semaphore] = {}
+        self._loop = None
+
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+        self.in_flight: Dict[str, int] = {}
+        self._total_ms = 0.0
+
+    # --- clients ---
+
+    def _client_options(self) -> Dict:
+        return {
+            "api_key": self._api_key or os.environ.get("OPENAI_API_KEY"),
+            "base_url": self._base_url or os.environ.get("OPENAI_BASE_URL") or None,
+            "max_retries": 0, # Retries happen here, with jitter and per-model limits
+        }
+
+    def _http_options(self) -> Dict:
+        return {
+            "timeout": httpx.Timeout(LLM_TIMEOUT_SECONDS, connect=LLM_CONNECT_TIMEOUT),
+            "limits": httpx.Limits(max_connections=LLM_MAX_CONNECTIONS, max_keepalive_connections=LLM_MAX_CONNECTIONS),
+        }
+
+    def _sync(self) -> openai.OpenAI:
+        with self._lock:
+            if self._sync_client is None:
+                self._sync_client = openai.OpenAI(http_client=httpx.Client(**self._http_options()), **self._client_options())
+            return self._sync_client
+
+    def _async(self) -> openai.AsyncOpenAI:
+        # httpx.AsyncClient connections belong to the loop that opened them (worker processes
+        # and asyncio.run() callers each have their own), so clients and semaphores are per loop
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._loop is not loop:
+            self._async_client = openai.AsyncOpenAI(http_client=httpx.AsyncClient(**self._http_options()), **self._client_options())
+            self._async_limits = {}
+            self._loop = loop
+        return self._async_client
+
+    def _limit(self, model: str) -> int:
+        return self.model_concurrency.get(model, self.default_concurrency)
+
+    def _sync_semaphore(self, model: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            if model not in self._sync_limits:
+                self._sync_limits[model] = threading.BoundedSemaphore(self._limit(model))
+            return self._sync_limits[model]
+
+    def _async_semaphore(self, model: str) -> asyncio.Semaphore:
+        self._async()
+        if model not in self._async_limits:
+            self._async_limits[model] = asyncio.Semaphore(self._limit(model))
+        return self._async_limits[model]
+
+    # --- retry policy ---
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        return min(self.backoff_max, max(delay, _retry_after(error)))
+
+    def _should_retry(self, attempt: int, error: Exception, model: str) -> bool:
+        if attempt >= self.max_retries or not isinstance(error, RETRYABLE_ERRORS):
+            self.failures += 1
+            return False
+        self.retries += 1
+        print(f"LLM call to {model} failed ({type(error).__name__}), retry {attempt + 1}/{self.max_retries}")
+        return True
+
+    def _started(self, model: str) -> float:
+        self.requests += 1
+        self.in_flight[model] = self.in_flight.get(model, 0) + 1
+        return time.perf_counter()
+
+    def _finished(self, model: str, started_at: float):
+        self.in_flight[model] -= 1
+        self._total_ms += (time.perf_counter() - started_at) * 1000
+
+    # --- entry points ---
+
+    def complete(self, model: str, messages: List[Dict], **kwargs):
+        """Blocking chat completion (for code already running in a worker thread)."""
+        client = self._sync()
+        attempt = 0
+        while True:
+            with self._sync_semaphore(model):
+                started_at = self._started(model)
+                try:
+                    return client.chat.completions.create(model=model, messages=messages, **kwargs)
+                except Exception as e:
+                    error = e
+                finally:
+                    self._finished(model, started_at)
+            # Sleep outside the semaphore so waiting callers can use the slot
+            if not self._should_retry(attempt, error, model):
+                raise error
+            time.sleep(self._backoff(attempt, error))
+            attempt += 1
+
+    async def acomplete(self, model: str, messages: List[Dict], **kwargs):
+        """Chat completion on the event loop."""
+        client = self._async()
+        attempt = 0
+        while True:
+            async with self._async_semaphore(model):
+                started_at = self._started(model)
+                try:
+                    return await client.chat.completions.create(model=model, messages=messages, **kwargs)
+                except Exception as e:
+                    error = e
+                finally:
+                    self._finished(model, started_at)
+            if not self._should_retry(attempt, error, model):
+                raise error
+            await asyncio.sleep(self._backoff(attempt, error))
+            attempt += 1
+
+    async def astream(self, model: str, messages: List[Dict], **kwargs) -> AsyncIterator:
+        """
+        Streamed chat completion chunks. Opening the stream is retried like acomplete; once
+        chunks have been handed out a failure is raised, since they can't be taken back.
+        The model's slot is held until the stream is exhausted or closed.
+        """
+        client = self._async()
+        attempt = 0
+        while True:
+            async with self._async_semaphore(model):
+                started_at = self._started(model)
+                try:
+                    stream = await client.chat.completions.create(model=model, messages=messages, stream=True, **kwargs)
+                except Exception as e:
+                    error = e
+                    self._finished(model, started_at)
+                else:
+                    try:
+                        async for chunk in stream:
+                            yield chunk
+                    except Exception:
+                        self.failures += 1
+                        raise
+                    finally:
+                        await stream.close()
+                        self._finished(model, started_at)
+                    return
+            if not self._should_retry(attempt, error, model):
+                raise error
+            await asyncio.sleep(self._backoff(attempt, error))
+            attempt += 1
+
+    def stats(self) -> Dict:
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "failures": self.failures,
+            "in_flight": {model: count for model, count in self.in_flight.items() if count},
+            "avg_request_ms": round(self._total_ms / self.requests, 1) if self.requests else 0.0,
+            "default_concurrency": self.default_concurrency,
+            "model_concurrency": self.model_concurrency,
+        }
+
+
+llm = LLMGateway()
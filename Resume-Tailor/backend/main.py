@@ -1,22 +1,42 @@
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Depends, status, Request
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, Form, HTTPException, Depends, status, Request
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import OAuth2PasswordBearer
 from typing import List, Optional
-from database import init_db, get_session
+from database import init_db, get_session, get_async_session, engine
 from models import Application, TimelineEvent, User, SurveyResponse, SavedResume, UsageLog
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from datetime import datetime, timedelta
 import shutil
 import uvicorn
 import os
-import uuid
+import json
+import asyncio
 from dotenv import load_dotenv
 from scraper import fetch_job_description
-from pdf_handler import pdf_to_docx, docx_to_pdf
-from tailor import analyze_gaps, generate_tailored_resume
+from pdf_handler import docx_to_pdf
+from tracker import APPLICATIONS_MAX_PAGE_SIZE, APPLICATIONS_PAGE_SIZE, SORTS as APPLICATION_SORTS, InvalidCursor, build_page, build_page_query, page_digest, ensure_indexes as ensure_tracker_indexes
+from text_store import ensure_columns as ensure_text_columns, load_resume_payload, migrate_inline_payloads, prune_orphan_texts, store_resume_payload
+from quota import ANONYMOUS_DAILY_LIMIT, USAGE_ROLLUP_INTERVAL_HOURS, count_anonymous_usage, try_consume_anonymous, log_usage, rollup_and_prune, ensure_indexes as ensure_usage_indexes
+from pdf_export import PdfExportError, PdfExportUnavailable, PdfExportBusy, PdfExportTimeout, start_export_backend, shutdown_export_backend, export_stats
+from conversion import convert_pdf_to_docx, conversion_stats
+from tailor import generate_tailored_resume, build_tailored_variants, analyze_gaps_stream, ANALYSIS_MODELS, ANALYSIS_CACHE_VERSION
+from analysis_cache import make_cache_key, get_cached_analysis, store_analysis, cache_stats
+from analysis_pipeline import run_analysis, analysis_response
+from jobs import enqueue_job, get_job, job_status, job_visible_to, spawn_workers, JOB_POLL_INTERVAL
+from auth_cache import identity_cache, identity_of
+from llm_client import llm
+from model_router import router
+from prompt_budget import prompt_stats
+from ats_scorer import scorer_stats
+from scratch import SCRATCH_GC_INTERVAL_MINUTES, scratch, safe_filename, with_ext
+from uploads import UploadError, receive_upload, upload_form_schema
+from downloads import DOWNLOAD_CACHE_CONTROL, DOWNLOAD_CHUNK_SIZE, MEDIA_TYPES, collect_downloads, download_stats, download_url, etag_for, etag_matches, parse_download_id, publish_document, publish_file, stored_path, touch
+from workers import run_io, run_hash, start_pools, shutdown_pools, pool_stats, PoolSaturatedError
+from passwords import get_password_hash, verify_password, needs_rehash
 from pydantic import BaseModel, EmailStr
-import bcrypt
 from jose import JWTError, jwt
 import re
 
@@ -32,21 +52,11 @@ SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-this-in-production"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a plain password against a hash using direct bcrypt."""
-    try:
-        return bcrypt.checkpw(
-            plain_password.encode("utf-8"), 
-            hashed_password.encode("utf-8")
-        )
-    except Exception:
-        return False
-
-def get_password_hash(password: str) -> str:
-    """Hash a password using direct bcrypt."""
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(password.encode("utf-8"), salt)
-    return hashed.decode("utf-8")
+# Background analysis workers spawned by each API process. Off by default: with
+# `uvicorn --workers N` or several replicas every process would start its own, so run
+# `python jobs.py` once instead (or set this on a single API process).
+ANALYSIS_WORKER_PROCESSES = int(os.getenv("ANALYSIS_WORKER_PROCESSES", "0"))
+JOB_EVENTS_TIMEOUT_SECONDS = int(os.getenv("JOB_EVENTS_TIMEOUT_SECONDS", "300"))
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -60,21 +70,34 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
-async def get_current_user(token: str = Depends(oauth2_scheme), session: Session = Depends(get_session)) -> User:
+async def resolve_user(token: str, session: AsyncSession) -> Optional[User]:
+    """User behind a bearer token, or None. Hot tokens are answered from the identity cache."""
+    cached = identity_cache.get(token)
+    if cached is not None:
+        # id and email only: came from the database and were validated then. Handlers that
+        # need anything else (e.g. the password hash at login) load the row themselves.
+        return User.model_construct(**cached)
+
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+    email: str = payload.get("sub")
+    if email is None:
+        return None
+
+    user = (await session.exec(select(User).where(User.email == email))).first()
+    if user is not None:
+        identity_cache.put(token, identity_of(user), payload.get("exp"))
+    return user
+
+async def get_current_user(token: str = Depends(oauth2_scheme), session: AsyncSession = Depends(get_async_session)) -> User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
-        
-    user = session.exec(select(User).where(User.email == email)).first()
+    user = await resolve_user(token, session)
     if user is None:
         raise credentials_exception
     return user
@@ -82,7 +105,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme), session: Session
 
 async def get_optional_user(
     request: Request,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ) -> Optional[User]:
     auth_header = request.headers.get('Authorization')
     if not auth_header or not auth_header.startswith('Bearer '):
@@ -90,11 +113,7 @@ async def get_optional_user(
     
     token = auth_header.split(' ')[1]
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            return None
-        return session.exec(select(User).where(User.email == email)).first()
+        return await resolve_user(token, session)
     except Exception:
         return None
 
@@ -162,11 +181,30 @@ app.add_middleware(
 @app.on_event("startup")
 def on_startup():
     init_db()
+    ensure_usage_indexes(engine)
+    ensure_tracker_indexes(engine)
+    ensure_text_columns(engine)
+    migrate_inline_payloads(engine)
+    start_pools()
+    start_export_backend()
+    app.state.job_workers = spawn_workers(ANALYSIS_WORKER_PROCESSES)
+
+@app.on_event("startup")
+async def start_usage_rollup():
+    app.state.usage_rollup = asyncio.create_task(_usage_rollup_loop())
+    app.state.scratch_gc = asyncio.create_task(_scratch_gc_loop())
+
+@app.on_event("shutdown")
+def on_shutdown():
+    shutdown_pools()
+    shutdown_export_backend()
+    for proc in getattr(app.state, "job_workers", []):
+        proc.terminate()
 
 # --- Authentication Endpoints ---
 
 @app.post("/auth/register", response_model=Token)
-def register(user: UserRegister, session: Session = Depends(get_session)):
+async def register(user: UserRegister, session: AsyncSession = Depends(get_async_session)):
     # Validate email format
     if not validate_email(user.email):
         raise HTTPException(
@@ -175,7 +213,7 @@ def register(user: UserRegister, session: Session = Depends(get_session)):
         )
     
     # Check if user already exists
-    existing_user = session.exec(select(User).where(User.email == user.email)).first()
+    existing_user = (await session.exec(select(User).where(User.email == user.email))).first()
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, 
@@ -191,14 +229,18 @@ def register(user: UserRegister, session: Session = Depends(get_session)):
         )
     
     # Create new user
-    hashed_password = get_password_hash(user.password)
+    # bcrypt is deliberately slow, keep it off the event loop
+    try:
+        hashed_password = await run_hash(get_password_hash, user.password)
+    except PoolSaturatedError:
+        raise HTTPException(status_code=503, detail="Server is busy, please try again shortly.")
     new_user = User(
         email=user.email, 
         hashed_password=hashed_password
     )
     session.add(new_user)
-    session.commit()
-    session.refresh(new_user)
+    await session.commit()
+    await session.refresh(new_user)
     
     # Generate JWT token
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -209,7 +251,7 @@ def register(user: UserRegister, session: Session = Depends(get_session)):
     return {"access_token": access_token, "token_type": "bearer"}
 
 @app.post("/auth/login", response_model=Token)
-def login(user: UserLogin, session: Session = Depends(get_session)):
+async def login(user: UserLogin, session: AsyncSession = Depends(get_async_session)):
     # Validate password length (bcrypt limit is 72 bytes)
     if len(user.password.encode("utf-8")) > 72:
         raise HTTPException(
@@ -225,7 +267,7 @@ def login(user: UserLogin, session: Session = Depends(get_session)):
         )
     
     # Check if user exists
-    db_user = session.exec(select(User).where(User.email == user.email)).first()
+    db_user = (await session.exec(select(User).where(User.email == user.email))).first()
     if not db_user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, 
@@ -233,11 +275,24 @@ def login(user: UserLogin, session: Session = Depends(get_session)):
         )
     
     # Verify password
-    if not verify_password(user.password, db_user.hashed_password):
+    try:
+        password_ok = await run_hash(verify_password, user.password, db_user.hashed_password)
+    except PoolSaturatedError:
+        raise HTTPException(status_code=503, detail="Server is busy, please try again shortly.")
+    if not password_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, 
             detail="Invalid credentials"
         )
+
+    # Upgrade hashes made with another BCRYPT_ROUNDS while we still have the plain password
+    if needs_rehash(db_user.hashed_password):
+        try:
+            db_user.hashed_password = await run_hash(get_password_hash, user.password)
+            session.add(db_user)
+            await session.commit()
+        except PoolSaturatedError:
+            pass # Try again on a later login
     
     # Generate JWT token
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -247,8 +302,32 @@ def login(user: UserLogin, session: Session = Depends(get_session)):
     
     return {"access_token": access_token, "token_type": "bearer"}
 
+@app.get("/download/{download_id}/{filename}")
+@app.head("/download/{download_id}/{filename}", include_in_schema=False)
+async def download_stored_file(download_id: str, filename: str, request: Request):
+    """Serve a published output. Immutable: strong ETag, long-lived caching, Range support."""
+    parsed = parse_download_id(download_id)
+    if not parsed:
+        raise HTTPException(status_code=404, detail="File not found")
+    digest, ext = parsed
+    headers = {"ETag": etag_for(digest), "Cache-Control": DOWNLOAD_CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), digest):
+        return Response(status_code=304, headers=headers)
+    
+    path = stored_path(digest, ext)
+    try:
+        stat_result = await run_io(os.stat, path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="File not found")
+    await run_io(touch, path) # Keeps the file ahead of the download store's GC
+    response = FileResponse(path, media_type=MEDIA_TYPES[ext], filename=filename, headers=headers, stat_result=stat_result)
+    response.chunk_size = DOWNLOAD_CHUNK_SIZE
+    return response
+
 @app.get("/download/{filename}")
 async def download_file(filename: str):
+    # Links handed out before the download store; only files directly in the working directory
+    filename = os.path.basename(filename)
     file_path = os.path.join(os.getcwd(), filename)
     if os.path.exists(file_path):
         media_type = 'application/pdf'
@@ -260,119 +339,335 @@ async def download_file(filename: str):
 class EditsRequest(BaseModel):
     filename: str
     sections: List[Dict]
+    export_pdf: bool = False # Also render a PDF (needs LibreOffice or Word on the server)
+
+class BatchEditsRequest(BaseModel):
+    filename: str
+    variants: List[List[Dict]] # One list of sections (with their accepted edits) per variant
+
+MAX_BATCH_VARIANTS = int(os.getenv("MAX_BATCH_VARIANTS", "10"))
 
 @app.get("/api/usage")
 async def check_usage(
     request: Request,
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_session),
+    user: Optional[User] = Depends(get_optional_user)
 ):
-    user = await get_optional_user(request, session)
     if user:
         return {"usage_count": 0, "remaining": 9999, "is_unlimited": True}
     
     client_ip = request.client.host
-    # Calculate start of today
-    today_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-    
-    usage_count = len(session.exec(select(UsageLog).where(
-        UsageLog.ip_address == client_ip, 
-        UsageLog.user_id == None,
-        UsageLog.created_at >= today_start
-    )).all())
-    
-    remaining = max(0, 2 - usage_count)
+    usage_count = await run_io(count_anonymous_usage, session, client_ip)
+    remaining = max(0, ANONYMOUS_DAILY_LIMIT - usage_count)
     
     return {"usage_count": usage_count, "remaining": remaining, "is_unlimited": False}
 
-@app.post("/analyze")
+def check_and_log_usage(session: Session, client_ip: str, user: Optional[User]):
+    """Enforce the anonymous daily limit and record the analysis in UsageLog."""
+    if user:
+        log_usage(session, client_ip, user.id)
+        return
+    
+    # Check and consume in one statement so parallel requests can't overshoot the limit
+    if not try_consume_anonymous(session, client_ip):
+        raise HTTPException(
+            status_code=403, 
+            detail="Daily free limit reached. Please login for unlimited access."
+        )
+
+async def _usage_rollup_loop():
+    while True:
+        try:
+            with Session(engine) as session:
+                await run_io(rollup_and_prune, session)
+                await run_io(prune_orphan_texts, session)
+        except Exception as e:
+            print(f"Usage log rollup failed: {e}")
+        await asyncio.sleep(USAGE_ROLLUP_INTERVAL_HOURS * 3600)
+
+async def _scratch_gc_loop():
+    while True:
+        try:
+            # Also clears temp_* files older versions left in the working directory
+            await run_io(scratch.collect, legacy_dir=os.getcwd())
+        except Exception as e:
+            print(f"Scratch GC failed: {e}")
+        try:
+            await run_io(collect_downloads)
+        except Exception as e:
+            print(f"Downloads GC failed: {e}")
+        await asyncio.sleep(SCRATCH_GC_INTERVAL_MINUTES * 60)
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+def _new_scratch_pdf(filename: str) -> str:
+    return scratch.path(scratch.new_handle(filename))
+
+async def _receive_resume(request: Request, destination, required_fields=()):
+    """Stream the 'resume' PDF to destination(filename) and check the other form fields."""
+    try:
+        upload = await receive_upload(request, "resume", destination)
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    missing = [name for name in required_fields if not upload.fields.get(name)]
+    if missing:
+        raise HTTPException(status_code=422, detail=f"Missing form field(s): {', '.join(missing)}")
+    return upload
+
+@app.post("/analyze", openapi_extra=upload_form_schema("resume", ("job_description",), ("background",)))
 async def analyze_resume(
     request: Request,
-    resume: UploadFile = File(...), 
-    job_description: str = Form(...),
-    session: Session = Depends(get_session)
+    session: Session = Depends(get_session),
+    user: Optional[User] = Depends(get_optional_user)
 ):
     # Usage Tracking Logic
-    user = await get_optional_user(request, session)
     client_ip = request.client.host
     
-    if not user:
-        # Check anonymous usage limits (Daily)
-        today_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-        usage_count = len(session.exec(select(UsageLog).where(
-            UsageLog.ip_address == client_ip, 
-            UsageLog.user_id == None,
-            UsageLog.created_at >= today_start
-        )).all())
+    # Blocking DB/file work goes through the I/O pool, conversion through the process pool,
+    # so one slow upload doesn't stall the event loop for every other request.
+    try:
+        # Stream the uploaded resume into its own scratch session, hashing it on the way.
+        # A rejected upload doesn't count against the daily limit.
+        upload = await _receive_resume(request, _new_scratch_pdf, ("job_description",))
+        await run_io(check_and_log_usage, session, client_ip, user)
+        temp_pdf_path = upload.path
+        resume_digest = upload.digest
+        job_description = upload.fields["job_description"]
         
-        if usage_count >= 2:
-            raise HTTPException(
-                status_code=403, 
-                detail="Daily free limit reached. Please login for unlimited access."
-            )
+        if upload.flag("background"):
+            # Hand the work to the job workers and return right away
+            job = await run_io(enqueue_job, session, temp_pdf_path, job_description, resume_digest, user.id if user else None)
+            return JSONResponse(status_code=202, content={
+                "message": "Analysis queued",
+                "job_id": job.id,
+                "status_url": f"/analyze/jobs/{job.id}",
+                "events_url": f"/analyze/jobs/{job.id}/events"
+            })
         
-    # Log usage
-    new_log = UsageLog(
-        ip_address=client_ip, 
-        user_id=user.id if user else None,
-        action="tailor"
-    )
-    session.add(new_log)
-    session.commit()
-
-    # Create a unique session ID
-    session_id = str(uuid.uuid4())[:8]
-    
-    # Save uploaded resume temporarily with session ID
-    temp_pdf_path = f"temp_{session_id}_{resume.filename}"
-    with open(temp_pdf_path, "wb") as buffer:
-        buffer.write(await resume.read())
-    
-    # 1. Convert PDF to customizable format (DOCX)
-    docx_path = pdf_to_docx(temp_pdf_path)
+        analysis_result, docx_path = await run_analysis(session, temp_pdf_path, resume_digest, job_description)
+    except PoolSaturatedError:
+        raise HTTPException(status_code=503, detail="Server is busy, please try again shortly.")
     
-    # 2. Analyze gaps using LLM (Use PDF for reading text)
-    analysis_result = analyze_gaps(docx_path, job_description, pdf_path=temp_pdf_path)
+    return analysis_response(analysis_result, temp_pdf_path, docx_path)
+
+@app.post("/analyze/stream", openapi_extra=upload_form_schema("resume", ("job_description",)))
+async def analyze_resume_stream(
+    request: Request,
+    session: Session = Depends(get_session),
+    user: Optional[User] = Depends(get_optional_user)
+):
+    """
+    Server-Sent Events version of /analyze.
+    Emits 'stage' (converted), one 'section' event per finished section, 'scores',
+    and finally 'done' with the same payload /analyze returns.
+    """
+    client_ip = request.client.host
     
-    # We return the filename (with session ID) so the frontend can send it back for the next step
+    try:
+        upload = await _receive_resume(request, _new_scratch_pdf, ("job_description",))
+        await run_io(check_and_log_usage, session, client_ip, user)
+    except PoolSaturatedError:
+        raise HTTPException(status_code=503, detail="Server is busy, please try again shortly.")
+    temp_pdf_path = upload.path
+    handle = scratch.handle_for(temp_pdf_path)
+    job_description = upload.fields["job_description"]
+    
+    cache_key = make_cache_key(upload.digest, job_description, ANALYSIS_CACHE_VERSION, ANALYSIS_MODELS)
+    
+    async def event_stream():
+        # The request-scoped session may already be closed while the body streams
+        stream_session = Session(engine)
+        try:
+            cached = await run_io(get_cached_analysis, stream_session, cache_key)
+            if cached:
+                analysis_result, cached_docx_path = cached
+                docx_path = scratch.path(handle, ".docx")
+                await run_io(shutil.copy2, cached_docx_path, docx_path)
+                for section in analysis_result.get("sections", []):
+                    yield _sse("section", section)
+            else:
+                docx_path, timings = await convert_pdf_to_docx(temp_pdf_path)
+                yield _sse("stage", {"stage": "converted", "timings": timings})
+                
+                analysis_result = {}
+                async for event, data in analyze_gaps_stream(docx_path, job_description):
+                    if event == "section":
+                        yield _sse("section", data)
+                    else:
+                        analysis_result = data
+                await run_io(store_analysis, stream_session, cache_key, analysis_result, docx_path)
+            
+            yield _sse("scores", {
+                "initial_score": analysis_result.get("initial_score", 0),
+                "projected_score": analysis_result.get("projected_score", 0),
+                "score_reasoning": analysis_result.get("score_reasoning", ""),
+                "score_breakdown": analysis_result.get("score_breakdown", [])
+            })
+            yield _sse("done", analysis_response(analysis_result, temp_pdf_path, docx_path))
+        except Exception as e:
+            print(f"Streaming analysis failed: {e}")
+            yield _sse("error", {"error": "Analysis failed. Please try again."})
+        finally:
+            stream_session.close()
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@app.get("/analyze/jobs/{job_id}")
+async def get_analysis_job(
+    job_id: str,
+    session: Session = Depends(get_session),
+    user: Optional[User] = Depends(get_optional_user)
+):
+    job = await run_io(get_job, session, job_id)
+    # Someone else's job looks exactly like a missing one
+    if not job or not job_visible_to(job, user.id if user else None):
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_status(job)
+
+@app.get("/analyze/jobs/{job_id}/events")
+async def stream_analysis_job(job_id: str, request: Request, user: Optional[User] = Depends(get_optional_user)):
+    """Server-Sent Events: one 'stage' event per stage change, then 'result' or 'error'."""
+    user_id = user.id if user else None
+    
+    def load_status():
+        with Session(engine) as session:
+            job = get_job(session, job_id)
+            if not job or not job_visible_to(job, user_id):
+                return None
+            return jsonable_encoder(job_status(job))
+    
+    if await run_io(load_status) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    async def event_stream():
+        last_stage = None
+        deadline = asyncio.get_running_loop().time() + JOB_EVENTS_TIMEOUT_SECONDS
+        while asyncio.get_running_loop().time() < deadline:
+            if await request.is_disconnected():
+                return
+            status_data = await run_io(load_status)
+            if status_data["stage"] != last_stage:
+                last_stage = status_data["stage"]
+                yield _sse("stage", {"stage": last_stage, "status": status_data["status"]})
+            if status_data["status"] == "done":
+                yield _sse("result", status_data["result"])
+                return
+            if status_data["status"] == "failed":
+                yield _sse("error", {"error": status_data.get("error")})
+                return
+            await asyncio.sleep(JOB_POLL_INTERVAL)
+        yield _sse("error", {"error": "Timed out waiting for job"})
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@app.get("/api/cache/stats")
+def get_cache_stats():
+    return cache_stats()
+
+@app.get("/api/metrics/workers")
+def get_worker_metrics():
     return {
-        "message": "Analysis complete", 
-        "sections": analysis_result.get("sections", []),
-        "initial_score": analysis_result.get("initial_score", 0),
-        "projected_score": analysis_result.get("projected_score", 0),
-        "company_name": analysis_result.get("company_name", "Unknown Company"),
-        "job_title": analysis_result.get("job_title", "Unknown Role"),
-        "filename": temp_pdf_path, # Returning the temp path as the handle
-        "temp_docx_path": docx_path 
+        **pool_stats(),
+        "conversion": conversion_stats(),
+        "pdf_export": export_stats(),
+        "identity_cache": identity_cache.stats(),
+        "scratch": scratch.stats(),
+        "downloads": download_stats(),
+        "llm": llm.stats(),
+        "llm_tasks": router.stats(),
+        "prompts": prompt_stats(),
+        "scoring": scorer_stats(),
     }
 
+def _resolve_docx_path(filename: str) -> Optional[str]:
+    # The frontend sends back the handle /analyze returned as `filename`
+    # 1. Try the scratch store first
+    docx_path = scratch.resolve(filename, ".docx")
+    if docx_path:
+        return docx_path
+    
+    # 2. If not found (expired, or a saved resume), try saved_resumes location
+    saved_docx_path = os.path.join("saved_resumes", with_ext(os.path.basename(filename), ".docx"))
+    if os.path.exists(saved_docx_path):
+        return saved_docx_path
+    return None
+
+def _export_tailored_pdf(document, docx_path: str) -> str:
+    """Export an in-memory document through its own DOCX next to docx_path; returns the PDF's download id."""
+    temp_docx_path = scratch.temp_path(docx_path, "_tailored.docx")
+    try:
+        document.save(temp_docx_path)
+        return publish_file(docx_to_pdf(temp_docx_path))
+    finally:
+        for path in (temp_docx_path, with_ext(temp_docx_path, ".pdf")):
+            if os.path.exists(path):
+                os.remove(path)
+
 @app.post("/generate")
 async def generate_resume_endpoint(request: EditsRequest):
-    # Reconstruct paths using the filename handle provided by frontend
-    # 1. Try temp location first
-    temp_pdf_path = request.filename
-    docx_path = temp_pdf_path.replace(".pdf", ".docx")
-    
-    # 2. If not found, try saved_resumes location
-    if not os.path.exists(docx_path):
-        saved_docx_path = os.path.join("saved_resumes", os.path.basename(docx_path))
-        if os.path.exists(saved_docx_path):
-            docx_path = saved_docx_path
-        else:
-            return {"error": "Session expired or file not found. Please upload again."}
+    docx_path = _resolve_docx_path(request.filename)
+    if not docx_path:
+        return {"error": "Session expired or file not found. Please upload again."}
         
-    # 3. Apply edits
-    tailored_docx_path = generate_tailored_resume(docx_path, request.sections)
+    # 3. Apply edits in memory and publish straight into the download store,
+    # so concurrent requests on one upload never share a file
+    tailored_doc = await run_io(generate_tailored_resume, docx_path, request.sections)
+    docx_id = await run_io(publish_document, tailored_doc)
+    filename = os.path.splitext(os.path.basename(docx_path))[0] + "_tailored.docx"
+    
+    # 4. Optional PDF export, the DOCX stays the default download
+    pdf_id = None
+    if request.export_pdf:
+        try:
+            pdf_id = await run_io(_export_tailored_pdf, tailored_doc, docx_path)
+        except PdfExportUnavailable as e:
+            raise HTTPException(status_code=501, detail=str(e))
+        except (PdfExportBusy, PoolSaturatedError):
+            raise HTTPException(status_code=503, detail="PDF export is busy, please try again shortly.")
+        except PdfExportTimeout as e:
+            raise HTTPException(status_code=504, detail=str(e))
+        except PdfExportError as e:
+            raise HTTPException(status_code=500, detail=f"PDF export failed: {e}")
+    
+    response = {
+        "message": "Resume tailored successfully", 
+        "pdf_path": stored_path(*parse_download_id(docx_id)), # Keeping key 'pdf_path' for generic naming, or change to 'file_path' if frontend adapts
+        "download_url": download_url(docx_id, filename)
+    }
+    if pdf_id:
+        response["pdf_download_url"] = download_url(pdf_id, with_ext(filename, ".pdf"))
     
-    # 4. Skip PDF conversion - Return DOCX directly
-    # tailored_pdf_path = docx_to_pdf(tailored_docx_path)
+    return response
+
+@app.post("/generate/batch")
+async def generate_batch_endpoint(request: BatchEditsRequest):
+    """Generate several tailored variants (different accepted edit sets) of one resume at once."""
+    if not request.variants:
+        raise HTTPException(status_code=400, detail="At least one variant is required")
+    if len(request.variants) > MAX_BATCH_VARIANTS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_VARIANTS} variants per request")
     
-    # extract just the filename for the download url
-    filename = os.path.basename(tailored_docx_path)
+    docx_path = _resolve_docx_path(request.filename)
+    if not docx_path:
+        return {"error": "Session expired or file not found. Please upload again."}
+    
+    # Parse once, clone + edit per variant, then publish all outputs in parallel
+    documents = await run_io(build_tailored_variants, docx_path, request.variants)
+    
+    stem = os.path.splitext(os.path.basename(docx_path))[0]
+    download_ids = await asyncio.gather(*(run_io(publish_document, doc) for doc in documents))
     
     return {
-        "message": "Resume tailored successfully", 
-        "pdf_path": tailored_docx_path, # Keeping key 'pdf_path' for generic naming, or change to 'file_path' if frontend adapts
-        "download_url": f"http://localhost:8000/download/{filename}"
+        "message": f"{len(download_ids)} resume variants tailored successfully",
+        "variants": [
+            {
+                "index": i,
+                "pdf_path": stored_path(*parse_download_id(download_id)),
+                "download_url": download_url(download_id, f"{stem}_tailored_{i + 1}.docx")
+            }
+            for i, download_id in enumerate(download_ids)
+        ]
     }
 
 # --- Application Tracker Endpoints ---
@@ -389,78 +684,112 @@ def get_jd(url: str = Form(...), session: Session = Depends(get_session)): # Rem
         "role": metadata.get("role", "")
     }
 
-@app.get("/applications", response_model=List[Application])
-def get_applications(
-    session: Session = Depends(get_session),
+@app.get("/applications")
+async def get_applications(
+    request: Request,
+    limit: int = APPLICATIONS_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    company: Optional[str] = None,
+    sort: str = "date_desc",
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user)
 ):
-    applications = session.exec(select(Application).where(Application.user_id == current_user.id)).all()
-    return applications
+    """One page of the user's applications, without job descriptions (see GET /applications/{id})."""
+    if sort not in APPLICATION_SORTS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of {', '.join(APPLICATION_SORTS)}")
+    limit = max(1, min(limit, APPLICATIONS_MAX_PAGE_SIZE))
+    try:
+        query = build_page_query(current_user.id, sort, limit, cursor, status, company)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    rows = (await session.exec(query)).all()
+    body = json.dumps(jsonable_encoder(build_page(rows, sort, limit))).encode()
+    digest = page_digest(body)
+    # no-cache: the browser keeps the page but revalidates it, getting a 304 while nothing changed
+    headers = {"ETag": "W/" + etag_for(digest), "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), digest):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@app.get("/applications/{application_id}", response_model=Application)
+async def get_application(
+    application_id: int,
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_user)
+):
+    app = await session.get(Application, application_id)
+    if not app or app.user_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Application not found")
+    return app
 
-@app.post("/applications", response_model=Application)
+def _new_application_resume(filename: str) -> str:
+    os.makedirs("application_resumes", exist_ok=True)
+    # Timestamp prefix avoids collisions
+    timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
+    return os.path.join("application_resumes", f"{timestamp}_{safe_filename(filename)}")
+
+@app.post(
+    "/applications",
+    response_model=Application,
+    openapi_extra=upload_form_schema("resume", ("company_name", "job_role"), ("job_link", "status", "job_description")),
+)
 async def create_application(
-    company_name: str = Form(...),
-    job_role: str = Form(...),
-    job_link: str = Form(None),
-    status: str = Form("Applied"),
-    job_description: str = Form(None),
-    resume: UploadFile = File(...),
-    session: Session = Depends(get_session),
+    request: Request,
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user)
 ):
     # Save resume specifically for this application
-    os.makedirs("application_resumes", exist_ok=True)
-    # create a unique filename to avoid collisions
-    timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-    safe_filename = f"{timestamp}_{resume.filename}"
-    file_location = os.path.join("application_resumes", safe_filename)
-    
-    with open(file_location, "wb+") as file_object:
-        file_object.write(await resume.read())
+    try:
+        upload = await _receive_resume(request, _new_application_resume, ("company_name", "job_role"))
+    except PoolSaturatedError:
+        raise HTTPException(status_code=503, detail="Server is busy, please try again shortly.")
+    fields = upload.fields
 
     application = Application(
         user_id=current_user.id,
-        company_name=company_name,
-        job_role=job_role,
-        job_link=job_link,
-        status=status,
-        job_description=job_description,
-        resume_path=file_location
+        company_name=fields["company_name"],
+        job_role=fields["job_role"],
+        job_link=fields.get("job_link"),
+        status=fields.get("status", "Applied"),
+        job_description=fields.get("job_description"),
+        resume_path=upload.path
     )
     session.add(application)
-    session.commit()
-    session.refresh(application)
+    await session.commit()
+    await session.refresh(application)
     return application
 
 @app.delete("/applications/{application_id}")
-def delete_application(
+async def delete_application(
     application_id: int, 
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user)
 ):
-    app = session.get(Application, application_id)
+    app = await session.get(Application, application_id)
     if not app or app.user_id != current_user.id:
         raise HTTPException(status_code=404, detail="Application not found")
     
     # Delete file if exists (optional, safely)
     if app.resume_path and os.path.exists(app.resume_path):
         try:
-            os.remove(app.resume_path)
+            await run_io(os.remove, app.resume_path)
         except:
             pass
             
-    session.delete(app)
-    session.commit()
+    await session.delete(app)
+    await session.commit()
     return {"ok": True}
 
 @app.patch("/applications/{application_id}/status")
-def update_status(
+async def update_status(
     application_id: int, 
     status: str = Form(...), 
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user)
 ):
-    app = session.get(Application, application_id)
+    app = await session.get(Application, application_id)
     if not app or app.user_id != current_user.id:
         raise HTTPException(status_code=404, detail="Application not found")
     
@@ -472,45 +801,45 @@ def update_status(
     event = TimelineEvent(application_id=app.id, title="Status Change", description=f"Status changed from {old_status} to {status}")
     session.add(event)
     
-    session.commit()
-    session.refresh(app)
+    await session.commit()
+    await session.refresh(app)
     return app
 
 @app.get("/applications/{application_id}/timeline", response_model=List[TimelineEvent])
-def get_timeline(
+async def get_timeline(
     application_id: int, 
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user)
 ):
     # Verify ownership
-    app = session.get(Application, application_id)
+    app = await session.get(Application, application_id)
     if not app or app.user_id != current_user.id:
         raise HTTPException(status_code=404, detail="Application not found")
 
-    events = session.exec(select(TimelineEvent).where(TimelineEvent.application_id == application_id).order_by(TimelineEvent.date.desc())).all()
+    events = (await session.exec(select(TimelineEvent).where(TimelineEvent.application_id == application_id).order_by(TimelineEvent.date.desc()))).all()
     return events
 
 @app.post("/applications/{application_id}/timeline")
-def add_timeline_event(
+async def add_timeline_event(
     application_id: int, 
     title: str = Form(...), 
     description: str = Form(None), 
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user)
 ):
     # Verify ownership
-    app = session.get(Application, application_id)
+    app = await session.get(Application, application_id)
     if not app or app.user_id != current_user.id:
         raise HTTPException(status_code=404, detail="Application not found")
 
     event = TimelineEvent(application_id=application_id, title=title, description=description)
     session.add(event)
-    session.commit()
-    session.refresh(event)
+    await session.commit()
+    await session.refresh(event)
     return event
 
 @app.post("/api/survey")
-def submit_survey(survey: SurveySubmit, session: Session = Depends(get_session)):
+async def submit_survey(survey: SurveySubmit, session: AsyncSession = Depends(get_async_session)):
     new_response = SurveyResponse(
         email=survey.email,
         interested=survey.interested,
@@ -518,8 +847,8 @@ def submit_survey(survey: SurveySubmit, session: Session = Depends(get_session))
         feedback=survey.feedback
     )
     session.add(new_response)
-    session.commit()
-    session.refresh(new_response)
+    await session.commit()
+    await session.refresh(new_response)
     return {"message": "Survey submitted successfully", "id": new_response.id}
 
 class SaveResumeRequest(BaseModel):
@@ -535,39 +864,38 @@ class SaveResumeRequest(BaseModel):
     job_description: Optional[str] = None
 
 @app.post("/api/resume/save")
-def save_resume(
+async def save_resume(
     req: SaveResumeRequest,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user)
 ):
-    import json
-    
-    # Persist the temp file to a permanent location
+    # Persist the scratch files to a permanent location
     os.makedirs("saved_resumes", exist_ok=True)
-    temp_path = req.filename
     # Handle both PDF and DOCX versions
-    temp_docx = temp_path.replace(".pdf", ".docx")
+    temp_path = scratch.resolve(req.filename, ".pdf")
+    temp_docx = scratch.resolve(req.filename, ".docx")
     
-    saved_path = os.path.join("saved_resumes", req.filename)
-    saved_docx_path = os.path.join("saved_resumes", req.filename.replace(".pdf", ".docx"))
+    saved_name = os.path.basename(req.filename)
+    saved_path = os.path.join("saved_resumes", saved_name)
+    saved_docx_path = os.path.join("saved_resumes", with_ext(saved_name, ".docx"))
     
-    if os.path.exists(temp_path):
-        shutil.copy2(temp_path, saved_path)
-    if os.path.exists(temp_docx):
-        shutil.copy2(temp_docx, saved_docx_path)
+    if temp_path:
+        await run_io(shutil.copy2, temp_path, saved_path)
+    if temp_docx:
+        await run_io(shutil.copy2, temp_docx, saved_docx_path)
 
     saved_resume = SavedResume(
         user_id=current_user.id,
         filename=req.filename,
-        original_text=req.original_text,
-        tailored_text=req.tailored_text,
-        tailored_sections_json=json.dumps(req.tailored_sections),
         initial_score=req.initial_score,
         projected_score=req.projected_score
     )
-    session.add(saved_resume)
-    session.commit()
-    session.refresh(saved_resume)
+    # Texts go to the compressed blob table; the row only keeps their digests
+    await session.run_sync(
+        store_resume_payload, saved_resume, req.tailored_text, req.tailored_sections, original_text=req.original_text
+    )
+    await session.commit()
+    await session.refresh(saved_resume)
     
     # Auto-create application if company/role provided
     application_id = None
@@ -582,8 +910,8 @@ def save_resume(
             resume_path=saved_path if os.path.exists(saved_path) else None 
         )
         session.add(new_app)
-        session.commit()
-        session.refresh(new_app)
+        await session.commit()
+        await session.refresh(new_app)
         application_id = new_app.id
     
     return {
@@ -593,45 +921,41 @@ def save_resume(
     }
 
 @app.get("/api/resume/{resume_id}")
-def get_resume(
+async def get_resume(
     resume_id: int,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user)
 ):
-    resume = session.get(SavedResume, resume_id)
+    resume = await session.get(SavedResume, resume_id)
     if not resume or resume.user_id != current_user.id:
         raise HTTPException(status_code=404, detail="Resume not found")
         
-    import json
+    payload = await session.run_sync(load_resume_payload, resume)
     return {
         "id": resume.id,
         "filename": resume.filename,
-        "original_text": resume.original_text,
-        "tailored_text": resume.tailored_text,
-        "tailored_sections": json.loads(resume.tailored_sections_json),
+        "original_text": payload["original_text"],
+        "tailored_text": payload["tailored_text"],
+        "tailored_sections": payload["tailored_sections"],
         "created_at": resume.created_at,
         "initial_score": resume.initial_score,
         "projected_score": resume.projected_score
     }
 
 @app.patch("/api/resume/{resume_id}")
-def update_resume(
+async def update_resume(
     resume_id: int,
     req: SaveResumeRequest,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user)
 ):
-    import json
-    resume = session.get(SavedResume, resume_id)
+    resume = await session.get(SavedResume, resume_id)
     if not resume or resume.user_id != current_user.id:
         raise HTTPException(status_code=404, detail="Resume not found")
         
-    resume.tailored_text = req.tailored_text
-    resume.tailored_sections_json = json.dumps(req.tailored_sections)
-    
-    session.add(resume)
-    session.commit()
-    session.refresh(resume)
+    await session.run_sync(store_resume_payload, resume, req.tailored_text, req.tailored_sections)
+    await session.commit()
+    await session.refresh(resume)
     return {"message": "Resume updated successfully", "id": resume.id}
 
 if __name__ == "__main__":
@@ -0,0 +1,203 @@
+"""
+Per-task model routing for LLM calls.
+
+Callers name a task ("metadata", "scoring", "gap_analysis", "section_analysis") instead of a
+model, and LLM_TASK_MODELS picks the model for it, so cheap tasks can run on a fast model while
+the gap analysis stays on a large one. Every routed call parses its answer; when a model
+returns invalid JSON (or JSON the caller's parser rejects) the call is repeated once on
+LLM_FALLBACK_MODEL. Latency (p50 and average), token usage, invalid answers and fallbacks are
+recorded per task for /api/metrics/workers. Calls go through the shared LLMGateway, so its
+retries, connection pool and per-model limits apply unchanged.
+"""
+import json
+import os
+import statistics
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional
+
+from llm_client import LLMGateway, llm
+
+DEFAULT_TASK_MODELS = {
+    "metadata": "gpt-4o-mini",
+    "scoring": "gpt-4o-mini",
+    "gap_analysis": "gpt-4o",
+    "section_analysis": "gpt-4o",
+}
+LLM_TASK_MODELS = os.getenv("LLM_TASK_MODELS", "")
+LLM_FALLBACK_MODEL = os.getenv("LLM_FALLBACK_MODEL", "gpt-4o")
+# Latency samples kept per task for the p50
+LATENCY_WINDOW = 500
+
+
+def parse_task_models(spec: str) -> Dict[str, str]:
+    """"metadata=gpt-4o-mini, scoring=gpt-4o" -> {"metadata": "gpt-4o-mini", "scoring": "gpt-4o"}"""
+    models = {}
+    for item in spec.split(","):
+        task, _, model = item.partition("=")
+        if task.strip() and model.strip():
+            models[task.strip()] = model.strip()
+    return models
+
+
+def load_json_object(content: str) -> Dict:
+    """The answer as a JSON object; ValueError for anything else (truncated JSON, a bare list)."""
+    data = json.loads(content or "")
+    if not isinstance(data, dict):
+        raise ValueError(f"expected a JSON object, got {type(data).__name__}")
+    return data
+
+
+@dataclass
+class RoutedResponse:
+    response: Any # The chat completion the data came from
+    data: Any # What the parser made of its content
+    model: str
+    fell_back: bool = False
+
+
+class TaskStats:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.invalid_output = 0
+        self.fallbacks = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.models: Dict[str, int] = {}
+        self.latencies_ms: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+
+    def record(self, model: str, started_at: float, response=None):
+        self.calls += 1
+        self.models[model] = self.models.get(model, 0) + 1
+        self.latencies_ms.append((time.perf_counter() - started_at) * 1000)
+        usage = getattr(response, "usage", None)
+        if isinstance(getattr(usage, "prompt_tokens", None), int):
+            self.prompt_tokens += usage.prompt_tokens
+            self.completion_tokens += usage.completion_tokens or 0
+
+    def to_dict(self) -> Dict:
+        latencies = list(self.latencies_ms)
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "invalid_output": self.invalid_output,
+            "fallbacks": self.fallbacks,
+            "p50_ms": round(statistics.median(latencies), 1) if latencies else 0.0,
+            "avg_ms": round(sum(latencies) / len(latencies), 1) if latencies else 0.0,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "models": dict(self.models),
+        }
+
+
+class ModelRouter:
+    def __init__(
+        self,
+        gateway: LLMGateway,
+        task_models: Optional[Dict[str, str]] = None,
+        fallback_model: str = LLM_FALLBACK_MODEL,
+    ):
+        self.gateway = gateway
+        self.task_models = {**DEFAULT_TASK_MODELS, **(parse_task_models(LLM_TASK_MODELS) if task_models is None else task_models)}
+        self.fallback_model = fallback_model
+        self._stats: Dict[str, TaskStats] = {}
+
+    def model_for(self, task: str) -> str:
+        return self.task_models.get(task, self.fallback_model)
+
+    def _task(self, task: str) -> TaskStats:
+        if task not in self._stats:
+            self._stats[task] = TaskStats()
+        return self._stats[task]
+
+    def _should_fall_back(self, task: str, model: str, error: Exception) -> bool:
+        self._task(task).invalid_output += 1
+        if not self.fallback_model or model == self.fallback_model:
+            return False
+        self._task(task).fallbacks += 1
+        print(f"{task}: invalid output from {model} ({error}), retrying on {self.fallback_model}")
+        return True
+
+    def complete(self, task: str, messages: List[Dict], parse: Callable[[str], Any] = load_json_object, **kwargs) -> RoutedResponse:
+        """Chat completion on the task's model, parsed with `parse`; ValueError if no model's answer parses."""
+        model = self.model_for(task)
+        try:
+            return self._call(task, model, messages, parse, **kwargs)
+        except ValueError as e:
+            if not self._should_fall_back(task, model, e):
+                raise
+        routed = self._call(task, self.fallback_model, messages, parse, **kwargs)
+        routed.fell_back = True
+        return routed
+
+    def _call(self, task: str, model: str, messages: List[Dict], parse, **kwargs) -> RoutedResponse:
+        stats = self._task(task)
+        started_at = time.perf_counter()
+        try:
+            response = self.gateway.complete(model, messages, **kwargs)
+        except Exception:
+            stats.errors += 1
+            raise
+        stats.record(model, started_at, response)
+        return RoutedResponse(response, parse(response.choices[0].message.content), model)
+
+    async def acomplete(self, task: str, messages: List[Dict], parse: Callable[[str], Any] = load_json_object, **kwargs) -> RoutedResponse:
+        model = self.model_for(task)
+        try:
+            return await self._acall(task, model, messages, parse, **kwargs)
+        except ValueError as e:
+            if not self._should_fall_back(task, model, e):
+                raise
+        return await self.afallback(task, messages, parse, **kwargs)
+
+    async def afallback(self, task: str, messages: List[Dict], parse: Callable[[str], Any] = load_json_object, **kwargs) -> RoutedResponse:
+        """The call repeated on the fallback model, for callers that detect invalid output themselves."""
+        routed = await self._acall(task, self.fallback_model, messages, parse, **kwargs)
+        routed.fell_back = True
+        return routed
+
+    async def _acall(self, task: str, model: str, messages: List[Dict], parse, **kwargs) -> RoutedResponse:
+        stats = self._task(task)
+        started_at = time.perf_counter()
+        try:
+            response = await self.gateway.acomplete(model, messages, **kwargs)
+        except Exception:
+            stats.errors += 1
+            raise
+        stats.record(model, started_at, response)
+        return RoutedResponse(response, parse(response.choices[0].message.content), model)
+
+    async def astream(self, task: str, messages: List[Dict], **kwargs) -> AsyncIterator:
+        """
+        Streamed chunks from the task's model, timed until the stream ends. The content can
+        only be checked once it is complete: callers use should_fall_back/afallback for that.
+        """
+        model = self.model_for(task)
+        stats = self._task(task)
+        started_at = time.perf_counter()
+        stream = self.gateway.astream(model, messages, **kwargs)
+        try:
+            async for chunk in stream:
+                yield chunk
+        except Exception:
+            stats.errors += 1
+            raise
+        finally:
+            await stream.aclose()
+        stats.record(model, started_at)
+
+    def should_fall_back(self, task: str, error: Exception) -> bool:
+        """Record invalid streamed output; True if a fallback model is available for it."""
+        return self._should_fall_back(task, self.model_for(task), error)
+
+    def stats(self) -> Dict:
+        return {
+            "task_models": dict(self.task_models),
+            "fallback_model": self.fallback_model,
+            "tasks": {task: stats.to_dict() for task, stats in self._stats.items()},
+        }
+
+
+router = ModelRouter(llm)
@@ -1,5 +1,6 @@
 from datetime import datetime
 from typing import Optional, List
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel, Relationship
 
 class User(SQLModel, table=True):
@@ -14,6 +15,13 @@ class User(SQLModel, table=True):
     saved_resumes: List["SavedResume"] = Relationship(back_populates="user")
 
 class Application(SQLModel, table=True):
+    # Keyset pagination of the tracker list (tracker.py), one index per sort order
+    __table_args__ = (
+        Index("ix_application_user_date", "user_id", "date_applied", "id"),
+        Index("ix_application_user_company", "user_id", "company_name", "id"),
+        Index("ix_application_user_status", "user_id", "status", "date_applied"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="user.id", index=True)
     company_name: str
@@ -52,9 +60,13 @@ class SavedResume(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="user.id", index=True)
     filename: str
-    original_text: str
-    tailored_text: str
-    tailored_sections_json: str # Storing the JSON structure as text
+    # Payloads live in TextBlob; these inline columns only hold rows saved before the split
+    original_text: str = Field(default="")
+    tailored_text: str = Field(default="")
+    tailored_sections_json: str = Field(default="")
+    original_text_digest: Optional[str] = None # TextBlob.digest
+    tailored_text_digest: Optional[str] = None
+    tailored_sections_digest: Optional[str] = None
     initial_score: int = Field(default=0)
     projected_score: int = Field(default=0)
     created_at: datetime = Field(default_factory=datetime.now)
@@ -63,12 +75,56 @@ class SavedResume(SQLModel, table=True):
     user: Optional[User] = Relationship(back_populates="saved_resumes")
     application: Optional[Application] = Relationship(back_populates="saved_resume")
 
+class TextBlob(SQLModel, table=True):
+    # Compressed, content-addressed payloads; identical texts are stored once
+    digest: str = Field(primary_key=True) # sha256 of the UTF-8 text
+    data: bytes # zlib-compressed text
+    size: int # Uncompressed bytes
+    created_at: datetime = Field(default_factory=datetime.now)
+
 class UsageLog(SQLModel, table=True):
+    # Covers the anonymous quota COUNT(*) so it never touches the table rows
+    __table_args__ = (Index("ix_usagelog_quota", "ip_address", "user_id", "created_at"),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
     ip_address: str = Field(index=True)
     user_id: Optional[int] = Field(default=None, index=True)
     action: str = Field(default="tailor") # e.g. "tailor" or "generate"
+    created_at: datetime = Field(default_factory=datetime.now, index=True)
+
+class UsageDailyRollup(SQLModel, table=True):
+    # Per-day totals of UsageLog rows that have been pruned
+    __table_args__ = (Index("ix_usagedailyrollup_day_ip", "day", "ip_address"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    day: str # YYYY-MM-DD
+    ip_address: str
+    user_id: Optional[int] = None
+    action: str
+    count: int
+
+class AnalysisCacheEntry(SQLModel, table=True):
+    cache_key: str = Field(primary_key=True) # sha256 of (resume bytes, JD, prompt version, model)
+    result_json: str # Serialized AnalysisResult dict
+    docx_path: str # Cached copy of the converted + sanitized DOCX
     created_at: datetime = Field(default_factory=datetime.now)
+    last_accessed_at: datetime = Field(default_factory=datetime.now, index=True)
+    hit_count: int = Field(default=0)
+
+class AnalysisJob(SQLModel, table=True):
+    id: str = Field(primary_key=True) # uuid4 hex, returned to the client
+    status: str = Field(default="queued", index=True) # queued | running | done | failed
+    stage: str = Field(default="uploaded") # uploaded -> converted -> analyzed -> scored
+    pdf_path: str
+    job_description: str
+    resume_digest: str
+    user_id: Optional[int] = Field(default=None, index=True)
+    result_json: Optional[str] = None
+    error: Optional[str] = None
+    attempts: int = Field(default=0)
+    worker_id: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.now, index=True)
+    updated_at: datetime = Field(default_factory=datetime.now)
 
 # Update User model to include relationship
 # We need to do this carefully if User is already defined above without this field.
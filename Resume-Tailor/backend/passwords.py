@@ -0,0 +1,44 @@
+"""
+bcrypt password hashing with a configurable cost.
+
+BCRYPT_ROUNDS sets the cost of new hashes. Hashes made with a different cost still
+verify; needs_rehash() tells the login handler to replace them, so raising (or lowering)
+the cost upgrades accounts as users sign in. Every call here is slow on purpose, run
+them through workers.run_hash.
+"""
+import os
+from typing import Optional
+
+import bcrypt
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+
+def get_password_hash(password: str, rounds: Optional[int] = None) -> str:
+    """Hash a password using direct bcrypt."""
+    salt = bcrypt.gensalt(rounds=rounds or BCRYPT_ROUNDS)
+    hashed = bcrypt.hashpw(password.encode("utf-8"), salt)
+    return hashed.decode("utf-8")
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a plain password against a hash using direct bcrypt."""
+    try:
+        return bcrypt.checkpw(
+            plain_password.encode("utf-8"),
+            hashed_password.encode("utf-8")
+        )
+    except Exception:
+        return False
+
+
+def hash_rounds(hashed_password: str) -> int:
+    """Cost factor of a bcrypt hash ("$2b$12$..." -> 12), 0 if it can't be read."""
+    try:
+        return int(hashed_password.split("$")[2])
+    except (IndexError, ValueError):
+        return 0
+
+
+def needs_rehash(hashed_password: str, rounds: Optional[int] = None) -> bool:
+    return hash_rounds(hashed_password) != (rounds or BCRYPT_ROUNDS)
@@ -0,0 +1,397 @@
+"""
+DOCX -> PDF export backends.
+
+PDF_EXPORT_BACKEND selects the implementation:
+    auto         LibreOffice if soffice is installed, Word on Windows, otherwise none
+    libreoffice  headless soffice instances (Linux containers, macOS, Windows)
+    word         Microsoft Word through docx2pdf/COM (Windows only)
+    none         PDF export disabled
+
+The LibreOffice backend keeps SOFFICE_INSTANCES long-lived soffice processes, each
+driven over UNO by a soffice_worker.py helper. Requests wait in a queue for a free
+instance (up to PDF_EXPORT_QUEUE_TIMEOUT) and an instance that takes longer than
+PDF_EXPORT_TIMEOUT is killed and restarted on next use. When no Python with the
+`uno` module is available, each export runs `soffice --convert-to pdf` instead,
+still on a bounded set of warm per-instance profiles.
+"""
+import json
+import os
+import queue
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, List, Optional
+
+PDF_EXPORT_BACKEND = os.getenv("PDF_EXPORT_BACKEND", "auto")
+SOFFICE_PATH = os.getenv("SOFFICE_PATH", "")
+SOFFICE_PYTHON = os.getenv("SOFFICE_PYTHON", "")
+SOFFICE_INSTANCES = int(os.getenv("SOFFICE_INSTANCES", "2"))
+SOFFICE_PROFILE_DIR = os.getenv("SOFFICE_PROFILE_DIR", os.path.join(tempfile.gettempdir(), "resume_tailor_soffice"))
+SOFFICE_STARTUP_TIMEOUT = float(os.getenv("SOFFICE_STARTUP_TIMEOUT", "30"))
+PDF_EXPORT_TIMEOUT = float(os.getenv("PDF_EXPORT_TIMEOUT", "60"))
+PDF_EXPORT_QUEUE_TIMEOUT = float(os.getenv("PDF_EXPORT_QUEUE_TIMEOUT", "30"))
+
+HELPER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "soffice_worker.py")
+
+
+class PdfExportError(RuntimeError):
+    """The export failed."""
+
+
+class PdfExportUnavailable(PdfExportError):
+    """No export backend is configured or installed on this server."""
+
+
+class PdfExportBusy(PdfExportError):
+    """Every export instance stayed busy for PDF_EXPORT_QUEUE_TIMEOUT."""
+
+
+class PdfExportTimeout(PdfExportError):
+    """A single export took longer than PDF_EXPORT_TIMEOUT."""
+
+
+class ExportBackend(ABC):
+    name = "base"
+
+    def __init__(self):
+        self.exports = 0
+        self.failures = 0
+        self.timeouts = 0
+        self._total_ms = 0.0
+        self._stats_lock = threading.Lock()
+
+    def export(self, docx_path: str, pdf_path: str) -> str:
+        started = time.perf_counter()
+        try:
+            self._convert(os.path.abspath(docx_path), os.path.abspath(pdf_path))
+        except PdfExportTimeout:
+            with self._stats_lock:
+                self.timeouts += 1
+                self.failures += 1
+            raise
+        except Exception:
+            with self._stats_lock:
+                self.failures += 1
+            raise
+        with self._stats_lock:
+            self.exports += 1
+            self._total_ms += (time.perf_counter() - started) * 1000
+        return pdf_path
+
+    @abstractmethod
+    def _convert(self, docx_path: str, pdf_path: str):
+        """Write pdf_path from docx_path (both absolute), raising on failure."""
+
+    def warm_up(self):
+        pass
+
+    def shutdown(self):
+        pass
+
+    def stats(self) -> Dict:
+        return {
+            "backend": self.name,
+            "exports": self.exports,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "avg_export_ms": round(self._total_ms / self.exports, 1) if self.exports else 0.0,
+        }
+
+
+class UnavailableBackend(ExportBackend):
+    name = "none"
+
+    def _convert(self, docx_path: str, pdf_path: str):
+        raise PdfExportUnavailable("PDF export is not available on this server")
+
+
+class WordBackend(ExportBackend):
+    """Microsoft Word via docx2pdf. Word automation is not thread safe, so exports are serialized."""
+
+    name = "word"
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+
+    def _convert(self, docx_path: str, pdf_path: str):
+        # Windows-only dependencies, imported on first use so the module loads everywhere
+        import pythoncom
+        from docx2pdf import convert
+
+        with self._lock:
+            # Initialize COM library for this thread
+            pythoncom.CoInitialize()
+            convert(docx_path, pdf_path)
+
+
+# --- LibreOffice ---
+
+def find_soffice() -> Optional[str]:
+    candidates = [SOFFICE_PATH, shutil.which("soffice"), shutil.which("libreoffice"),
+                  "/Applications/LibreOffice.app/Contents/MacOS/soffice",
+                  r"C:\Program Files\LibreOffice\program\soffice.exe"]
+    for candidate in candidates:
+        if candidate and os.path.exists(candidate):
+            return candidate
+    return None
+
+
+def find_uno_python(soffice: str) -> Optional[str]:
+    """A Python interpreter that can `import uno`: configured, bundled with LibreOffice, or the system one."""
+    program_dir = os.path.dirname(os.path.realpath(soffice))
+    candidates = [SOFFICE_PYTHON, os.path.join(program_dir, "python"), os.path.join(program_dir, "python.exe"),
+                  "/usr/bin/python3", sys.executable]
+    for candidate in candidates:
+        if not candidate or not os.path.exists(candidate):
+            continue
+        try:
+            probe = subprocess.run([candidate, "-c", "import uno"], capture_output=True, timeout=15)
+        except (OSError, subprocess.TimeoutExpired):
+            continue
+        if probe.returncode == 0:
+            return candidate
+    return None
+
+
+def _office_args(soffice: str, profile_dir: str) -> List[str]:
+    # A private profile per instance: soffice locks its profile, so instances can't share one
+    return [soffice, "--headless", "--invisible", "--nologo", "--norestore", "--nodefault", "--nolockcheck",
+            f"-env:UserInstallation={Path(profile_dir).absolute().as_uri()}"]
+
+
+def _stop_process(proc: Optional[subprocess.Popen]):
+    if proc is None or proc.poll() is not None:
+        return
+    proc.terminate()
+    try:
+        proc.wait(timeout=5)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+
+
+class _UnoInstance:
+    """One long-lived soffice process plus the soffice_worker.py helper that drives it."""
+
+    def __init__(self, index: int, soffice: str, uno_python: str):
+        self.index = index
+        self.soffice = soffice
+        self.uno_python = uno_python
+        self.profile_dir = os.path.join(SOFFICE_PROFILE_DIR, f"instance_{index}")
+        self.office: Optional[subprocess.Popen] = None
+        self.helper: Optional[subprocess.Popen] = None
+        self._replies: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._start_lock = threading.Lock()
+        self.restarts = 0
+
+    @property
+    def alive(self) -> bool:
+        return self.helper is not None and self.helper.poll() is None and self.office.poll() is None
+
+    def start(self):
+        connection = f"pipe,name=resume_tailor_{os.getpid()}_{self.index};urp"
+        self.office = subprocess.Popen(
+            _office_args(self.soffice, self.profile_dir) + [f"--accept={connection};"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        self.helper = subprocess.Popen(
+            [self.uno_python, HELPER_SCRIPT, connection, str(SOFFICE_STARTUP_TIMEOUT)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, bufsize=1,
+        )
+        self._replies = queue.Queue()
+        threading.Thread(target=self._read_replies, args=(self.helper, self._replies), daemon=True).start()
+
+        try:
+            ready = self._next_reply(SOFFICE_STARTUP_TIMEOUT)
+        except queue.Empty:
+            ready = None
+        if ready is None:
+            self.stop()
+            raise PdfExportError(f"LibreOffice instance {self.index} failed to start")
+
+    @staticmethod
+    def _read_replies(helper: subprocess.Popen, replies: queue.Queue):
+        for line in helper.stdout:
+            replies.put(line)
+        replies.put(None) # Helper exited
+
+    def _next_reply(self, timeout: float) -> Optional[Dict]:
+        line = self._replies.get(timeout=timeout)
+        return json.loads(line) if line is not None else None
+
+    def ensure_started(self):
+        # Warm-up runs in a background thread, so guard against starting twice
+        with self._start_lock:
+            if self.alive:
+                return
+            if self.office is not None:
+                self.restarts += 1
+            self.stop()
+            self.start()
+
+    def convert(self, docx_path: str, pdf_path: str, timeout: float):
+        self.ensure_started()
+        self.helper.stdin.write(json.dumps({"docx": docx_path, "pdf": pdf_path}) + "\n")
+        self.helper.stdin.flush()
+        try:
+            reply = self._next_reply(timeout)
+        except queue.Empty:
+            # Hung conversion: kill the instance, it is restarted on next use
+            self.stop()
+            raise PdfExportTimeout(f"PDF export timed out after {timeout:.0f}s")
+
+        if reply is None:
+            self.stop()
+            raise PdfExportError("LibreOffice instance exited during export")
+        if not reply.get("ok"):
+            raise PdfExportError(reply.get("error", "LibreOffice export failed"))
+
+    def stop(self):
+        if self.helper is not None and self.helper.poll() is None:
+            try:
+                self.helper.stdin.close()
+            except OSError:
+                pass
+        _stop_process(self.helper)
+        _stop_process(self.office)
+
+
+class _CliInstance:
+    """Fallback without UNO: one `soffice --convert-to` run per export, on this instance's warm profile."""
+
+    def __init__(self, index: int, soffice: str):
+        self.index = index
+        self.soffice = soffice
+        self.profile_dir = os.path.join(SOFFICE_PROFILE_DIR, f"instance_{index}")
+        self.out_dir = os.path.join(SOFFICE_PROFILE_DIR, f"out_{index}")
+        self.restarts = 0
+
+    def ensure_started(self):
+        os.makedirs(self.out_dir, exist_ok=True)
+
+    def convert(self, docx_path: str, pdf_path: str, timeout: float):
+        os.makedirs(self.out_dir, exist_ok=True)
+        try:
+            result = subprocess.run(
+                _office_args(self.soffice, self.profile_dir) + ["--convert-to", "pdf", "--outdir", self.out_dir, docx_path],
+                capture_output=True, timeout=timeout,
+            )
+        except subprocess.TimeoutExpired:
+            raise PdfExportTimeout(f"PDF export timed out after {timeout:.0f}s")
+
+        produced = os.path.join(self.out_dir, Path(docx_path).stem + ".pdf")
+        if result.returncode != 0 or not os.path.exists(produced):
+            raise PdfExportError(f"soffice failed: {result.stderr.decode(errors='replace').strip()[:500]}")
+        shutil.move(produced, pdf_path)
+
+    def stop(self):
+        pass
+
+
+class LibreOfficeBackend(ExportBackend):
+    name = "libreoffice"
+
+    def __init__(self, soffice: str, instances: int = SOFFICE_INSTANCES,
+                 timeout: float = PDF_EXPORT_TIMEOUT, queue_timeout: float = PDF_EXPORT_QUEUE_TIMEOUT):
+        super().__init__()
+        self.soffice = soffice
+        self.timeout = timeout
+        self.queue_timeout = queue_timeout
+        uno_python = find_uno_python(soffice)
+        self.mode = "uno" if uno_python else "cli"
+        self._instances = [
+            _UnoInstance(i, soffice, uno_python) if uno_python else _CliInstance(i, soffice)
+            for i in range(max(1, instances))
+        ]
+        self._idle: "queue.Queue" = queue.Queue()
+        for instance in self._instances:
+            self._idle.put(instance)
+        self.waiting = 0
+
+    def _convert(self, docx_path: str, pdf_path: str):
+        with self._stats_lock:
+            self.waiting += 1
+        try:
+            instance = self._idle.get(timeout=self.queue_timeout)
+        except queue.Empty:
+            raise PdfExportBusy(f"All {len(self._instances)} PDF export instances are busy")
+        finally:
+            with self._stats_lock:
+                self.waiting -= 1
+
+        try:
+            instance.convert(docx_path, pdf_path, self.timeout)
+        finally:
+            self._idle.put(instance)
+
+    def warm_up(self):
+        """Start every instance ahead of the first export (call from a background thread)."""
+        for instance in self._instances:
+            try:
+                instance.ensure_started()
+            except Exception as e:
+                print(f"PDF export warm-up failed for instance {instance.index}: {e}")
+
+    def shutdown(self):
+        for instance in self._instances:
+            instance.stop()
+
+    def stats(self) -> Dict:
+        stats = super().stats()
+        stats.update({
+            "mode": self.mode,
+            "instances": len(self._instances),
+            "idle": self._idle.qsize(),
+            "waiting": self.waiting,
+            "restarts": sum(instance.restarts for instance in self._instances),
+        })
+        return stats
+
+
+# --- Backend selection ---
+
+_backend: Optional[ExportBackend] = None
+_backend_lock = threading.Lock()
+
+
+def create_backend(name: str = PDF_EXPORT_BACKEND) -> ExportBackend:
+    name = name.lower()
+    if name in ("auto", "libreoffice"):
+        soffice = find_soffice()
+        if soffice:
+            return LibreOfficeBackend(soffice)
+        if name == "libreoffice":
+            print("PDF_EXPORT_BACKEND=libreoffice but soffice was not found, PDF export disabled")
+            return UnavailableBackend()
+    if name == "word" or (name == "auto" and os.name == "nt"):
+        return WordBackend()
+    return UnavailableBackend()
+
+
+def get_export_backend() -> ExportBackend:
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = create_backend()
+            print(f"PDF export backend: {_backend.name}")
+        return _backend
+
+
+def start_export_backend():
+    # Backend detection probes for soffice/uno, keep it off the startup path
+    threading.Thread(target=lambda: get_export_backend().warm_up(), daemon=True).start()
+
+
+def shutdown_export_backend():
+    if _backend is not None:
+        _backend.shutdown()
+
+
+def export_stats() -> Dict:
+    return get_export_backend().stats()
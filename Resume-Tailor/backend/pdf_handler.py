@@ -1,16 +1,18 @@
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
 from pdf2docx import Converter
-from docx2pdf import convert
-import pythoncom
 from docx import Document
 from docx.oxml.ns import qn
 
-def sanitize_docx_layout(docx_path: str):
+from scratch import with_ext
+
+def sanitize_document(doc):
     """
     Removes manual page breaks, section breaks, and restrictive paragraph properties 
-    to allow content to flow naturally.
+    to allow content to flow naturally. Works on an already opened Document.
     """
-    doc = Document(docx_path)
-    
     def clean_para(para):
         # Reset restrictive flow properties
         if para.paragraph_format.page_break_before:
@@ -22,8 +24,6 @@ def sanitize_docx_layout(docx_path: str):
             
         # Remove manual breaks (<w:br>) in runs
         for run in para.runs:
-            if 'lastRenderedPageBreak' in run._element.xml:
-                pass
             brs = run._element.findall(qn('w:br'))
             for br in brs:
                 run._element.remove(br)
@@ -50,33 +50,115 @@ def sanitize_docx_layout(docx_path: str):
                 
                 # Check for nested tables? python-docx only goes one level deep easily 
                 # but usually pdf2docx doesn't nest deeply.
-                
+
+def sanitize_docx_layout(docx_path: str):
+    """Open, sanitize and re-save a DOCX file (see sanitize_document)."""
+    doc = Document(docx_path)
+    sanitize_document(doc)
     doc.save(docx_path)
 
-def pdf_to_docx(pdf_path: str) -> str:
-    docx_path = pdf_path.replace(".pdf", ".docx")
+# --- PDF -> DOCX conversion ---
+# The steps below are plain functions so they can run in the CPU process pool.
+# Each returns its timings in milliseconds next to its result.
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 1)
+
+def count_pdf_pages(pdf_path: str) -> int:
     cv = Converter(pdf_path)
-    cv.convert(docx_path, start=0, end=None)
-    cv.close()
-    
-    # Sanitize immediately after conversion
-    sanitize_docx_layout(docx_path)
-    
+    try:
+        return len(cv.fitz_doc)
+    finally:
+        cv.close()
+
+def parse_pdf_pages(pdf_path: str, start: int = 0, end: Optional[int] = None) -> Tuple[Dict, Dict]:
+    """
+    Parse pages [start, end) of the PDF into pdf2docx's layout data (a plain dict,
+    cheap to send between processes). Returns (layout, timings).
+    """
+    timings = {}
+    started = time.perf_counter()
+    cv = Converter(pdf_path)
+    try:
+        settings = cv.default_settings
+        cv.load_pages(start, end)
+        timings["open_ms"] = _elapsed_ms(started)
+
+        started = time.perf_counter()
+        cv.parse_document(**settings)
+        timings["analyze_ms"] = _elapsed_ms(started)
+
+        started = time.perf_counter()
+        cv.parse_pages(**settings)
+        timings["parse_pages_ms"] = _elapsed_ms(started)
+        return cv.store(), timings
+    finally:
+        cv.close()
+
+def build_docx_from_layouts(pdf_path: str, layouts: List[Dict], docx_path: str) -> Dict:
+    """
+    Assemble parsed page layouts into one DOCX, sanitize it in memory and save it once.
+    Returns the timings of each step.
+    """
+    timings = {}
+    started = time.perf_counter()
+    cv = Converter(pdf_path)
+    skipped = 0
+    try:
+        for layout in layouts:
+            cv.restore(layout)
+
+        doc = Document()
+        for page in cv.pages:
+            if not page.finalized:
+                continue
+            # Like pdf2docx's ignore_page_error: one broken page shouldn't fail the whole resume
+            try:
+                page.make_docx(doc)
+            except Exception as e:
+                skipped += 1
+                print(f"Ignoring page {page.id + 1} of {os.path.basename(pdf_path)}: {e}")
+        timings["make_docx_ms"] = _elapsed_ms(started)
+        if skipped:
+            timings["skipped_pages"] = skipped
+    finally:
+        cv.close()
+
+    started = time.perf_counter()
+    sanitize_document(doc)
+    timings["sanitize_ms"] = _elapsed_ms(started)
+
+    started = time.perf_counter()
+    doc.save(docx_path)
+    timings["save_ms"] = _elapsed_ms(started)
+    return timings
+
+def convert_pdf_with_timings(pdf_path: str) -> Tuple[str, Dict]:
+    """Whole conversion inside one worker: parse all pages, build, sanitize, save."""
+    docx_path = with_ext(pdf_path, ".docx")
+    layout, timings = parse_pdf_pages(pdf_path)
+    timings.update(build_docx_from_layouts(pdf_path, [layout], docx_path))
+    return docx_path, timings
+
+def pdf_to_docx(pdf_path: str) -> str:
+    # Sanitizing happens on the in-memory document, before the only save
+    docx_path, _ = convert_pdf_with_timings(pdf_path)
     return docx_path
 
 def docx_to_pdf(docx_path: str) -> str:
-    # Initialize COM library for Windows
-    pythoncom.CoInitialize()
-    pdf_path = docx_path.replace(".docx", ".pdf")
+    """
+    Export a DOCX to PDF with the configured backend (see pdf_export).
+    Raises PdfExportError subclasses when export is unavailable, busy or times out.
+    """
+    from pdf_export import get_export_backend
+
+    pdf_path = with_ext(docx_path, ".pdf")
     
     # Ensure fresh export by deleting existing file if any
-    import os
     if os.path.exists(pdf_path):
         try:
             os.remove(pdf_path)
-        except:
+        except OSError:
             pass
             
-    convert(docx_path, pdf_path)
-    return pdf_path
-
+    return get_export_backend().export(docx_path, pdf_path)
@@ -0,0 +1,213 @@
+"""
+Token-budgeted prompt construction.
+
+Every component of a prompt (fixed instructions, resume, job description) is measured in
+tokens with tiktoken, and the whole prompt is fitted into an input budget instead of being
+cut at a character offset. The resume is kept whole when it fits, since edits have to quote
+it exactly; when it doesn't, whole lines are dropped from the end. The job description gets
+what's left: its sentences are ranked by how much they matter for this resume (requirement
+language, skills the resume mentions, terms the posting repeats; boilerplate last) and the
+best ones are kept in their original order, so long postings lose "About us" and benefits
+before they lose requirements. Each build returns a report with the token counts.
+
+Without tiktoken (or its encoding files, which are downloaded on first use) counts fall
+back to an estimate of one token per four bytes.
+"""
+import math
+import os
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Dict, List, Tuple
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+ANALYSIS_INPUT_TOKENS = int(os.getenv("ANALYSIS_INPUT_TOKENS", "12000"))
+SCORING_INPUT_TOKENS = int(os.getenv("SCORING_INPUT_TOKENS", "3000"))
+
+# The job description keeps at least this share of what the instructions leave over
+MIN_JD_SHARE = 0.25
+# Title/company lines at the top of a posting are always kept
+PINNED_JD_LINES = 2
+
+_STOPWORDS = set("""
+a an and are as at be by for from has have in is it its of on or our that the their this
+to we will with you your who what which about into over per than they them these those
+""".split())
+REQUIREMENT_CUES = ("must", "required", "requirement", "experience", "proficien", "knowledge",
+                     "familiar", "years", "degree", "qualification", "responsib", "skill", "ability", "expert")
+BOILERPLATE_CUES = ("equal opportunity", "benefits", "salary", "compensation", "about us", "apply now",
+                     "privacy", "accommodation", "perks", "paid time off", "401k", "diversity")
+_TERM = re.compile(r"[a-z][a-z0-9+#]*(?:[.\-][a-z0-9+#]+)*")
+
+_stats = {"prompts": 0, "input_tokens": 0, "jd_trimmed": 0, "resume_trimmed": 0}
+
+
+@lru_cache(maxsize=8)
+def _encoding(model: str):
+    if tiktoken is None:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        # Encoding files couldn't be loaded (offline, no cache)
+        print(f"tiktoken unavailable for {model}, estimating token counts: {e}")
+        return None
+
+
+def count_tokens(text: str, model: str) -> int:
+    if not text:
+        return 0
+    encoding = _encoding(model)
+    if encoding is None:
+        return math.ceil(len(text.encode("utf-8")) / 4)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def _terms(text: str) -> List[str]:
+    return [t for t in _TERM.findall(text.lower()) if t not in _STOPWORDS and len(t) > 1]
+
+
+def split_sentences(text: str) -> List[str]:
+    """Lines and sentences of a posting, bullets stripped."""
+    pieces = re.split(r"\n+|(?<=[.!?;])\s+(?=[A-Z0-9•\-\*])", text or "")
+    return [p.strip(" \t•*-") for p in pieces if p.strip(" \t•*-")]
+
+
+def rank_sentences(sentences: List[str], resume_text: str) -> List[Tuple[float, int]]:
+    """(score, index) pairs, most relevant first."""
+    resume_terms = set(_terms(resume_text))
+    jd_counts: Dict[str, int] = {}
+    sentence_terms = [_terms(s) for s in sentences]
+    for terms in sentence_terms:
+        for term in set(terms):
+            jd_counts[term] = jd_counts.get(term, 0) + 1
+
+    ranked = []
+    for index, (sentence, terms) in enumerate(zip(sentences, sentence_terms)):
+        lowered = sentence.lower()
+        if index < PINNED_JD_LINES:
+            ranked.append((float("inf"), index))
+            continue
+        if not terms:
+            ranked.append((-1.0, index))
+            continue
+        unique = set(terms)
+        # Skills the candidate mentions
+        overlap = len(unique & resume_terms) / math.sqrt(len(unique))
+        # Share of terms that recur, capped at 1 so repeated boilerplate can't outrank requirements
+        emphasis = sum(1 for t in unique if jd_counts[t] > 1) / len(unique)
+        score = 2 * overlap + emphasis
+        if any(cue in lowered for cue in REQUIREMENT_CUES):
+            score += 1.5
+        if any(cue in lowered for cue in BOILERPLATE_CUES):
+            score -= 3
+        ranked.append((score, index))
+    ranked.sort(key=lambda pair: (-pair[0], pair[1]))
+    return ranked
+
+
+def select_job_description(job_description: str, resume_text: str, budget: int, model: str) -> Tuple[str, Dict]:
+    """The most relevant JD sentences that fit in `budget` tokens, in posting order."""
+    total_tokens = count_tokens(job_description, model)
+    sentences = split_sentences(job_description)
+    if total_tokens <= budget:
+        return job_description, {"tokens": total_tokens, "sentences_kept": len(sentences), "sentences_total": len(sentences)}
+
+    kept, used = [], 0
+    for _, index in rank_sentences(sentences, resume_text):
+        cost = count_tokens(sentences[index], model) + 1 # newline
+        if used + cost > budget:
+            continue
+        kept.append(index)
+        used += cost
+    text = "\n".join(sentences[i] for i in sorted(kept))
+    return text, {"tokens": count_tokens(text, model), "sentences_kept": len(kept), "sentences_total": len(sentences)}
+
+
+def fit_lines(text: str, budget: int, model: str) -> Tuple[str, int]:
+    """Whole lines from the start of `text` up to `budget` tokens (never cuts inside a word)."""
+    tokens = count_tokens(text, model)
+    if tokens <= budget:
+        return text, tokens
+    kept, used = [], 0
+    for line in text.split("\n"):
+        cost = count_tokens(line, model) + 1
+        if used + cost > budget:
+            break
+        kept.append(line)
+        used += cost
+    text = "\n".join(kept)
+    return text, count_tokens(text, model)
+
+
+@dataclass
+class BudgetedPrompt:
+    text: str
+    report: Dict
+
+
+def build_prompt(
+    name: str,
+    template: Callable[[str, str], str],
+    resume_text: str,
+    job_description: str,
+    budget: int,
+    model: str,
+) -> BudgetedPrompt:
+    """
+    template(resume_text, job_description) -> prompt. Fits both inputs into `budget` tokens
+    together with the template's own text and reports where the tokens went.
+    """
+    instructions = count_tokens(template("", ""), model)
+    available = max(0, budget - instructions)
+    resume_tokens = count_tokens(resume_text, model)
+    jd_tokens = count_tokens(job_description, model)
+
+    jd_budget = min(jd_tokens, max(available - resume_tokens, int(available * MIN_JD_SHARE)))
+    fitted_resume, resume_used = fit_lines(resume_text, available - jd_budget, model)
+    # Whatever the resume didn't use goes back to the job description
+    fitted_jd, jd_report = select_job_description(job_description, resume_text, available - resume_used, model)
+
+    text = template(fitted_resume, fitted_jd)
+    report = {
+        "model": model,
+        "budget": budget,
+        "instructions": instructions,
+        "resume": resume_used,
+        "resume_original": resume_tokens,
+        "job_description": jd_report["tokens"],
+        "job_description_original": jd_tokens,
+        "jd_sentences_kept": jd_report["sentences_kept"],
+        "jd_sentences_total": jd_report["sentences_total"],
+        "total": count_tokens(text, model),
+    }
+    _stats["prompts"] += 1
+    _stats["input_tokens"] += report["total"]
+    _stats["jd_trimmed"] += int(jd_report["tokens"] < jd_tokens)
+    _stats["resume_trimmed"] += int(resume_used < resume_tokens)
+    print(
+        f"Prompt {name}: {report['total']}/{budget} tokens "
+        f"(instructions {instructions}, resume {resume_used}/{resume_tokens}, "
+        f"JD {jd_report['tokens']}/{jd_tokens}, {jd_report['sentences_kept']}/{jd_report['sentences_total']} JD sentences)"
+    )
+    return BudgetedPrompt(text, report)
+
+
+def with_usage(report: Dict, response) -> Dict:
+    """Add the token usage the API reported for the call, if any."""
+    usage = getattr(response, "usage", None)
+    if usage is not None:
+        report = {**report, "prompt_tokens": usage.prompt_tokens, "completion_tokens": usage.completion_tokens}
+    return report
+
+
+def prompt_stats() -> Dict:
+    prompts = _stats["prompts"]
+    return {**_stats, "avg_input_tokens": round(_stats["input_tokens"] / prompts) if prompts else 0}
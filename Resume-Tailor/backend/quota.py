@@ -0,0 +1,112 @@
+"""
+Anonymous usage quota backed by UsageLog.
+
+The daily check is a COUNT(*) answered from the (ip_address, user_id, created_at)
+index, and consuming a slot is a single INSERT ... SELECT guarded by that count. SQLite
+serializes writers, so that alone keeps concurrent requests from both taking the last
+free analysis; on PostgreSQL (READ COMMITTED) two transactions could both see the old
+count, so the insert first takes a transaction-scoped advisory lock on the IP. Old
+UsageLog rows are periodically rolled up into UsageDailyRollup and deleted, keeping the
+log small; the rollup holds an advisory lock too, so replicas can't count a day twice.
+"""
+import os
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy import DateTime, String, cast, func, insert, literal, null, text
+from sqlmodel import Session, delete, select
+
+from models import UsageLog, UsageDailyRollup
+
+ANONYMOUS_DAILY_LIMIT = int(os.getenv("ANONYMOUS_DAILY_LIMIT", "2"))
+USAGE_LOG_RETENTION_DAYS = int(os.getenv("USAGE_LOG_RETENTION_DAYS", "30"))
+USAGE_ROLLUP_INTERVAL_HOURS = float(os.getenv("USAGE_ROLLUP_INTERVAL_HOURS", "6"))
+
+
+# Advisory lock key of the rollup (any constant that no other lock in the app uses)
+ROLLUP_LOCK_KEY = 0x75736167 # "usag"
+
+
+def _is_postgres(session: Session) -> bool:
+    return session.get_bind().dialect.name == "postgresql"
+
+
+def start_of_day(now: Optional[datetime] = None) -> datetime:
+    return (now or datetime.now()).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def ensure_indexes(engine):
+    """create_all() doesn't add indexes to an existing usagelog table, so add them here."""
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_usagelog_quota ON usagelog (ip_address, user_id, created_at)"
+        ))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_usagelog_created_at ON usagelog (created_at)"))
+
+
+def _anonymous_today(client_ip: str, now: Optional[datetime] = None):
+    return (
+        UsageLog.ip_address == client_ip,
+        UsageLog.user_id == None,  # noqa: E711 (SQL IS NULL)
+        UsageLog.created_at >= start_of_day(now),
+    )
+
+
+def count_anonymous_usage(session: Session, client_ip: str) -> int:
+    return session.exec(
+        select(func.count()).select_from(UsageLog).where(*_anonymous_today(client_ip))
+    ).one()
+
+
+def try_consume_anonymous(session: Session, client_ip: str, action: str = "tailor", limit: int = ANONYMOUS_DAILY_LIMIT) -> bool:
+    """Log one anonymous use if the IP is still under today's limit. Returns False when the limit is reached."""
+    now = datetime.now()
+    if _is_postgres(session):
+        # Held until commit: the next request for this IP counts after this insert
+        session.execute(text("SELECT pg_advisory_xact_lock(hashtext(:key))"), {"key": f"quota:{client_ip}"})
+    used_today = select(func.count()).select_from(UsageLog).where(*_anonymous_today(client_ip, now)).scalar_subquery()
+    row = select(
+        literal(client_ip, String), null(), literal(action, String), literal(now, DateTime)
+    ).where(used_today < limit)
+
+    result = session.execute(
+        insert(UsageLog).from_select(["ip_address", "user_id", "action", "created_at"], row)
+    )
+    session.commit()
+    return result.rowcount == 1
+
+
+def log_usage(session: Session, client_ip: str, user_id: Optional[int], action: str = "tailor"):
+    session.add(UsageLog(ip_address=client_ip, user_id=user_id, action=action))
+    session.commit()
+
+
+def rollup_and_prune(session: Session, retention_days: int = USAGE_LOG_RETENTION_DAYS) -> Dict:
+    """
+    Fold UsageLog rows older than the retention window into per-day totals and delete them.
+    The cutoff is a day boundary, so every day is rolled up exactly once. On PostgreSQL
+    the count, insert and delete run under one advisory lock; a replica that doesn't get
+    it skips this round, since another one is already rolling up.
+    """
+    cutoff = start_of_day() - timedelta(days=retention_days)
+    if _is_postgres(session) and not session.execute(
+        text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": ROLLUP_LOCK_KEY}
+    ).scalar():
+        session.rollback()
+        return {"rolled_up_groups": 0, "pruned_rows": 0, "cutoff": cutoff, "skipped": True}
+    day = cast(func.date(UsageLog.created_at), String)
+
+    totals = (
+        select(day, UsageLog.ip_address, UsageLog.user_id, UsageLog.action, func.count())
+        .where(UsageLog.created_at < cutoff)
+        .group_by(day, UsageLog.ip_address, UsageLog.user_id, UsageLog.action)
+    )
+    rolled_up = session.execute(
+        insert(UsageDailyRollup).from_select(["day", "ip_address", "user_id", "action", "count"], totals)
+    ).rowcount
+    pruned = session.execute(delete(UsageLog).where(UsageLog.created_at < cutoff)).rowcount
+    session.commit()
+
+    if pruned:
+        print(f"Usage log rollup: {pruned} rows folded into {rolled_up} daily totals (before {cutoff.date()})")
+    return {"rolled_up_groups": rolled_up, "pruned_rows": pruned, "cutoff": cutoff}
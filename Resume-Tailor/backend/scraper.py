@@ -2,8 +2,7 @@ import requests
 from bs4 import BeautifulSoup
 import re
 import os
-import json
-import openai
+from model_router import router
 
 def fetch_job_description(url: str) -> str:
     """
@@ -71,7 +70,6 @@ def extract_job_metadata(text: str) -> dict:
         if len(text) < 50:
              return {"company": "", "role": ""}
 
-        client = openai.OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
         prompt = f"""
         Extract the 'Company Name' and 'Job Role' from the following Job Description text.
         Return ONLY a JSON object with keys "company" and "role".
@@ -81,15 +79,13 @@ def extract_job_metadata(text: str) -> dict:
         {text[:2000]}
         """
         
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[{"role": "user", "content": prompt}],
+        routed = router.complete(
+            "metadata",
+            [{"role": "user", "content": prompt}],
             temperature=0,
             response_format={ "type": "json_object" }
         )
-        
-        data = json.loads(response.choices[0].message.content)
-        return data
+        return routed.data
     except Exception as e:
         print(f"Metadata extraction failed: {e}")
         return {"company": "", "role": ""}
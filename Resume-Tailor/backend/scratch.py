@@ -0,0 +1,173 @@
+"""
+Scratch storage for uploaded and converted resumes.
+
+Every upload gets a handle ("<token>_<name>.pdf", returned to the frontend as `filename`)
+and a directory SCRATCH_DIR/<token[:2]>/<token>/ that holds the PDF, the converted DOCX and
+anything derived from them. Sharding keeps directories small. The directory's mtime is its
+last use: resolving a handle bumps it. A background task removes sessions idle for longer
+than SCRATCH_TTL_HOURS and then evicts the least recently used ones while the store is
+above SCRATCH_MAX_MB. Sessions used in the last few minutes are never evicted, so a
+conversion in progress keeps its files.
+"""
+import os
+import re
+import shutil
+import tempfile
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+SCRATCH_DIR = os.getenv("SCRATCH_DIR", "scratch")
+SCRATCH_TTL_HOURS = float(os.getenv("SCRATCH_TTL_HOURS", "24"))
+SCRATCH_MAX_MB = int(os.getenv("SCRATCH_MAX_MB", "2048"))
+SCRATCH_GC_INTERVAL_MINUTES = float(os.getenv("SCRATCH_GC_INTERVAL_MINUTES", "15"))
+
+# Sessions touched this recently survive size-cap eviction
+ACTIVE_GRACE_SECONDS = 300
+
+_HANDLE = re.compile(r"^([0-9a-f]{12})_([\w.\- ()]+)$")
+
+
+def safe_filename(filename: str) -> str:
+    """Basename with unusual characters replaced; always ends in lowercase .pdf."""
+    stem = os.path.splitext(os.path.basename(filename or ""))[0]
+    stem = re.sub(r"[^\w.\- ()]", "_", stem).strip(" .") or "resume"
+    return stem[:100] + ".pdf"
+
+
+def with_ext(handle: str, ext: str) -> str:
+    return os.path.splitext(handle)[0] + ext
+
+
+class ScratchStore:
+    def __init__(self, root: str = SCRATCH_DIR, ttl_seconds: float = SCRATCH_TTL_HOURS * 3600, max_bytes: int = SCRATCH_MAX_MB * 1024 * 1024):
+        self.root = root
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._counters = {"created": 0, "expired": 0, "evicted": 0, "freed_bytes": 0, "legacy_removed": 0}
+        self._last_run: Dict = {}
+
+    def _parse(self, handle: str) -> Optional[Tuple[str, str]]:
+        match = _HANDLE.match(handle or "")
+        return (match.group(1), match.group(2)) if match else None
+
+    def _session_dir(self, token: str) -> str:
+        return os.path.join(self.root, token[:2], token)
+
+    def new_handle(self, filename: str) -> str:
+        """Reserve a session directory for an upload and return its handle."""
+        token = uuid.uuid4().hex[:12]
+        os.makedirs(self._session_dir(token), exist_ok=True)
+        self._counters["created"] += 1
+        return f"{token}_{safe_filename(filename)}"
+
+    def path(self, handle: str, ext: Optional[str] = None) -> str:
+        """Where a handle's file (or its sibling with another extension) lives. ValueError for foreign handles."""
+        parsed = self._parse(handle)
+        if not parsed:
+            raise ValueError(f"Not a scratch handle: {handle!r}")
+        token, name = parsed
+        if ext:
+            name = with_ext(name, ext)
+        return os.path.join(self._session_dir(token), name)
+
+    def resolve(self, handle: str, ext: Optional[str] = None) -> Optional[str]:
+        """Existing file for a handle, or None (unknown handle, expired or evicted). Marks the session as used."""
+        try:
+            path = self.path(handle, ext)
+        except ValueError:
+            return None
+        if not os.path.exists(path):
+            return None
+        try:
+            os.utime(os.path.dirname(path))
+        except OSError:
+            pass
+        return path
+
+    def temp_path(self, near: str, suffix: str) -> str:
+        """A new, uniquely named file next to `near`, for per-request outputs that must not collide."""
+        stem = os.path.splitext(os.path.basename(near))[0]
+        fd, path = tempfile.mkstemp(suffix=suffix, prefix=f"{stem}_", dir=os.path.dirname(near) or ".")
+        os.close(fd)
+        return path
+
+    def handle_for(self, path: str) -> str:
+        """Inverse of path() for a file inside a session directory."""
+        token = os.path.basename(os.path.dirname(path))
+        return f"{token}_{safe_filename(os.path.basename(path))}"
+
+    def remove(self, handle: str):
+        parsed = self._parse(handle)
+        if parsed:
+            shutil.rmtree(self._session_dir(parsed[0]), ignore_errors=True)
+
+    def _sessions(self) -> List[Tuple[float, int, str]]:
+        sessions = []
+        if not os.path.isdir(self.root):
+            return sessions
+        for shard in os.scandir(self.root):
+            if not shard.is_dir():
+                continue
+            for session in os.scandir(shard.path):
+                if not session.is_dir():
+                    continue
+                try:
+                    size = sum(entry.stat().st_size for entry in os.scandir(session.path) if entry.is_file())
+                    sessions.append((session.stat().st_mtime, size, session.path))
+                except FileNotFoundError:
+                    continue # Removed while we were looking
+        return sessions
+
+    def collect(self, now: Optional[float] = None, legacy_dir: Optional[str] = None) -> Dict:
+        """Delete expired sessions, then LRU-evict down to max_bytes. Returns what was done."""
+        now = now or time.time()
+        expired = evicted = freed = 0
+        live = []
+        for mtime, size, path in self._sessions():
+            if now - mtime > self.ttl_seconds:
+                shutil.rmtree(path, ignore_errors=True)
+                expired += 1
+                freed += size
+            else:
+                live.append((mtime, size, path))
+
+        total = sum(size for _, size, _ in live)
+        for mtime, size, path in sorted(live):
+            if total <= self.max_bytes:
+                break
+            if now - mtime < ACTIVE_GRACE_SECONDS:
+                break # Everything from here on is in active use
+            shutil.rmtree(path, ignore_errors=True)
+            evicted += 1
+            freed += size
+            total -= size
+
+        legacy_removed = self._sweep_legacy(legacy_dir, now) if legacy_dir else 0
+
+        self._counters["expired"] += expired
+        self._counters["evicted"] += evicted
+        self._counters["freed_bytes"] += freed
+        self._counters["legacy_removed"] += legacy_removed
+        self._last_run = {"at": now, "expired": expired, "evicted": evicted, "freed_bytes": freed, "bytes_in_use": total}
+        if expired or evicted or legacy_removed:
+            print(f"Scratch GC: {expired} expired, {evicted} evicted, {legacy_removed} legacy files, {freed / 1e6:.1f} MB freed")
+        return self._last_run
+
+    def _sweep_legacy(self, directory: str, now: float) -> int:
+        """temp_* files written into the working directory before the scratch store existed."""
+        removed = 0
+        for entry in os.scandir(directory):
+            if entry.is_file() and entry.name.startswith("temp_") and now - entry.stat().st_mtime > self.ttl_seconds:
+                try:
+                    os.remove(entry.path)
+                    removed += 1
+                except OSError:
+                    pass
+        return removed
+
+    def stats(self) -> Dict:
+        return {**self._counters, "ttl_seconds": self.ttl_seconds, "max_bytes": self.max_bytes, "last_run": self._last_run}
+
+
+scratch = ScratchStore()
@@ -0,0 +1,102 @@
+"""
+Local section splitter for extracted resume text.
+
+Finds section headers in the output of extract_text_from_docx with a heuristic (known
+header names, short ALL-CAPS lines, short "Title:" lines) so a long resume can be analyzed
+one section per LLM call. Text before the first header (name, contact details and often an
+unlabeled bio) becomes its own leading section.
+"""
+import re
+from dataclasses import dataclass
+from typing import List, Optional
+
+# Normalized header -> section_type used by AnalysisResult
+KNOWN_HEADERS = {
+    "summary": "Summary", "professional summary": "Summary", "profile": "Summary",
+    "professional profile": "Summary", "about me": "Summary", "objective": "Summary",
+    "career objective": "Summary", "career summary": "Summary", "executive summary": "Summary",
+    "experience": "Experience", "work experience": "Experience", "professional experience": "Experience",
+    "employment": "Experience", "employment history": "Experience", "work history": "Experience",
+    "relevant experience": "Experience", "internships": "Experience", "internship": "Experience",
+    "projects": "Projects", "personal projects": "Projects", "academic projects": "Projects",
+    "key projects": "Projects", "selected projects": "Projects",
+    "skills": "Skills", "technical skills": "Skills", "core skills": "Skills", "key skills": "Skills",
+    "core competencies": "Skills", "competencies": "Skills", "technologies": "Skills", "tools": "Skills",
+    "education": "Education", "academic background": "Education", "qualifications": "Education",
+    "certifications": "Other", "certificates": "Other", "awards": "Other", "achievements": "Other",
+    "publications": "Other", "languages": "Other", "interests": "Other", "hobbies": "Other",
+    "volunteering": "Other", "volunteer experience": "Other", "leadership": "Other",
+    "activities": "Other", "references": "Other", "courses": "Other", "training": "Other",
+}
+
+MAX_HEADER_WORDS = 5
+MAX_HEADER_CHARS = 40
+# Sections shorter than this (e.g. "Languages:" sub-labels inside Skills) join the one before
+MIN_SECTION_WORDS = 12
+
+
+@dataclass
+class ResumeSection:
+    name: str # Header as written, "" for the leading block
+    section_type: str
+    text: str
+
+
+def _normalize(line: str) -> str:
+    return re.sub(r"[^a-z& ]", "", line.lower().replace("&", " & ")).strip()
+
+
+def header_type(line: str) -> Optional[str]:
+    """section_type if the line looks like a section header, else None."""
+    stripped = line.strip()
+    if not stripped or len(stripped) > MAX_HEADER_CHARS or len(stripped.split()) > MAX_HEADER_WORDS:
+        return None
+    normalized = _normalize(stripped.rstrip(":"))
+    if normalized in KNOWN_HEADERS:
+        return KNOWN_HEADERS[normalized]
+    # Contact details, dates and sentences are never headers
+    if "@" in stripped or sum(c.isdigit() for c in stripped) > 2 or stripped.endswith((".", ",")):
+        return None
+    # Unknown ALL-CAPS lines count when they read like words, not acronyms ("AWS SA", "SQL")
+    words = re.findall(r"[A-Za-z]+", stripped)
+    if words and stripped.upper() == stripped and all(len(w) >= 3 for w in words) and max(map(len, words)) >= 5:
+        return "Other"
+    if stripped.endswith(":") and len(words) <= 3 and all(w[0].isupper() for w in words):
+        return "Other"
+    return None
+
+
+def split_sections(text: str) -> List[ResumeSection]:
+    """
+    Document-order sections, each including its header line(s) so edits can quote them.
+    Headers with no text of their own (stacked headers from two-column layouts) are merged
+    into the next section, sections of only a few words into the previous one.
+    """
+    sections: List[ResumeSection] = []
+    name, section_type, headers, body = "", "Summary", [], []
+
+    def flush():
+        content = "\n".join(headers + body).strip("\n")
+        if not content.strip():
+            return
+        if sections and sections[-1].name and len(content.split()) < MIN_SECTION_WORDS:
+            sections[-1].text += "\n" + content
+        else:
+            sections.append(ResumeSection(name, section_type, content))
+
+    for line in text.split("\n"):
+        found = header_type(line)
+        if found is None:
+            body.append(line)
+            continue
+        title = line.strip().rstrip(":")
+        if headers and not any(l.strip() for l in body):
+            name = f"{name} / {title}"
+            if section_type == "Other":
+                section_type = found
+            headers.append(line)
+            continue
+        flush()
+        name, section_type, headers, body = title, found, [line], []
+    flush()
+    return sections
@@ -0,0 +1,75 @@
+"""
+Conversion helper for pdf_export.LibreOfficeBackend.
+
+Runs under a Python that can import `uno` (LibreOffice's bundled python, or the
+system python3 with python3-uno), connects to one headless soffice instance and
+converts documents to PDF for as long as it lives, so LibreOffice starts once
+instead of once per export.
+
+Protocol: one JSON request per line on stdin, {"docx": path, "pdf": path}, and one
+JSON reply per line on stdout, {"ok": true} or {"ok": false, "error": message}.
+The first line written is {"ready": true} once the connection is up.
+Only the standard library and uno may be used here.
+"""
+import json
+import sys
+import time
+
+import uno
+from com.sun.star.beans import PropertyValue
+
+
+def _prop(name, value):
+    prop = PropertyValue()
+    prop.Name = name
+    prop.Value = value
+    return prop
+
+
+def connect(connection: str, timeout: float):
+    local = uno.getComponentContext()
+    resolver = local.ServiceManager.createInstanceWithContext("com.sun.star.bridge.UnoUrlResolver", local)
+    deadline = time.time() + timeout
+    while True:
+        try:
+            ctx = resolver.resolve(f"uno:{connection};StarOffice.ComponentContext")
+            return ctx.ServiceManager.createInstanceWithContext("com.sun.star.frame.Desktop", ctx)
+        except Exception:
+            # soffice is still starting up
+            if time.time() > deadline:
+                raise
+            time.sleep(0.2)
+
+
+def convert(desktop, docx_path: str, pdf_path: str):
+    doc = desktop.loadComponentFromURL(
+        uno.systemPathToFileUrl(docx_path), "_blank", 0,
+        (_prop("Hidden", True), _prop("ReadOnly", True)),
+    )
+    if doc is None:
+        raise RuntimeError(f"LibreOffice could not open {docx_path}")
+    try:
+        doc.storeToURL(uno.systemPathToFileUrl(pdf_path), (_prop("FilterName", "writer_pdf_Export"),))
+    finally:
+        doc.close(True)
+
+
+def main():
+    connection, timeout = sys.argv[1], float(sys.argv[2])
+    desktop = connect(connection, timeout)
+    print(json.dumps({"ready": True}), flush=True)
+
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        try:
+            request = json.loads(line)
+            convert(desktop, request["docx"], request["pdf"])
+            reply = {"ok": True}
+        except Exception as e:
+            reply = {"ok": False, "error": str(e)}
+        print(json.dumps(reply), flush=True)
+
+
+if __name__ == "__main__":
+    main()
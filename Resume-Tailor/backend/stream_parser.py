@@ -0,0 +1,85 @@
+import json
+from typing import Dict, List, Optional
+
+
+class SectionStreamParser:
+    """
+    Incremental parser for the gap-analysis JSON while the model is still writing it.
+    Feed it raw text chunks, it returns every object of the top-level "sections"
+    array as soon as its closing brace arrives. Only the lexical state (strings,
+    escapes, nesting) is tracked, each finished section is then parsed with json.loads.
+    """
+
+    def __init__(self, array_key: str = "sections"):
+        self.array_key = array_key
+        self._buffer: List[str] = []
+        self._length = 0
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_string: Optional[str] = None
+        self._top_key: Optional[str] = None
+        self._array_depth: Optional[int] = None
+        self._item_start: Optional[int] = None
+
+    @property
+    def text(self) -> str:
+        """Everything fed so far."""
+        if len(self._buffer) > 1:
+            self._buffer = ["".join(self._buffer)]
+        return self._buffer[0] if self._buffer else ""
+
+    def feed(self, chunk: str) -> List[Dict]:
+        completed = []
+        offset = self._length
+        self._buffer.append(chunk)
+        self._length += len(chunk)
+
+        for i, ch in enumerate(chunk, start=offset):
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if len(self._stack) == 1:
+                        # Candidate top-level key, confirmed when the ':' follows
+                        self._last_string = self.text[self._string_start + 1:i]
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                self._string_start = i
+            elif ch == ":" and len(self._stack) == 1:
+                self._top_key = self._last_string
+            elif ch in "{[":
+                self._stack.append(ch)
+                depth = len(self._stack)
+                if ch == "[" and depth == 2 and self._top_key == self.array_key:
+                    self._array_depth = depth
+                elif ch == "{" and self._array_depth is not None and depth == self._array_depth + 1:
+                    self._item_start = i
+            elif ch in "}]":
+                if not self._stack:
+                    continue
+                self._stack.pop()
+                depth = len(self._stack)
+                if ch == "}" and self._item_start is not None and depth == self._array_depth:
+                    item = self._parse_item(self.text[self._item_start:i + 1])
+                    if item is not None:
+                        completed.append(item)
+                    self._item_start = None
+                elif ch == "]" and self._array_depth is not None and depth == self._array_depth - 1:
+                    self._array_depth = None
+
+        return completed
+
+    @staticmethod
+    def _parse_item(raw: str) -> Optional[Dict]:
+        try:
+            item = json.loads(raw)
+        except json.JSONDecodeError:
+            return None
+        return item if isinstance(item, dict) else None
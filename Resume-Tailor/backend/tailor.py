@@ -1,14 +1,42 @@
-import openai
+import asyncio
+import copy
 import os
 import json
-import shutil
 from docx import Document
-from typing import List, Dict
-
-# Ensure API key is set
-# openai.api_key = os.environ.get("OPENAI_API_KEY")
+from ats_scorer import SCORER_VERSION, score_resume
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+# Models are picked per task by model_router (LLM_TASK_MODELS).
+# Bump PROMPT_VERSION whenever the prompts below change, it is part of the analysis cache key.
+PROMPT_VERSION = "2"
+
+# Long resumes can be analyzed one section per call, concurrently (sections.py finds the
+# sections). "single" sends the whole resume in one call, "sections" always splits,
+# "auto" splits resumes of SECTION_MODE_MIN_TOKENS or more.
+ANALYSIS_MODE = os.getenv("ANALYSIS_MODE", "auto")
+SECTION_MODE_MIN_TOKENS = int(os.getenv("SECTION_MODE_MIN_TOKENS", "1500"))
+SECTION_CONCURRENCY = int(os.getenv("SECTION_CONCURRENCY", "4"))
+SECTION_INPUT_TOKENS = int(os.getenv("SECTION_INPUT_TOKENS", "4000"))
+# "local" scores keyword coverage in-process (ats_scorer.py), "llm" asks the "scoring" model
+SCORING_MODE = os.getenv("SCORING_MODE", "local")
+
+# Analysis cache key version: results produced in another mode aren't reused
+ANALYSIS_CACHE_VERSION = PROMPT_VERSION if ANALYSIS_MODE == "single" else f"{PROMPT_VERSION}-{ANALYSIS_MODE}"
+if SCORING_MODE != "llm":
+    ANALYSIS_CACHE_VERSION += f"-ats{SCORER_VERSION}"
 
 from pydantic import BaseModel
+from stream_parser import SectionStreamParser
+from docx_extract import extract_structured_text
+from model_router import RoutedResponse, load_json_object, router
+from prompt_budget import ANALYSIS_INPUT_TOKENS, SCORING_INPUT_TOKENS, build_prompt, count_tokens, with_usage
+from sections import ResumeSection, split_sections
+
+ANALYSIS_MODEL = router.model_for("gap_analysis")
+SECTION_MODEL = router.model_for("section_analysis")
+SCORING_MODEL = router.model_for("scoring")
+# Every model whose answers can end up in a cached analysis, part of the cache key
+ANALYSIS_MODELS = "+".join(sorted({ANALYSIS_MODEL, SECTION_MODEL} | ({SCORING_MODEL} if SCORING_MODE == "llm" else set())))
 
 class Edit(BaseModel):
     target_text: str
@@ -30,19 +58,18 @@ class AnalysisResult(BaseModel):
     company_name: str = "Unknown Company"
     job_title: str = "Unknown Role"
     score_reasoning: str = ""
+    score_breakdown: List[Dict] = []
 
 
 
 import re
+from docx_index import normalize_text, build_paragraph_index, splice_across_runs, AhoCorasick
 
-def normalize_text(text: str) -> str:
-    """Normalize whitespace for robust matching."""
-    return re.sub(r'\s+', ' ', text).strip()
-
-def safe_replace_text(paragraph, target: str, replacement: str):
+def safe_replace_text(paragraph, target: str, replacement: str, offsets=None):
     """
     Attempts to replace 'target' with 'replacement' in the paragraph while preserving formatting.
     Uses normalized matching to ignore whitespace differences from PDF conversion.
+    'offsets' is the paragraph's (normalized text, run offset map) if the caller already has it.
     """
     norm_target = normalize_text(target)
     norm_para_text = normalize_text(paragraph.text)
@@ -74,7 +101,11 @@ def safe_replace_text(paragraph, target: str, replacement: str):
             run.text = re.sub(pattern, final_replacement, run.text)
             return True
 
-    # 3. Fallback: Full paragraph reconstruction
+    # 3. Target spans several runs: splice it out via the run offset map, keeping each run's formatting
+    if splice_across_runs(paragraph, norm_target, final_replacement, offsets):
+        return True
+
+    # 4. Fallback: Full paragraph reconstruction
     style_run = paragraph.runs[0] if paragraph.runs else None
     font_name = style_run.font.name if style_run else None
     font_size = style_run.font.size if style_run else None
@@ -95,11 +126,15 @@ def safe_replace_text(paragraph, target: str, replacement: str):
 
     return False
 
-def apply_edits_to_docx(docx_path: str, edits: List[Dict[str, str]], output_path: str):
-    # Copy original to output
-    shutil.copy2(docx_path, output_path)
-    doc = Document(output_path)
-    
+def apply_edits_to_document(doc, edits: List[Dict[str, str]]) -> int:
+    """
+    Apply all edits to an in-memory Document in a single pass.
+    Every paragraph (body, tables, headers, footers, textboxes) is indexed once and
+    matched against all normalized targets at the same time with an Aho-Corasick
+    automaton, instead of re-normalizing every paragraph for every edit.
+    Returns the number of successful edit applications.
+    """
+    normalized_edits = []
     for edit in edits:
         if isinstance(edit, dict):
             action = edit.get("action")
@@ -112,36 +147,55 @@ def apply_edits_to_docx(docx_path: str, edits: List[Dict[str, str]], output_path
         
         if not target or not content:
             continue
+        normalized_edits.append((action, target, content, normalize_text(target)))
+
+    if not normalized_edits:
+        return 0
+
+    matcher = AhoCorasick()
+    for idx, (_, _, _, norm_target) in enumerate(normalized_edits):
+        matcher.add(norm_target, idx)
+    matcher.build()
+
+    applied = 0
+    for entry in build_paragraph_index(doc):
+        # Keep the original edit order when several targets hit the same paragraph.
+        # The same target may appear in several paragraphs (e.g. name, contact info), all get edited.
+        pending = sorted(matcher.search(entry.norm_text))
+        while pending:
+            idx = pending.pop(0)
+            action, target, content, norm_target = normalized_edits[idx]
+            # An earlier edit may have rewritten this paragraph
+            if norm_target not in entry.norm_text:
+                continue
             
-        def process_para(para):
-            # We check if the normalized target is in the normalized paragraph text
-            if normalize_text(target) in normalize_text(para.text):
-                if action == "replace":
-                    return safe_replace_text(para, target, content)
-                elif action == "append":
-                     para.add_run(" " + content)
-                     return True
-            return False
-
-        # 1. Check body paragraphs
-        found = False
-        for para in doc.paragraphs:
-            if process_para(para):
-                found = True
-                # Continue searching because the same target might appear multiple times
-                # (e.g. name, contact info)
-        
-        # 2. Check tables
-        for table in doc.tables:
-            for row in table.rows:
-                for cell in row.cells:
-                    for para in cell.paragraphs:
-                        if process_para(para):
-                            found = True
+            if action == "replace":
+                changed = safe_replace_text(entry.paragraph, target, content, entry.offsets)
+            elif action == "append":
+                entry.paragraph.add_run(" " + content)
+                changed = True
+            else:
+                changed = False
+            
+            if changed:
+                applied += 1
+                entry.refresh()
+                # Later edits may target text this one just wrote, as they did when edits ran one by one
+                pending = sorted(i for i in matcher.search(entry.norm_text) if i > idx)
 
+    return applied
+
+def apply_edits_to_docx(docx_path: str, edits: List[Dict[str, str]], output_path: str):
+    doc = Document(docx_path)
+    apply_edits_to_document(doc, edits)
     doc.save(output_path)
 
 def extract_text_from_docx(docx_path: str) -> str:
+    # Streams the XML directly, same output as extract_text_with_python_docx but much cheaper
+    return extract_structured_text(docx_path).text
+
+def extract_text_with_python_docx(docx_path: str) -> str:
+    """Original python-docx based extractor, kept as the reference for docx_extract."""
     from docx.oxml.ns import qn
     doc = Document(docx_path)
     full_text = []
@@ -206,17 +260,8 @@ def extract_text_from_docx(docx_path: str) -> str:
 
 # Removed extract_text_from_pdf dependency to ensure Sync
 
-def analyze_gaps(docx_path: str, job_description: str, pdf_path: str = None) -> Dict:
-    # Reverting to DOCX extraction to ensure identifying target_text works for replacement.
-    # We improved extract_text_from_docx to include textboxes/tables.
-    resume_text = extract_text_from_docx(docx_path)
-    
-    if not resume_text.strip():
-        print("Warning: Extracted text is empty.")
-    
-    client = openai.OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
-
-    prompt = f"""
+def build_gap_analysis_prompt(resume_text: str, job_description: str) -> str:
+    return f"""
     You are an expert Resume Strategist and Career Coach.
     
     GOAL: 
@@ -298,40 +343,139 @@ def analyze_gaps(docx_path: str, job_description: str, pdf_path: str = None) ->
     Original Resume Content:
     {resume_text}
     """
+
+SECTION_STRATEGIES = {
+    "Summary": "3-4 confident sentences, no bullet points: years of experience, key industry/role and the candidate's unique value. If the block is only a name and contact details, return no gaps and no edits.",
+    "Experience": "Context-Action-Result bullets starting with strong, varied verbs. Add metrics where possible, or placeholders like \"[X]%\" for the user to fill in. Prioritize bullets that match the JD's requirements.",
+    "Projects": "Lead with the problem solved and the technology used: \"Built [what] using [stack] to solve [problem], resulting in [outcome].\"",
+    "Skills": "Group logically (Languages, Frameworks, Tools). Remove outdated skills and duplicates. Make sure JD keywords the candidate likely has are present.",
+    "Education": "Keep it concise. Surface coursework, honours or projects only where they support the JD.",
+    "Other": "Keep what supports this application and tighten the wording.",
+}
+
+def build_section_prompt(section: ResumeSection, outline: str, section_text: str, job_description: str) -> str:
+    """Prompt for one section in section-parallel mode; same output schema as one entry of 'sections'."""
+    if section.name:
+        heading = f'Resume Section "{section.name}"'
+        name_hint = "<Exact Header name from resume>"
+    else:
+        heading = "Top of the Resume (before the first header)"
+        name_hint = "Professional Summary if this contains a bio/intro paragraph, else Contact Information"
+    return f"""
+    You are an expert Resume Strategist and Career Coach reviewing ONE section of a resume against a job description.
+    The resume's sections are: {outline}. The other sections are reviewed separately; analyze only the section below.
     
-    response = client.chat.completions.create(
-        model="gpt-4o",
-        messages=[{"role": "user", "content": prompt}],
-        temperature=0.2,
-        response_format={ "type": "json_object" }
-    )
+    STYLE: Natural, confident human voice. Active voice, specifics over generalities. Avoid AI phrases like "delved into," "testament to," "pivotal in," "tapestry of skills." In 'suggestions', explain WHY each change makes the resume better.
+    CONSTRAINTS: 'target_text' must be an exact substring of the section text below. Do not invent experiences.
+    STRATEGY ({section.section_type}): {SECTION_STRATEGIES.get(section.section_type, SECTION_STRATEGIES["Other"])}
+    Also extract 'company_name' and 'job_title' from the Job Description. Use "Unknown" if not found.
+    
+    OUTPUT FORMAT (JSON):
+    {{
+        "company_name": "<string>",
+        "job_title": "<string>",
+        "section": {{
+            "section_name": "<{name_hint}>",
+            "section_type": "<Summary|Experience|Projects|Skills|Education|Other>",
+            "original_text": "<full original text of this section>",
+            "gaps": ["<specific missing keyword/skill>", ...],
+            "suggestions": ["<strategic advice>", ...],
+            "edits": [
+                {{
+                    "target_text": "<exact substring to replace>",
+                    "new_content": "<improved content>",
+                    "action": "replace",
+                    "rationale": "<why this change is better>"
+                }}
+            ]
+        }}
+    }}
     
+    Job Description:
+    {job_description}
+    
+    {heading}:
+    {section_text}
+    """
+
+def load_analysis(content: str) -> Dict:
+    """Parsed gap analysis; ValueError when the model's answer isn't a JSON object."""
+    result = load_json_object(content)
+    # Ensure extracted metadata exists
+    result.setdefault("company_name", "Unknown Company")
+    result.setdefault("job_title", "Unknown Role")
+    return result
+
+def empty_analysis() -> Dict:
+    return {"sections": [], "company_name": "Unknown", "job_title": "Unknown"}
+
+def parse_analysis_response(content: str) -> Dict:
     try:
-        result = json.loads(response.choices[0].message.content)
-        # Ensure extracted metadata exists
-        result.setdefault("company_name", "Unknown Company")
-        result.setdefault("job_title", "Unknown Role")
-        
-    except json.JSONDecodeError:
+        return load_analysis(content)
+    except ValueError:
         print("Failed to decode JSON from LLM")
-        result = {"sections": [], "company_name": "Unknown", "job_title": "Unknown"}
+        return empty_analysis()
+
+def routed_usage(report: Dict, routed: Optional[RoutedResponse]) -> Dict:
+    """Prompt report with the API's token usage and the model that actually answered."""
+    if routed is None:
+        return report
+    return {**with_usage(report, routed.response), "model": routed.model, "fallback": routed.fell_back}
+
+def route_gap_analysis(messages: List[Dict]) -> Tuple[Dict, Optional[RoutedResponse]]:
+    """Sync gap analysis call; an answer no model got right becomes an empty analysis."""
+    try:
+        routed = router.complete("gap_analysis", messages, parse=load_analysis, temperature=0.2, response_format={ "type": "json_object" })
+    except ValueError as e:
+        print(f"Failed to decode JSON from LLM: {e}")
+        return empty_analysis(), None
+    return routed.data, routed
+
+async def aroute_gap_analysis(messages: List[Dict], fallback: bool = False) -> Tuple[Dict, Optional[RoutedResponse]]:
+    """Async gap analysis call, or its repeat on the fallback model after an invalid streamed answer."""
+    call = router.afallback if fallback else router.acomplete
+    try:
+        routed = await call("gap_analysis", messages, parse=load_analysis, temperature=0.2, response_format={ "type": "json_object" })
+    except ValueError as e:
+        print(f"Failed to decode JSON from LLM: {e}")
+        return empty_analysis(), None
+    return routed.data, routed
+
+def summarize_changes(result: Dict) -> str:
+    """Summarize proposed changes for the scorer."""
+    changes_summary = []
+    if "sections" in result:
+        for section in result["sections"]:
+            name = section.get("section_name", "Unknown")
+            gaps = section.get("gaps", [])
+            suggestions = section.get("suggestions", [])
+            edits = section.get("edits", [])
+            changes_summary.append(f"Section {name}: Found {len(gaps)} gaps. {len(suggestions)} suggestions. Suggested {len(edits)} edits.")
+            if suggestions:
+                changes_summary.append(f" - Advice: {'; '.join(suggestions[:3])}")
+    
+    return "\n".join(changes_summary)
+
+def analyze_gaps(docx_path: str, job_description: str, pdf_path: str = None) -> Dict:
+    # Reverting to DOCX extraction to ensure identifying target_text works for replacement.
+    # We improved extract_text_from_docx to include textboxes/tables.
+    resume_text = extract_text_from_docx(docx_path)
+    
+    if not resume_text.strip():
+        print("Warning: Extracted text is empty.")
+    
+    prompt = build_prompt("gap_analysis", build_gap_analysis_prompt, resume_text, job_description, ANALYSIS_INPUT_TOKENS, ANALYSIS_MODEL)
+    
+    result, routed = route_gap_analysis([{"role": "user", "content": prompt.text}])
+    token_usage = {"gap_analysis": routed_usage(prompt.report, routed)}
+    result["token_usage"] = token_usage
 
     # 2. Separate Robust Scoring Step
     try:
-        # Summarize proposed changes for the scorer
-        changes_summary = []
-        if "sections" in result:
-            for section in result["sections"]:
-                name = section.get("section_name", "Unknown")
-                gaps = section.get("gaps", [])
-                suggestions = section.get("suggestions", [])
-                edits = section.get("edits", [])
-                changes_summary.append(f"Section {name}: Found {len(gaps)} gaps. {len(suggestions)} suggestions. Suggested {len(edits)} edits.")
-                if suggestions:
-                    changes_summary.append(f" - Advice: {'; '.join(suggestions[:3])}")
-        
-        changes_text = "\n".join(changes_summary)
-        scores = calculate_scores(resume_text, job_description, changes_text)
+        if SCORING_MODE != "llm":
+            return apply_local_scores(resume_text, job_description, result)
+        changes_text = summarize_changes(result)
+        scores = calculate_scores(resume_text, job_description, changes_text, usage=token_usage)
         result["initial_score"] = scores.get("initial_score", 0)
         result["projected_score"] = scores.get("projected_score", 0)
         result["score_reasoning"] = scores.get("reasoning", "")
@@ -343,16 +487,25 @@ def analyze_gaps(docx_path: str, job_description: str, pdf_path: str = None) ->
 
     return result
 
-def calculate_scores(resume_text: str, job_description: str, changes_summary: str) -> Dict:
-    client = openai.OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
-    prompt = f"""
+def apply_local_scores(resume_text: str, job_description: str, result: Dict) -> Dict:
+    """Keyword-coverage scores for the resume before and after the proposed edits, no LLM call."""
+    scores = score_resume(resume_text, job_description, flatten_edits(result))
+    result["initial_score"] = scores["initial_score"]
+    result["projected_score"] = scores["projected_score"]
+    result["score_reasoning"] = scores["reasoning"]
+    result["score_breakdown"] = scores["keywords"]
+    return result
+
+def calculate_scores(resume_text: str, job_description: str, changes_summary: str, usage: Dict = None) -> Dict:
+    def template(resume_text: str, job_description: str) -> str:
+        return f"""
     You are a Hiring Manager and ATS Specialist.
     
     JOB DESCRIPTION:
-    {job_description[:2000]}...
+    {job_description}
     
     CANDIDATE RESUME CONTENT:
-    {resume_text[:3000]}...
+    {resume_text}
     
     PROPOSED IMPROVEMENTS TO RESUME:
     {changes_summary}
@@ -368,20 +521,330 @@ def calculate_scores(resume_text: str, job_description: str, changes_summary: st
         "reasoning": "<short explanation>"
     }}
     """
+    prompt = build_prompt("scores", template, resume_text, job_description, SCORING_INPUT_TOKENS, SCORING_MODEL)
     
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[{"role": "user", "content": prompt}],
+        routed = router.complete(
+            "scoring",
+            [{"role": "user", "content": prompt.text}],
             temperature=0.1,
             response_format={ "type": "json_object" }
         )
-        return json.loads(response.choices[0].message.content)
+        if usage is not None:
+            usage["scores"] = routed_usage(prompt.report, routed)
+        return routed.data
     except Exception as e:
         print(f"Error in calculate_scores: {e}")
         return {"initial_score": 0, "projected_score": 0}
 
-def generate_tailored_resume(docx_path: str, sections: List[Dict]) -> str:
+# --- Async pipeline ---
+# The initial score only depends on the original resume + JD, so it runs concurrently
+# with the gap analysis. Only the projected score waits for the edits summary.
+
+def start_initial_score(resume_text: str, job_description: str, usage: Dict) -> Optional[asyncio.Task]:
+    """LLM scoring starts the initial score right away, local scoring needs no head start."""
+    if SCORING_MODE != "llm":
+        return None
+    return asyncio.create_task(calculate_initial_score_async(resume_text, job_description, usage=usage))
+
+def _cancel(task: Optional[asyncio.Task]):
+    if task is not None:
+        task.cancel()
+
+async def calculate_initial_score_async(resume_text: str, job_description: str, usage: Dict = None) -> Dict:
+    def template(resume_text: str, job_description: str) -> str:
+        return f"""
+    You are a Hiring Manager and ATS Specialist.
+    
+    JOB DESCRIPTION:
+    {job_description}
+    
+    CANDIDATE RESUME CONTENT:
+    {resume_text}
+    
+    TASK:
+    Evaluate the resume's match to the JD on a scale of 0-100 (ATS Score).
+    
+    OUTPUT JSON:
+    {{
+        "initial_score": <int>,
+        "reasoning": "<short explanation>"
+    }}
+    """
+    prompt = build_prompt("initial_score", template, resume_text, job_description, SCORING_INPUT_TOKENS, SCORING_MODEL)
+    
+    try:
+        routed = await router.acomplete(
+            "scoring",
+            [{"role": "user", "content": prompt.text}],
+            temperature=0.1,
+            response_format={ "type": "json_object" }
+        )
+        if usage is not None:
+            usage["initial_score"] = routed_usage(prompt.report, routed)
+        return routed.data
+    except Exception as e:
+        print(f"Error in calculate_initial_score_async: {e}")
+        return {"initial_score": 0}
+
+async def calculate_projected_score_async(resume_text: str, job_description: str, changes_summary: str, usage: Dict = None) -> Dict:
+    def template(resume_text: str, job_description: str) -> str:
+        return f"""
+    You are a Hiring Manager and ATS Specialist.
+    
+    JOB DESCRIPTION:
+    {job_description}
+    
+    CANDIDATE RESUME CONTENT:
+    {resume_text}
+    
+    PROPOSED IMPROVEMENTS TO RESUME:
+    {changes_summary}
+    
+    TASK:
+    Estimate the match score (0-100) assuming the proposed improvements are applied effectively.
+    
+    OUTPUT JSON:
+    {{
+        "projected_score": <int>,
+        "reasoning": "<short explanation>"
+    }}
+    """
+    prompt = build_prompt("projected_score", template, resume_text, job_description, SCORING_INPUT_TOKENS, SCORING_MODEL)
+    
+    try:
+        routed = await router.acomplete(
+            "scoring",
+            [{"role": "user", "content": prompt.text}],
+            temperature=0.1,
+            response_format={ "type": "json_object" }
+        )
+        if usage is not None:
+            usage["projected_score"] = routed_usage(prompt.report, routed)
+        return routed.data
+    except Exception as e:
+        print(f"Error in calculate_projected_score_async: {e}")
+        return {"projected_score": 0}
+
+def use_section_mode(resume_text: str, sections: List[ResumeSection]) -> bool:
+    if ANALYSIS_MODE == "single" or len(sections) < 2:
+        return False
+    if ANALYSIS_MODE == "sections":
+        return True
+    return count_tokens(resume_text, ANALYSIS_MODEL) >= SECTION_MODE_MIN_TOKENS
+
+async def _analyze_section_async(section: ResumeSection, outline: str, job_description: str, semaphore: asyncio.Semaphore, usage: Dict) -> Optional[Dict]:
+    label = section.name or "top of resume"
+    prompt = build_prompt(
+        f"section {label}",
+        lambda section_text, jd: build_section_prompt(section, outline, section_text, jd),
+        section.text, job_description, SECTION_INPUT_TOKENS, SECTION_MODEL
+    )
+    
+    def parse(content: str) -> Tuple[Dict, Dict]:
+        # A section that doesn't validate counts as invalid output, so it gets the fallback model
+        data = load_json_object(content)
+        analysis = data.get("section") or {}
+        analysis.setdefault("section_name", section.name or "Professional Summary")
+        analysis.setdefault("section_type", section.section_type)
+        SectionAnalysis.model_validate(analysis)
+        return data, analysis
+    
+    try:
+        async with semaphore:
+            routed = await router.acomplete(
+                "section_analysis",
+                [{"role": "user", "content": prompt.text}],
+                parse=parse,
+                temperature=0.2,
+                response_format={ "type": "json_object" }
+            )
+    except Exception as e:
+        # One bad section shouldn't sink the others
+        print(f"Section analysis failed for {label}: {e}")
+        return None
+    data, analysis = routed.data
+    usage[f"section:{label}"] = routed_usage(prompt.report, routed)
+    return {"section": analysis, "company_name": data.get("company_name"), "job_title": data.get("job_title")}
+
+async def iter_section_analyses(sections: List[ResumeSection], job_description: str, usage: Dict) -> AsyncIterator[Tuple[int, Optional[Dict]]]:
+    """
+    One LLM call per section, at most SECTION_CONCURRENCY at a time.
+    Yields (section index, analysis or None) as each call finishes, so latency follows the
+    slowest section rather than the length of one long answer.
+    """
+    semaphore = asyncio.Semaphore(SECTION_CONCURRENCY)
+    outline = ", ".join(section.name or "(top of resume)" for section in sections)
+    
+    async def run(index: int, section: ResumeSection):
+        return index, await _analyze_section_async(section, outline, job_description, semaphore, usage)
+    
+    tasks = [asyncio.create_task(run(index, section)) for index, section in enumerate(sections)]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            yield await finished
+    finally:
+        for task in tasks:
+            task.cancel()
+
+def merge_section_analyses(analyses: Dict[int, Optional[Dict]]) -> Dict:
+    """Per-section results, in document order, as one AnalysisResult-shaped dict."""
+    ordered = [analyses[index] for index in sorted(analyses) if analyses[index]]
+    if not ordered:
+        raise RuntimeError("Section analysis failed for every section")
+    
+    def first_known(key: str, default: str) -> str:
+        for analysis in ordered:
+            value = (analysis.get(key) or "").strip()
+            if value and value.lower() != "unknown":
+                return value
+        return default
+    
+    return {
+        "sections": [analysis["section"] for analysis in ordered],
+        "company_name": first_known("company_name", "Unknown Company"),
+        "job_title": first_known("job_title", "Unknown Role"),
+    }
+
+async def analyze_gaps_async(docx_path: str, job_description: str, pdf_path: str = None, on_progress=None) -> Dict:
+    """
+    Async version of analyze_gaps.
+    Latency is max(gap analysis, initial score) + projected score instead of the sum of all calls.
+    on_progress, if given, is awaited with "analyzed" once the gap analysis is parsed.
+    """
+    resume_text = await asyncio.to_thread(extract_text_from_docx, docx_path)
+    
+    if not resume_text.strip():
+        print("Warning: Extracted text is empty.")
+    
+    # 1. Kick off the initial score while the gap analysis runs
+    token_usage = {}
+    initial_task = start_initial_score(resume_text, job_description, token_usage)
+    sections = split_sections(resume_text)
+    
+    if use_section_mode(resume_text, sections):
+        try:
+            analyses = {index: analysis async for index, analysis in iter_section_analyses(sections, job_description, token_usage)}
+            result = merge_section_analyses(analyses)
+        except Exception:
+            _cancel(initial_task)
+            raise
+    else:
+        prompt = build_prompt("gap_analysis", build_gap_analysis_prompt, resume_text, job_description, ANALYSIS_INPUT_TOKENS, ANALYSIS_MODEL)
+        try:
+            result, routed = await aroute_gap_analysis([{"role": "user", "content": prompt.text}])
+        except Exception:
+            _cancel(initial_task)
+            raise
+        token_usage["gap_analysis"] = routed_usage(prompt.report, routed)
+    result["token_usage"] = token_usage
+    if on_progress:
+        await on_progress("analyzed")
+    
+    # 2. Projected score needs the edits summary
+    await _apply_scores_async(resume_text, job_description, result, initial_task)
+    
+    return result
+
+async def _apply_scores_async(resume_text: str, job_description: str, result: Dict, initial_task) -> Dict:
+    if initial_task is None:
+        return apply_local_scores(resume_text, job_description, result)
+    projected = await calculate_projected_score_async(resume_text, job_description, summarize_changes(result), usage=result.get("token_usage"))
+    initial = await initial_task
+    
+    initial_score = initial.get("initial_score", 0) or 0
+    projected_score = projected.get("projected_score", 0) or 0
+    result["initial_score"] = initial_score
+    # Scored independently, so never report a projection below the starting point
+    result["projected_score"] = max(projected_score, initial_score) if projected_score else 0
+    result["score_reasoning"] = projected.get("reasoning") or initial.get("reasoning", "")
+    return result
+
+async def analyze_gaps_stream(docx_path: str, job_description: str):
+    """
+    Streaming version of analyze_gaps_async.
+    Async generator of (event, data) tuples:
+      ("section", <section dict>) as soon as each section object is complete,
+      ("result", <full analysis dict with scores>) once scoring is done.
+    """
+    resume_text = await asyncio.to_thread(extract_text_from_docx, docx_path)
+    
+    if not resume_text.strip():
+        print("Warning: Extracted text is empty.")
+    
+    token_usage = {}
+    initial_task = start_initial_score(resume_text, job_description, token_usage)
+    sections = split_sections(resume_text)
+    
+    if use_section_mode(resume_text, sections):
+        # Sections are reported as their calls finish, the final result keeps document order
+        analyses = {}
+        try:
+            async for index, analysis in iter_section_analyses(sections, job_description, token_usage):
+                analyses[index] = analysis
+                if analysis:
+                    yield "section", analysis["section"]
+            result = merge_section_analyses(analyses)
+        except BaseException:
+            _cancel(initial_task)
+            raise
+    else:
+        async for event, data in _stream_gap_analysis(resume_text, job_description, token_usage, initial_task):
+            if event == "section":
+                yield "section", data
+            else:
+                result = data
+    
+    result["token_usage"] = token_usage
+    await _apply_scores_async(resume_text, job_description, result, initial_task)
+    yield "result", result
+
+async def _stream_gap_analysis(resume_text: str, job_description: str, token_usage: Dict, initial_task):
+    """Single-call gap analysis, streamed: ("section", dict) per finished section, then ("analysis", result)."""
+    # Streamed responses carry no usage block, so the gap analysis reports the prompt estimate only
+    prompt = build_prompt("gap_analysis", build_gap_analysis_prompt, resume_text, job_description, ANALYSIS_INPUT_TOKENS, ANALYSIS_MODEL)
+    token_usage["gap_analysis"] = prompt.report
+    
+    parser = SectionStreamParser()
+    messages = [{"role": "user", "content": prompt.text}]
+    stream = router.astream("gap_analysis", messages, temperature=0.2, response_format={ "type": "json_object" })
+    try:
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if not delta:
+                continue
+            for section in parser.feed(delta):
+                try:
+                    SectionAnalysis.model_validate(section)
+                except ValueError as e:
+                    print(f"Skipping malformed streamed section: {e}")
+                    continue
+                yield "section", section
+    except BaseException:
+        _cancel(initial_task)
+        raise
+    finally:
+        # Releases the model's slot even when the client went away mid-stream
+        await stream.aclose()
+    
+    try:
+        result = load_analysis(parser.text)
+    except ValueError as e:
+        if not router.should_fall_back("gap_analysis", e):
+            result = parse_analysis_response(parser.text)
+        else:
+            # Sections already streamed stay sent, the result comes from the fallback model
+            try:
+                result, routed = await aroute_gap_analysis(messages, fallback=True)
+            except BaseException:
+                _cancel(initial_task)
+                raise
+            token_usage["gap_analysis"] = routed_usage(prompt.report, routed)
+    yield "analysis", result
+
+def flatten_edits(sections) -> List:
     # Flatten edits from all sections
     all_edits = []
     
@@ -395,8 +858,23 @@ def generate_tailored_resume(docx_path: str, sections: List[Dict]) -> str:
                 all_edits.extend(section["edits"])
         else:
              all_edits.extend(section.edits)
-            
-    output_path = docx_path.replace(".docx", "_tailored.docx")
-    apply_edits_to_docx(docx_path, all_edits, output_path)
-    return output_path
+    return all_edits
+
+def generate_tailored_resume(docx_path: str, sections: List[Dict]):
+    """The DOCX with the accepted edits applied, as an in-memory Document (published without a scratch file)."""
+    doc = Document(docx_path)
+    apply_edits_to_document(doc, flatten_edits(sections))
+    return doc
 
+def build_tailored_variants(docx_path: str, variants: List[List[Dict]]) -> List:
+    """
+    Parse the source DOCX once and return one edited in-memory Document per variant.
+    Each variant gets a deep copy of the parsed XML tree, which is cheaper than re-reading the file.
+    """
+    base_doc = Document(docx_path)
+    documents = []
+    for sections in variants:
+        doc = copy.deepcopy(base_doc)
+        apply_edits_to_document(doc, flatten_edits(sections))
+        documents.append(doc)
+    return documents
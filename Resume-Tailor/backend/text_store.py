@@ -0,0 +1,142 @@
+"""
+Compressed, content-addressed storage for saved resume texts.
+
+SavedResume rows only keep sha256 digests of their original text, tailored text and
+tailored sections; the payloads are zlib-compressed into TextBlob, one row per distinct
+text, so the same original resume saved many times is stored once. Queries and
+relationship loads touching savedresume stay small, and payloads are read only by the
+endpoints that return them.
+
+The functions take a sync Session; async handlers call them through
+AsyncSession.run_sync.
+
+prune_orphan_texts() runs outside the save transactions, so a blob can look orphaned
+between put_text() and the commit of the resume pointing at it. put_text() therefore
+refreshes created_at on every use, and only blobs unused for TEXT_ORPHAN_GRACE_MINUTES
+are pruned.
+"""
+import hashlib
+import json
+import os
+import zlib
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import delete, inspect, select, text, union, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from models import SavedResume, TextBlob
+
+TEXT_COMPRESSION_LEVEL = int(os.getenv("TEXT_COMPRESSION_LEVEL", "6"))
+TEXT_MIGRATION_BATCH = 200
+TEXT_ORPHAN_GRACE_MINUTES = int(os.getenv("TEXT_ORPHAN_GRACE_MINUTES", "60"))
+
+_DIGEST_COLUMNS = ("original_text_digest", "tailored_text_digest", "tailored_sections_digest")
+
+
+def text_digest(value: str) -> str:
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()
+
+
+def _insert_ignore(session: Session):
+    insert = postgresql.insert if session.get_bind().dialect.name == "postgresql" else sqlite.insert
+    return insert(TextBlob).on_conflict_do_nothing(index_elements=["digest"])
+
+
+def put_text(session: Session, value: str) -> str:
+    """Store a text (once per distinct content) and return its digest. Doesn't commit."""
+    digest = text_digest(value)
+    now = datetime.now()
+    # Reusing a stored text restarts its grace period, so the pruner leaves it alone
+    if session.execute(update(TextBlob).where(TextBlob.digest == digest).values(created_at=now)).rowcount:
+        return digest
+    raw = value.encode("utf-8")
+    # ON CONFLICT DO NOTHING: a concurrent save of the same text is not an error
+    session.execute(_insert_ignore(session).values(
+        digest=digest, data=zlib.compress(raw, TEXT_COMPRESSION_LEVEL), size=len(raw), created_at=now
+    ))
+    return digest
+
+
+def get_texts(session: Session, digests: Iterable[Optional[str]]) -> Dict[str, str]:
+    wanted = {d for d in digests if d}
+    if not wanted:
+        return {}
+    rows = session.execute(select(TextBlob.digest, TextBlob.data).where(TextBlob.digest.in_(wanted))).all()
+    return {digest: zlib.decompress(data).decode("utf-8") for digest, data in rows}
+
+
+def store_resume_payload(
+    session: Session,
+    resume: SavedResume,
+    tailored_text: str,
+    tailored_sections: List[Dict],
+    original_text: Optional[str] = None,
+):
+    """Point the resume at blobs holding the given payload and clear any inline copy."""
+    if original_text is not None:
+        resume.original_text_digest = put_text(session, original_text)
+        resume.original_text = ""
+    resume.tailored_text_digest = put_text(session, tailored_text)
+    resume.tailored_sections_digest = put_text(session, json.dumps(tailored_sections))
+    resume.tailored_text = ""
+    resume.tailored_sections_json = ""
+    session.add(resume)
+
+
+def load_resume_payload(session: Session, resume: SavedResume) -> Dict:
+    """Fetch the texts of one saved resume in a single query (inline columns for unmigrated rows)."""
+    texts = get_texts(session, (getattr(resume, column) for column in _DIGEST_COLUMNS))
+    sections_json = texts.get(resume.tailored_sections_digest) or resume.tailored_sections_json
+    return {
+        "original_text": texts.get(resume.original_text_digest, resume.original_text),
+        "tailored_text": texts.get(resume.tailored_text_digest, resume.tailored_text),
+        "tailored_sections": json.loads(sections_json) if sections_json else [],
+    }
+
+
+def ensure_columns(engine):
+    """create_all() doesn't add columns to an existing savedresume table, so add them here."""
+    existing = {column["name"] for column in inspect(engine).get_columns("savedresume")}
+    with engine.begin() as conn:
+        for column in _DIGEST_COLUMNS:
+            if column not in existing:
+                conn.execute(text(f"ALTER TABLE savedresume ADD COLUMN {column} VARCHAR"))
+
+
+def migrate_inline_payloads(engine) -> int:
+    """Move texts of rows saved before the split into TextBlob, in batches. Returns rows migrated."""
+    migrated = 0
+    with Session(engine) as session:
+        while True:
+            resumes = session.scalars(
+                select(SavedResume).where(SavedResume.tailored_text_digest == None).limit(TEXT_MIGRATION_BATCH)  # noqa: E711
+            ).all()
+            if not resumes:
+                break
+            for resume in resumes:
+                sections_json = resume.tailored_sections_json or "[]"
+                store_resume_payload(
+                    session, resume, resume.tailored_text, json.loads(sections_json), original_text=resume.original_text
+                )
+            session.commit()
+            migrated += len(resumes)
+    if migrated:
+        print(f"Moved the texts of {migrated} saved resumes into compressed storage")
+    return migrated
+
+
+def prune_orphan_texts(session: Session, now: Optional[datetime] = None) -> int:
+    """Delete blobs no saved resume points at any more (e.g. replaced by an edit) and unused for the grace period."""
+    cutoff = (now or datetime.now()) - timedelta(minutes=TEXT_ORPHAN_GRACE_MINUTES)
+    # NOT IN with a NULL in the list matches nothing, so leave NULLs out
+    referenced = union(*(
+        select(getattr(SavedResume, column)).where(getattr(SavedResume, column) != None)  # noqa: E711
+        for column in _DIGEST_COLUMNS
+    ))
+    pruned = session.execute(
+        delete(TextBlob).where(TextBlob.created_at < cutoff, TextBlob.digest.not_in(referenced))
+    ).rowcount
+    session.commit()
+    return pruned
@@ -0,0 +1,119 @@
+"""
+Paged listing for the application tracker.
+
+GET /applications returns a light projection (no job_description) one page at a time,
+using keyset pagination: the cursor carries the sort key of the last row, so every page
+is a range scan on a (user_id, sort column, id) index instead of an OFFSET that re-reads
+all earlier rows. The ETag is a hash of the page, so an unchanged page costs a 304.
+"""
+import base64
+import hashlib
+import json
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func, text, tuple_
+from sqlmodel import select
+
+from models import Application
+
+APPLICATIONS_PAGE_SIZE = 50
+APPLICATIONS_MAX_PAGE_SIZE = 200
+
+# sort name -> (column, descending)
+SORTS = {
+    "date_desc": (Application.date_applied, True),
+    "date_asc": (Application.date_applied, False),
+    "company": (Application.company_name, False),
+}
+
+SUMMARY_COLUMNS = (
+    Application.id,
+    Application.company_name,
+    Application.job_role,
+    Application.job_link,
+    Application.date_applied,
+    Application.status,
+    Application.saved_resume_id,
+    Application.resume_path,
+    (Application.job_description != None).label("has_job_description"),  # noqa: E711 (IS NOT NULL)
+)
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def ensure_indexes(engine):
+    """create_all() doesn't add indexes to an existing application table, so add them here."""
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_application_user_date ON application (user_id, date_applied, id)"
+        ))
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_application_user_company ON application (user_id, company_name, id)"
+        ))
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_application_user_status ON application (user_id, status, date_applied)"
+        ))
+
+
+def encode_cursor(sort: str, row) -> str:
+    column, _ = SORTS[sort]
+    value = getattr(row, column.key)
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps([sort, value, row.id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(sort: str, cursor: str) -> Tuple:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_sort, value, row_id = json.loads(raw)
+        if cursor_sort != sort:
+            raise InvalidCursor("Cursor belongs to a different sort order")
+        if SORTS[sort][0] is Application.date_applied:
+            value = datetime.fromisoformat(value)
+        return value, int(row_id)
+    except InvalidCursor:
+        raise
+    except Exception:
+        raise InvalidCursor("Malformed cursor")
+
+
+def build_page_query(
+    user_id: int,
+    sort: str = "date_desc",
+    limit: int = APPLICATIONS_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    company: Optional[str] = None,
+):
+    """SELECT for one page; fetches limit + 1 rows so the caller can tell whether another page exists."""
+    column, descending = SORTS[sort]
+    query = select(*SUMMARY_COLUMNS).where(Application.user_id == user_id)
+    if status:
+        query = query.where(Application.status == status)
+    if company:
+        query = query.where(func.lower(Application.company_name).contains(company.lower(), autoescape=True))
+    if cursor:
+        value, row_id = decode_cursor(sort, cursor)
+        after = tuple_(column, Application.id)
+        query = query.where(after < (value, row_id) if descending else after > (value, row_id))
+    if descending:
+        query = query.order_by(column.desc(), Application.id.desc())
+    else:
+        query = query.order_by(column.asc(), Application.id.asc())
+    return query.limit(limit + 1)
+
+
+def build_page(rows: List, sort: str, limit: int) -> Dict:
+    items = [dict(row._mapping) for row in rows[:limit]]
+    next_cursor = encode_cursor(sort, rows[limit - 1]) if len(rows) > limit else None
+    return {"items": items, "next_cursor": next_cursor}
+
+
+def page_digest(body: bytes) -> str:
+    """Validator for a page body, sent as a weak ETag."""
+    return hashlib.sha256(body).hexdigest()[:32]
@@ -0,0 +1,235 @@
+"""
+Streaming resume uploads.
+
+With `resume: UploadFile = File(...)` Starlette spools the whole body before the endpoint
+runs, and `await resume.read()` then copies it into memory a second time. Upload endpoints
+read the request stream themselves instead: the file part is written straight to its
+destination in UPLOAD_CHUNK_SIZE pieces and hashed on the way, so an upload costs one chunk
+of memory and its sha256 (the analysis cache key) comes for free. Content-Length is checked
+against UPLOAD_MAX_MB before anything is read, the bytes actually received are counted too,
+and the first bytes must look like a PDF. Any failure stops reading the body at that point.
+"""
+import hashlib
+import os
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional
+
+from python_multipart import MultipartParser
+from python_multipart.exceptions import FormParserError
+from python_multipart.multipart import parse_options_header
+from starlette.requests import Request
+
+from workers import run_io
+
+UPLOAD_MAX_MB = int(os.getenv("UPLOAD_MAX_MB", "10"))
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(256 * 1024)))
+# Room for the text fields (a pasted job description) next to the file
+MAX_FIELD_BYTES = 1024 * 1024
+
+# PDF readers accept the header anywhere in the first KB
+PDF_MAGIC = b"%PDF-"
+SNIFF_BYTES = 1024
+
+
+class UploadError(Exception):
+    status_code = 400
+
+    def __init__(self, detail: str):
+        super().__init__(detail)
+        self.detail = detail
+
+
+class UploadTooLarge(UploadError):
+    status_code = 413
+
+
+class UnsupportedUpload(UploadError):
+    status_code = 415
+
+
+class MalformedUpload(UploadError):
+    status_code = 422
+
+
+@dataclass
+class StreamedUpload:
+    filename: str
+    path: str
+    digest: str
+    size: int
+    fields: Dict[str, str] = field(default_factory=dict)
+
+    def flag(self, name: str) -> bool:
+        return self.fields.get(name, "").strip().lower() in ("1", "true", "on", "yes")
+
+
+def upload_form_schema(file_field: str, required: tuple, optional: tuple = ()) -> Dict:
+    """openapi_extra for an endpoint that reads its form itself, so /docs still shows the form."""
+    properties = {name: {"type": "string"} for name in (*required, *optional)}
+    properties[file_field] = {"type": "string", "format": "binary"}
+    schema = {"type": "object", "properties": properties, "required": [file_field, *required]}
+    return {"requestBody": {"required": True, "content": {"multipart/form-data": {"schema": schema}}}}
+
+
+def _write_chunk(f, digest, data: bytes):
+    # sha256 releases the GIL for large buffers, so hashing stays off the event loop too
+    digest.update(data)
+    f.write(data)
+
+
+class _FormReader:
+    """Collects python-multipart callbacks; the async loop in receive_upload acts on them."""
+
+    def __init__(self, file_field: str):
+        self.file_field = file_field
+        self.fields: Dict[str, str] = {}
+        self.events = []
+        self._header_name = b""
+        self._header_value = b""
+        self._disposition = b""
+        self._name: Optional[str] = None
+        self._is_file = False
+        self._data = bytearray()
+
+    def on_part_begin(self):
+        self._disposition = b""
+        self._name = None
+        self._is_file = False
+        self._data = bytearray()
+
+    def on_header_field(self, data: bytes, start: int, end: int):
+        self._header_name += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def on_header_end(self):
+        if self._header_name.lower() == b"content-disposition":
+            self._disposition = self._header_value
+        self._header_name = b""
+        self._header_value = b""
+
+    def on_headers_finished(self):
+        _, options = parse_options_header(self._disposition)
+        if b"name" not in options:
+            raise MalformedUpload('Every form part needs a Content-Disposition name')
+        self._name = options[b"name"].decode("utf-8", "replace")
+        if b"filename" in options:
+            if self._name != self.file_field:
+                raise MalformedUpload(f"Unexpected file field '{self._name}'")
+            self._is_file = True
+            self.events.append(("file_start", options[b"filename"].decode("utf-8", "replace")))
+
+    def on_part_data(self, data: bytes, start: int, end: int):
+        if self._is_file:
+            self.events.append(("file_data", data[start:end]))
+            return
+        if len(self._data) + (end - start) > MAX_FIELD_BYTES:
+            raise UploadTooLarge(f"Field '{self._name}' is larger than {MAX_FIELD_BYTES // 1024} KB")
+        self._data.extend(data[start:end])
+
+    def on_part_end(self):
+        if self._is_file:
+            self.events.append(("file_end", None))
+        else:
+            self.fields[self._name] = self._data.decode("utf-8", "replace")
+
+
+async def receive_upload(
+    request: Request,
+    file_field: str,
+    destination: Callable[[str], str],
+    max_bytes: Optional[int] = None,
+) -> StreamedUpload:
+    """
+    Read a multipart form with one PDF file part from the request stream.
+    destination(filename) is called (in the I/O pool) once the part's headers arrive and
+    returns the path to write to. Raises an UploadError subclass, after removing any partial
+    file, when the body is too large, not a PDF or not a usable form.
+    """
+    max_bytes = UPLOAD_MAX_MB * 1024 * 1024 if max_bytes is None else max_bytes
+    headers = request.headers
+
+    content_type, params = parse_options_header(headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise UnsupportedUpload("Expected a multipart/form-data upload")
+    body_limit = max_bytes + MAX_FIELD_BYTES
+    too_large = f"Resume is larger than {max_bytes / (1024 * 1024):g} MB"
+    try:
+        declared = int(headers.get("content-length", "0"))
+    except ValueError:
+        raise MalformedUpload("Invalid Content-Length")
+    if declared > body_limit:
+        # Rejected before a single body byte is read
+        raise UploadTooLarge(too_large)
+
+    reader = _FormReader(file_field)
+    parser = MultipartParser(params[b"boundary"], {
+        "on_part_begin": reader.on_part_begin,
+        "on_header_field": reader.on_header_field,
+        "on_header_value": reader.on_header_value,
+        "on_header_end": reader.on_header_end,
+        "on_headers_finished": reader.on_headers_finished,
+        "on_part_data": reader.on_part_data,
+        "on_part_end": reader.on_part_end,
+    })
+
+    digest = hashlib.sha256()
+    filename = path = None
+    out = None
+    pending = bytearray()
+    size = received = 0
+    sniffed = done = False
+    try:
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > body_limit:
+                raise UploadTooLarge(too_large)
+            try:
+                parser.write(chunk)
+            except FormParserError:
+                raise MalformedUpload("Invalid multipart data")
+
+            for event, data in reader.events:
+                if event == "file_start":
+                    if path is not None:
+                        raise MalformedUpload(f"Only one '{file_field}' file is accepted")
+                    filename = data
+                    path = await run_io(destination, filename)
+                    out = await run_io(open, path, "wb")
+                elif event == "file_data":
+                    size += len(data)
+                    if size > max_bytes:
+                        raise UploadTooLarge(too_large)
+                    pending.extend(data)
+                if not sniffed and (len(pending) >= SNIFF_BYTES or event == "file_end"):
+                    if PDF_MAGIC not in pending[:SNIFF_BYTES]:
+                        raise UnsupportedUpload("Resume must be a PDF file")
+                    sniffed = True
+                # Fixed-size writes; the tail goes out when the part ends
+                while sniffed and len(pending) >= UPLOAD_CHUNK_SIZE:
+                    await run_io(_write_chunk, out, digest, bytes(pending[:UPLOAD_CHUNK_SIZE]))
+                    del pending[:UPLOAD_CHUNK_SIZE]
+                if event == "file_end":
+                    if pending:
+                        await run_io(_write_chunk, out, digest, bytes(pending))
+                        pending.clear()
+                    await run_io(out.close)
+                    done = True
+            reader.events.clear()
+        parser.finalize()
+
+        if path is None:
+            raise MalformedUpload(f"Form field '{file_field}' with a PDF file is required")
+        if not done:
+            raise MalformedUpload("Upload ended before the file was complete")
+    except BaseException:
+        # Rejected, disconnected or cancelled: don't leave a partial file behind
+        if out is not None:
+            out.close()
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        raise
+    return StreamedUpload(filename=filename, path=path, digest=digest.hexdigest(), size=size, fields=reader.fields)
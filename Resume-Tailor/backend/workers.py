@@ -0,0 +1,185 @@
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Dict, Optional
+
+# Pool sizes and queue limits (override via environment)
+CPU_WORKERS = int(os.getenv("CPU_WORKERS", str(max(1, (os.cpu_count() or 2) - 1))))
+IO_WORKERS = int(os.getenv("IO_WORKERS", "16"))
+CPU_MAX_QUEUE = int(os.getenv("CPU_MAX_QUEUE", "32"))
+IO_MAX_QUEUE = int(os.getenv("IO_MAX_QUEUE", "256"))
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", str(os.cpu_count() or 1)))
+HASH_MAX_QUEUE = int(os.getenv("HASH_MAX_QUEUE", "64"))
+
+
+class PoolSaturatedError(RuntimeError):
+    """Raised when a pool's wait queue is full, callers should answer 503."""
+
+
+def _warm_up_cpu_worker():
+    # Import the heavy conversion stack once per worker process instead of per job
+    try:
+        import pdf_handler  # noqa: F401
+    except ImportError as e:
+        print(f"Worker warm-up skipped: {e}")
+
+
+class WorkerPool:
+    """
+    Bounded execution layer in front of an Executor.
+    At most max_workers jobs run at once, at most max_queue wait for a slot,
+    anything beyond that is rejected instead of piling up in memory.
+    """
+
+    def __init__(self, name: str, executor_factory: Callable[[], Executor], max_workers: int, max_queue: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor_factory = executor_factory
+        self._executor: Optional[Executor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop = None
+
+        self.queued = 0
+        self.active = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.max_queued_seen = 0
+        self._total_run_ms = 0.0
+        self._total_wait_ms = 0.0
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = self._executor_factory()
+        return self._executor
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_workers)
+            self._loop = loop
+        return self._semaphore
+
+    async def run(self, fn: Callable, *args, **kwargs):
+        if self.queued >= self.max_queue:
+            self.rejected += 1
+            raise PoolSaturatedError(f"{self.name} pool is saturated ({self.queued} jobs waiting)")
+
+        semaphore = self._get_semaphore()
+        enqueued_at = time.perf_counter()
+        self.queued += 1
+        self.max_queued_seen = max(self.max_queued_seen, self.queued)
+        try:
+            await semaphore.acquire()
+        finally:
+            self.queued -= 1
+
+        started_at = time.perf_counter()
+        self._total_wait_ms += (started_at - enqueued_at) * 1000
+        self.active += 1
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self.executor, partial(fn, *args, **kwargs))
+            self.completed += 1
+            return result
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.active -= 1
+            self._total_run_ms += (time.perf_counter() - started_at) * 1000
+            semaphore.release()
+
+    def warm_up(self):
+        """Start worker processes/threads ahead of the first request."""
+        for _ in range(self.max_workers):
+            self.executor.submit(int)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> Dict:
+        finished = self.completed + self.failed
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "active": self.active,
+            "queued": self.queued,
+            "max_queued_seen": self.max_queued_seen,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(self._total_wait_ms / finished, 1) if finished else 0.0,
+            "avg_run_ms": round(self._total_run_ms / finished, 1) if finished else 0.0,
+        }
+
+
+# CPU-bound work (pdf2docx parsing and DOCX assembly) runs in separate processes so it
+# neither holds the GIL nor blocks the event loop. "spawn" avoids forking a threaded server.
+cpu_pool = WorkerPool(
+    "cpu",
+    lambda: ProcessPoolExecutor(
+        max_workers=CPU_WORKERS,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_warm_up_cpu_worker,
+    ),
+    CPU_WORKERS,
+    CPU_MAX_QUEUE,
+)
+
+# Blocking I/O (sync DB sessions, file copies) runs in threads. So do DOCX rewriting for
+# /generate and /generate/batch and the LibreOffice PDF export: python-docx edits take
+# milliseconds and the export waits on a subprocess, neither is worth pickling to a process.
+io_pool = WorkerPool(
+    "io",
+    lambda: ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="io-worker"),
+    IO_WORKERS,
+    IO_MAX_QUEUE,
+)
+
+
+# Password hashing: bcrypt releases the GIL, so threads use every core. A pool of its own
+# keeps a burst of logins from starving DB and file work in the I/O pool, and its short
+# queue turns an overload into fast 503s instead of logins waiting for seconds.
+hash_pool = WorkerPool(
+    "hash",
+    lambda: ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="hash-worker"),
+    HASH_WORKERS,
+    HASH_MAX_QUEUE,
+)
+
+
+async def run_cpu(fn: Callable, *args, **kwargs):
+    """Run a picklable, CPU-bound function in the process pool."""
+    return await cpu_pool.run(fn, *args, **kwargs)
+
+
+async def run_io(fn: Callable, *args, **kwargs):
+    """Run a blocking function in the I/O thread pool."""
+    return await io_pool.run(fn, *args, **kwargs)
+
+
+async def run_hash(fn: Callable, *args, **kwargs):
+    """Run a password hash or check in the hashing thread pool."""
+    return await hash_pool.run(fn, *args, **kwargs)
+
+
+def start_pools():
+    cpu_pool.warm_up()
+
+
+def shutdown_pools():
+    cpu_pool.shutdown()
+    io_pool.shutdown()
+    hash_pool.shutdown()
+
+
+def pool_stats() -> Dict:
+    return {"cpu": cpu_pool.stats(), "io": io_pool.stats(), "hash": hash_pool.stats()}
@@ -256,7 +256,8 @@ export default function TailorPage() {
                 // Trigger download
                 const link = document.createElement('a');
                 link.href = data.download_url;
-                link.download = data.pdf_path ? data.pdf_path.split(/[\\/]/).pop() : 'resume.docx';
+                // The last URL segment is the file name, the rest addresses the stored file
+                link.download = decodeURIComponent(data.download_url.split('/').pop() || 'resume.docx');
                 document.body.appendChild(link);
                 link.click();
                 document.body.removeChild(link);
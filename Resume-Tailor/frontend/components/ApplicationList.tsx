@@ -1,5 +1,5 @@
 "use client";
-import React, { useEffect, useState } from 'react';
+import React, { useCallback, useEffect, useState } from 'react';
 
 import { useRouter } from 'next/navigation';
 
@@ -11,12 +11,22 @@ interface Application {
     date_applied: string;
     status: string;
     resume_path: string;
-    job_description?: string;
+    has_job_description: boolean;
     saved_resume_id?: number;
 }
 
+interface ApplicationPage {
+    items: Application[];
+    next_cursor: string | null;
+}
+
+const PAGE_SIZE = 50;
+
 export default function ApplicationList({ refreshTrigger }: { refreshTrigger: number }) {
     const [applications, setApplications] = useState<Application[]>([]);
+    const [nextCursor, setNextCursor] = useState<string | null>(null);
+    const [statusFilter, setStatusFilter] = useState('');
+    const [companyFilter, setCompanyFilter] = useState('');
     const [selectedApp, setSelectedApp] = useState<Application | null>(null);
     const [timeline, setTimeline] = useState<any[]>([]);
     const [newComment, setNewComment] = useState('');
@@ -24,34 +34,55 @@ export default function ApplicationList({ refreshTrigger }: { refreshTrigger: nu
 
     const statusOptions = ['Started', 'Applied', 'Interview', 'Offered', 'Rejected'];
 
-    useEffect(() => {
+    // One page of the list; the browser revalidates it with the ETag, so unchanged pages come back as 304
+    const fetchPage = useCallback(async (cursor: string | null): Promise<ApplicationPage | null> => {
         const token = localStorage.getItem('auth_token');
-        fetch('http://localhost:8000/applications', {
+        const params = new URLSearchParams({ limit: String(PAGE_SIZE) });
+        if (cursor) params.set('cursor', cursor);
+        if (statusFilter) params.set('status', statusFilter);
+        if (companyFilter.trim()) params.set('company', companyFilter.trim());
+
+        const res = await fetch(`http://localhost:8000/applications?${params}`, {
             headers: {
                 'Authorization': `Bearer ${token}`
             }
-        })
-            .then(res => {
-                if (res.status === 401) {
-                    localStorage.removeItem('auth_token');
-                    router.push('/login');
-                    throw new Error("Unauthorized");
-                }
-                return res.json();
-            })
-            .then(data => {
-                if (Array.isArray(data)) {
-                    setApplications(data);
-                } else {
-                    console.error("Invalid response from applications:", data);
+        });
+        if (res.status === 401) {
+            localStorage.removeItem('auth_token');
+            router.push('/login');
+            return null;
+        }
+        const data = await res.json();
+        if (!Array.isArray(data.items)) {
+            console.error("Invalid response from applications:", data);
+            return null;
+        }
+        return data;
+    }, [statusFilter, companyFilter, router]);
+
+    useEffect(() => {
+        fetchPage(null)
+            .then(page => {
+                if (page) {
+                    setApplications(page.items);
+                    setNextCursor(page.next_cursor);
                 }
             })
-            .catch(err => {
-                if (err.message !== "Unauthorized") {
-                    console.error("Error fetching applications:", err);
-                }
-            });
-    }, [refreshTrigger, router]);
+            .catch(err => console.error("Error fetching applications:", err));
+    }, [refreshTrigger, fetchPage]);
+
+    const handleLoadMore = async () => {
+        if (!nextCursor) return;
+        try {
+            const page = await fetchPage(nextCursor);
+            if (page) {
+                setApplications(prev => [...prev, ...page.items]);
+                setNextCursor(page.next_cursor);
+            }
+        } catch (error) {
+            console.error('Error fetching applications:', error);
+        }
+    };
 
     const fetchTimeline = async (appId: number) => {
         try {
@@ -99,12 +130,24 @@ export default function ApplicationList({ refreshTrigger }: { refreshTrigger: nu
         }
     };
 
-    const handleTailor = (app: Application) => {
-        if (app.job_description) {
-            localStorage.setItem('tailor_jd', app.job_description);
-            router.push('/tailor');
-        } else {
+    const handleTailor = async (app: Application) => {
+        if (!app.has_job_description) {
             alert("No Job Description available for this application.");
+            return;
+        }
+        // The list leaves job descriptions out, so fetch this one
+        try {
+            const token = localStorage.getItem('auth_token');
+            const response = await fetch(`http://localhost:8000/applications/${app.id}`, {
+                headers: {
+                    'Authorization': `Bearer ${token}`
+                }
+            });
+            const data = await response.json();
+            localStorage.setItem('tailor_jd', data.job_description);
+            router.push('/tailor');
+        } catch (error) {
+            console.error('Error fetching application:', error);
         }
     };
 
@@ -167,6 +210,25 @@ export default function ApplicationList({ refreshTrigger }: { refreshTrigger: nu
     return (
         <div className="mt-8">
             <h2 className="text-2xl font-bold mb-4 text-gray-800 dark:text-gray-100">Application History</h2>
+            <div className="flex flex-wrap gap-3 mb-4">
+                <select
+                    value={statusFilter}
+                    onChange={(e) => setStatusFilter(e.target.value)}
+                    className="px-3 py-2 text-sm border border-slate-300 rounded-lg bg-white dark:bg-gray-800 dark:text-gray-100"
+                >
+                    <option value="">All statuses</option>
+                    {statusOptions.map(status => (
+                        <option key={status} value={status}>{status}</option>
+                    ))}
+                </select>
+                <input
+                    type="text"
+                    value={companyFilter}
+                    onChange={(e) => setCompanyFilter(e.target.value)}
+                    placeholder="Filter by company..."
+                    className="px-3 py-2 text-sm border border-slate-300 rounded-lg outline-none focus:ring-2 focus:ring-indigo-500 dark:bg-gray-800 dark:text-gray-100"
+                />
+            </div>
             <div className="overflow-x-auto">
                 <table className="min-w-full bg-white dark:bg-gray-800 border border-gray-200 dark:border-gray-700 rounded-lg shadow-sm">
                     <thead>
@@ -268,6 +330,16 @@ export default function ApplicationList({ refreshTrigger }: { refreshTrigger: nu
                         No applications tracked yet.
                     </div>
                 )}
+                {nextCursor && (
+                    <div className="text-center py-4">
+                        <button
+                            onClick={handleLoadMore}
+                            className="px-4 py-2 bg-slate-50 text-slate-700 rounded-md hover:bg-slate-100 font-medium transition-colors"
+                        >
+                            Load more
+                        </button>
+                    </div>
+                )}
             </div>
 
             {/* Details Modal */}
@@ -0,0 +1,84 @@
+import os
+import sys
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from sqlmodel import SQLModel, Session, create_engine
+import analysis_cache
+from analysis_cache import make_cache_key, hash_bytes, get_cached_analysis, store_analysis
+from models import AnalysisCacheEntry
+
+def _setup():
+    tmp_dir = tempfile.mkdtemp()
+    analysis_cache.CACHE_DIR = os.path.join(tmp_dir, "cache")
+    engine = create_engine(f"sqlite:///{os.path.join(tmp_dir, 'cache.db')}")
+    SQLModel.metadata.create_all(engine)
+
+    docx_path = os.path.join(tmp_dir, "resume.docx")
+    with open(docx_path, "wb") as f:
+        f.write(b"fake docx bytes")
+    return tmp_dir, engine, docx_path
+
+def test_cache_key_normalizes_jd():
+    digest = hash_bytes(b"%PDF-1.4 resume")
+    key_a = make_cache_key(digest, "Python  developer\n\nremote", "1", "gpt-4o")
+    key_b = make_cache_key(digest, " Python developer remote ", "1", "gpt-4o")
+    key_c = make_cache_key(digest, "Python developer remote", "2", "gpt-4o")
+
+    assert key_a == key_b
+    assert key_a != key_c
+    print("SUCCESS: Cache key ignores whitespace but not prompt version.")
+
+def test_hit_miss_and_ttl():
+    tmp_dir, engine, docx_path = _setup()
+    result = {"sections": [{"section_name": "Summary"}], "initial_score": 60}
+    key = make_cache_key(hash_bytes(b"resume"), "JD", "1", "gpt-4o")
+
+    with Session(engine) as session:
+        assert get_cached_analysis(session, key) is None
+        store_analysis(session, key, result, docx_path)
+
+        cached_result, cached_docx = get_cached_analysis(session, key)
+        assert cached_result == result
+        assert os.path.exists(cached_docx)
+
+        # Expire the entry
+        entry = session.get(AnalysisCacheEntry, key)
+        entry.created_at = datetime.now() - timedelta(hours=analysis_cache.CACHE_TTL_HOURS + 1)
+        session.add(entry)
+        session.commit()
+        assert get_cached_analysis(session, key) is None
+        assert not os.path.exists(cached_docx)
+
+    print("SUCCESS: Cache hit, miss and TTL expiry work.")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+
+def test_lru_eviction_and_empty_results():
+    tmp_dir, engine, docx_path = _setup()
+    analysis_cache.CACHE_MAX_ENTRIES = 2
+
+    with Session(engine) as session:
+        keys = [make_cache_key(hash_bytes(bytes([i])), "JD", "1", "gpt-4o") for i in range(3)]
+        for key in keys:
+            store_analysis(session, key, {"sections": [{"section_name": key}]}, docx_path)
+
+        # Oldest entry was evicted
+        assert session.get(AnalysisCacheEntry, keys[0]) is None
+        assert session.get(AnalysisCacheEntry, keys[2]) is not None
+
+        # Failed analyses are never cached
+        empty_key = make_cache_key(hash_bytes(b"empty"), "JD", "1", "gpt-4o")
+        store_analysis(session, empty_key, {"sections": []}, docx_path)
+        assert session.get(AnalysisCacheEntry, empty_key) is None
+
+    print("SUCCESS: LRU eviction and empty-result skipping work.")
+    analysis_cache.CACHE_MAX_ENTRIES = 500
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    test_cache_key_normalizes_jd()
+    test_hit_miss_and_ttl()
+    test_lru_eviction_and_empty_results()
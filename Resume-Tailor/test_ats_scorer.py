@@ -0,0 +1,94 @@
+import asyncio
+import json
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+import tailor
+from llm_client import llm
+from ats_scorer import extract_keywords, score_resume, terms
+
+JOB_DESCRIPTION = """Senior Backend Engineer
+Acme Corp, Berlin
+You must have 5+ years of experience with Python and PostgreSQL.
+Experience running services on K8s is required.
+Knowledge of Kafka or other streaming platforms is a plus.
+Build REST APIs and distributed systems, own CI/CD pipelines on AWS.
+We offer great benefits, a competitive salary and a 401k plan.
+Acme is an equal opportunity employer."""
+
+RESUME = """Jane Doe
+Backend engineer. Built Python/FastAPI services on Postgres and Kubernetes.
+Led a team migrating batch jobs to streaming."""
+
+EDITS = [{
+    "action": "replace",
+    "target_text": "migrating batch jobs to streaming.",
+    "new_content": "migrating batch jobs to Apache Kafka streaming on Amazon Web Services.",
+    "rationale": "",
+}]
+
+
+def test_synonyms_and_boilerplate():
+    assert terms("K8s, Postgres and Amazon Web Services via CI CD") == ["kubernetes", "postgresql", "aws", "via", "ci/cd"]
+    keywords = extract_keywords(JOB_DESCRIPTION)
+    assert {"python", "postgresql", "kubernetes", "kafka", "aws", "ci/cd", "rest_api"} <= set(keywords)
+    assert "benefits" not in keywords and "salary" not in keywords and "employer" not in keywords
+    # Required skills outweigh generic posting vocabulary
+    assert keywords["kubernetes"] > keywords["services"] > keywords["experience"]
+    print("SUCCESS: skills are matched through synonyms and boilerplate is ignored")
+
+
+def test_scores_are_deterministic_and_fast():
+    started = time.perf_counter()
+    scores = score_resume(RESUME, JOB_DESCRIPTION, EDITS)
+    elapsed = time.perf_counter() - started
+    assert scores == score_resume(RESUME, JOB_DESCRIPTION, EDITS)
+    assert 0 < scores["initial_score"] < scores["projected_score"] <= 100
+    breakdown = {k["keyword"]: k for k in scores["keywords"]}
+    assert breakdown["kubernetes"]["resume_count"] == 1 # written as "Kubernetes", asked as "K8s"
+    assert breakdown["kafka"]["resume_count"] == 0 and breakdown["kafka"]["projected_count"] == 1
+    assert "kafka" in scores["reasoning"]
+    # Edits that don't apply leave the projection at the initial score
+    unmatched = [{**EDITS[0], "target_text": "not in the resume"}]
+    assert score_resume(RESUME, JOB_DESCRIPTION, unmatched)["projected_score"] == scores["initial_score"]
+    assert elapsed < 0.05
+    # A long resume against a long posting stays well under the budget
+    started = time.perf_counter()
+    score_resume(RESUME * 50, JOB_DESCRIPTION * 20, EDITS * 20)
+    assert time.perf_counter() - started < 0.05
+    print("SUCCESS: local scores are deterministic, explain themselves and take milliseconds")
+
+
+def test_local_mode_skips_the_scoring_calls():
+    prompts = []
+
+    async def fake_acomplete(model, messages, **kwargs):
+        prompts.append(messages[0]["content"])
+        content = json.dumps({"company_name": "Acme Corp", "job_title": "Backend Engineer", "sections": [
+            {"section_name": "Experience", "gaps": [], "suggestions": [], "edits": EDITS},
+        ]})
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))], usage=None)
+
+    original = (llm.acomplete, tailor.extract_text_from_docx, tailor.ANALYSIS_MODE, tailor.SCORING_MODE)
+    llm.acomplete = fake_acomplete
+    tailor.extract_text_from_docx = lambda path: RESUME
+    tailor.ANALYSIS_MODE, tailor.SCORING_MODE = "single", "local"
+    try:
+        result = asyncio.run(tailor.analyze_gaps_async("resume.docx", JOB_DESCRIPTION))
+    finally:
+        llm.acomplete, tailor.extract_text_from_docx, tailor.ANALYSIS_MODE, tailor.SCORING_MODE = original
+
+    assert len(prompts) == 1 and "ATS Specialist" not in prompts[0]
+    assert result["initial_score"] < result["projected_score"]
+    assert result["score_breakdown"] == score_resume(RESUME, JOB_DESCRIPTION, EDITS)["keywords"]
+    print("SUCCESS: local scoring needs only the gap analysis call")
+
+
+if __name__ == "__main__":
+    test_synonyms_and_boilerplate()
+    test_scores_are_deterministic_and_fast()
+    test_local_mode_skips_the_scoring_calls()
@@ -0,0 +1,55 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from auth_cache import IdentityCache, identity_of
+from models import User
+
+
+def test_hits_and_lru_eviction():
+    cache = IdentityCache(max_entries=2, ttl_seconds=60)
+    assert cache.get("a") is None
+    cache.put("a", {"id": 1}, None)
+    cache.put("b", {"id": 2}, None)
+    assert cache.get("a") == {"id": 1} # "a" is now the most recently used
+    cache.put("c", {"id": 3}, None)
+    assert cache.get("b") is None
+    assert cache.get("a") == {"id": 1} and cache.get("c") == {"id": 3}
+
+    stats = cache.stats()
+    assert stats["hits"] == 3 and stats["misses"] == 2 and stats["evictions"] == 1
+    print("SUCCESS: identity cache serves hot tokens and evicts the least recently used")
+
+
+def test_entries_expire_with_the_token():
+    cache = IdentityCache(max_entries=10, ttl_seconds=60)
+    cache.put("expired", {"id": 1}, time.time() - 1)
+    cache.put("short", {"id": 2}, time.time() + 0.05)
+    assert cache.get("expired") is None
+    assert cache.get("short") == {"id": 2}
+    time.sleep(0.06)
+    assert cache.get("short") is None
+    assert cache.stats()["expired"] == 2
+
+    # The TTL caps entries of long-lived tokens too
+    capped = IdentityCache(max_entries=10, ttl_seconds=0)
+    capped.put("long", {"id": 3}, time.time() + 3600)
+    assert capped.get("long") is None
+    print("SUCCESS: cached identities expire with their token or the TTL")
+
+
+def test_password_hashes_are_not_cached():
+    user = User(id=7, email="jane@example.com", hashed_password="$argon2id$secret")
+    identity = identity_of(user)
+    assert identity == {"id": 7, "email": "jane@example.com"}
+    rebuilt = User.model_construct(**identity)
+    assert rebuilt.id == 7 and "hashed_password" not in rebuilt.__dict__
+    print("SUCCESS: only the id and email of a user are cached")
+
+
+if __name__ == "__main__":
+    test_hits_and_lru_eviction()
+    test_entries_expire_with_the_token()
+    test_password_hashes_are_not_cached()
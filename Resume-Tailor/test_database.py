@@ -0,0 +1,62 @@
+import asyncio
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from sqlmodel import SQLModel, select, text
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from database import async_url, create_async_db_engine, create_db_engine, sync_url
+from models import User
+
+
+def test_production_profile_pragmas():
+    path = os.path.join(tempfile.mkdtemp(), "profile.db")
+    engine = create_db_engine(f"sqlite:///{path}", profile="production", echo=False)
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1 # NORMAL
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() > 0
+    assert engine.echo is False
+    engine.dispose()
+    print("SUCCESS: production profile enables WAL, synchronous=NORMAL and a busy timeout")
+
+
+def test_database_url_drivers():
+    assert sync_url("postgres://u:p@db/app") == "postgresql+psycopg://u:p@db/app"
+    assert async_url("postgresql://u:p@db/app") == "postgresql+psycopg://u:p@db/app"
+    assert async_url("sqlite:///applications.db") == "sqlite+aiosqlite:///applications.db"
+    # An explicit driver is kept as is
+    assert async_url("postgresql+asyncpg://u:p@db/app") == "postgresql+asyncpg://u:p@db/app"
+    print("SUCCESS: DATABASE_URL is mapped to the sync and async drivers")
+
+
+def test_async_session_roundtrip():
+    path = os.path.join(tempfile.mkdtemp(), "async.db")
+    url = f"sqlite:///{path}"
+    engine = create_db_engine(url, echo=False)
+    SQLModel.metadata.create_all(engine)
+
+    async def roundtrip():
+        async_engine = create_async_db_engine(url, echo=False)
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            session.add(User(email="async@example.com", hashed_password="x"))
+            await session.commit()
+            found = (await session.exec(select(User).where(User.email == "async@example.com"))).first()
+        await async_engine.dispose()
+        return found
+
+    user = asyncio.run(roundtrip())
+    assert user is not None and user.id is not None
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM user")).scalar() == 1
+    engine.dispose()
+    print("SUCCESS: async session writes are visible to the sync engine")
+
+
+if __name__ == "__main__":
+    test_production_profile_pragmas()
+    test_database_url_drivers()
+    test_async_session_roundtrip()
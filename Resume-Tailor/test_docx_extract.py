@@ -0,0 +1,104 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from docx import Document
+from docx.enum.section import WD_SECTION
+from docx.enum.text import WD_BREAK
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls
+
+from docx_extract import extract_structured_text
+from tailor import extract_text_with_python_docx
+
+TEXTBOX_XML = (
+    '<w:r %s xmlns:v="urn:schemas-microsoft-com:vml"><w:pict><v:shape><v:textbox><w:txbxContent>'
+    '<w:p><w:r><w:t>Contact: jane@example.com</w:t></w:r></w:p>'
+    '<w:p><w:r><w:t>   </w:t></w:r></w:p>'
+    '<w:p><w:r><w:t xml:space="preserve">Portfolio </w:t></w:r><w:r><w:t>site</w:t></w:r></w:p>'
+    '</w:txbxContent></v:textbox></v:shape></w:pict></w:r>'
+) % nsdecls("w")
+
+HYPERLINK_XML = (
+    '<w:hyperlink %s r:id="rIdX"><w:r><w:t>github.com/jane</w:t></w:r></w:hyperlink>'
+) % nsdecls("w", "r")
+
+
+def build_resume(path):
+    doc = Document()
+    doc.sections[0].header.paragraphs[0].text = "Jane Doe | Resume"
+    doc.sections[0].footer.paragraphs[0].text = "Page footer"
+
+    doc.add_paragraph("PROFESSIONAL SUMMARY")
+    p = doc.add_paragraph("Backend engineer\twith 5 years")
+    p.add_run().add_break()
+    p.add_run("of Python")
+    p.add_run().add_break(WD_BREAK.PAGE)
+    doc.add_paragraph("   ")
+    links = doc.add_paragraph("Links: ")
+    links._p.append(parse_xml(HYPERLINK_XML))
+    doc.add_paragraph("Textbox anchor ")._p.append(parse_xml(TEXTBOX_XML))
+
+    table = doc.add_table(rows=3, cols=3)
+    table.cell(0, 0).text = "Skills"
+    table.cell(0, 1).merge(table.cell(0, 2)).text = "Python, SQL"
+    table.cell(1, 0).merge(table.cell(2, 0)).text = "Experience"
+    table.cell(1, 1).text = "Acme"
+    table.cell(1, 1).add_paragraph("Built APIs")
+    table.cell(2, 2).text = "2019 - 2024"
+
+    # Second section with its own header, third inherits it
+    second = doc.add_section(WD_SECTION.NEW_PAGE)
+    second.header.is_linked_to_previous = False
+    second.header.paragraphs[0].text = "Section two header"
+    doc.add_paragraph("EDUCATION")
+    doc.add_section(WD_SECTION.NEW_PAGE)
+    doc.add_paragraph("Certifications")
+    doc.save(path)
+
+
+def test_matches_python_docx_extractor(tmp_path=None):
+    path = os.path.join(str(tmp_path) if tmp_path else ".", "test_extract_structure.docx")
+    build_resume(path)
+    try:
+        expected = extract_text_with_python_docx(path)
+        extracted = extract_structured_text(path)
+        assert extracted.text == expected, f"\n{extracted.text!r}\n!=\n{expected!r}"
+        print("SUCCESS: streaming extraction matches python-docx output")
+    finally:
+        os.remove(path)
+
+
+def test_structural_map(tmp_path=None):
+    path = os.path.join(str(tmp_path) if tmp_path else ".", "test_extract_map.docx")
+    build_resume(path)
+    try:
+        blocks = extract_structured_text(path).blocks
+        by_text = {b.text: b for b in blocks}
+
+        assert by_text["Jane Doe | Resume"].part == "header"
+        assert by_text["Page footer"].part == "footer"
+        assert by_text["Links: github.com/jane"].kind == "paragraph"
+
+        merged = by_text["Python, SQL"]
+        assert (merged.kind, merged.table, merged.row, merged.col) == ("cell", 0, 0, 1)
+        multi = by_text["Acme Built APIs"]
+        assert (multi.row, multi.col) == (1, 1) and len(multi.paragraphs) == 2
+        # The vertically merged cell is reported once, at its top row
+        assert [b.text for b in blocks].count("Experience") == 1
+
+        textbox = by_text["Contact: jane@example.com"]
+        assert textbox.in_textbox and textbox.kind == "textbox"
+        anchor = by_text["Textbox anchor "]
+        assert anchor.paragraphs[0] < textbox.paragraphs[0]
+
+        assert len({b.id for b in blocks}) == len(blocks)
+        print("SUCCESS: structural map has parts, cell coordinates and textboxes")
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    test_matches_python_docx_extractor()
+    test_structural_map()
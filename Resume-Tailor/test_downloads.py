@@ -0,0 +1,89 @@
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+import downloads
+
+
+def use_temp_store():
+    downloads.DOWNLOADS_DIR = tempfile.mkdtemp()
+    return downloads.DOWNLOADS_DIR
+
+
+def test_publish_is_content_addressed():
+    store = use_temp_store()
+    workdir = tempfile.mkdtemp()
+    first = os.path.join(workdir, "a_tailored.docx")
+    second = os.path.join(workdir, "b_tailored.docx")
+    for path in (first, second):
+        with open(path, "wb") as f:
+            f.write(b"same bytes")
+
+    first_id = downloads.publish_file(first)
+    second_id = downloads.publish_file(second)
+    assert first_id == second_id and first_id.endswith(".docx")
+    # Both sources left the working directory, one copy is stored
+    assert os.listdir(workdir) == []
+    digest, ext = downloads.parse_download_id(first_id)
+    assert os.listdir(os.path.join(store, digest[:2])) == [digest + ext]
+
+    assert downloads.publish_bytes(b"same bytes", ".docx") == first_id
+    assert downloads.publish_bytes(b"other bytes", ".pdf") != first_id
+    print("SUCCESS: identical outputs are stored once under their sha256")
+
+
+def test_download_ids_and_etags():
+    assert downloads.parse_download_id("../../etc/passwd") is None
+    assert downloads.parse_download_id("a" * 64 + ".exe") is None
+    assert downloads.parse_download_id("a" * 64 + ".pdf") == ("a" * 64, ".pdf")
+
+    digest = "b" * 64
+    assert downloads.etag_matches(f'"{digest}"', digest)
+    assert downloads.etag_matches(f'W/"x", "{digest}"', digest)
+    assert downloads.etag_matches("*", digest)
+    assert not downloads.etag_matches('"other"', digest)
+    assert not downloads.etag_matches(None, digest)
+    assert downloads.download_url(digest + ".docx", "my resume.docx").endswith(f"/download/{digest}.docx/my%20resume.docx")
+    print("SUCCESS: download ids can't escape the store and ETags match If-None-Match lists")
+
+
+def test_collect_expires_and_evicts_least_recently_used():
+    use_temp_store()
+    now = time.time()
+    old = downloads.publish_bytes(b"old", ".docx")
+    cold = downloads.publish_bytes(b"cold" * 100, ".docx")
+    warm = downloads.publish_bytes(b"warm" * 100, ".pdf")
+    fresh = downloads.publish_bytes(b"fresh" * 100, ".pdf")
+    ages = {old: 10 * 86400, cold: 3 * 3600, warm: 2 * 3600, fresh: 60}
+    paths = {i: downloads.stored_path(*downloads.parse_download_id(i)) for i in ages}
+    for download_id, age in ages.items():
+        os.utime(paths[download_id], (now - age, now - age))
+    part = os.path.join(os.path.dirname(paths[old]), "abandoned.part")
+    open(part, "wb").close()
+    os.utime(part, (now - 10 * 86400, now - 10 * 86400))
+
+    # Re-publishing the same bytes counts as a use
+    assert downloads.publish_bytes(b"warm" * 100, ".pdf") == warm
+    assert os.path.getmtime(paths[warm]) > now - 60
+    os.utime(paths[warm], (now - 2 * 3600, now - 2 * 3600))
+
+    result = downloads.collect_downloads(now=now, ttl_seconds=86400, max_bytes=900)
+    assert result["expired"] == 2 and result["evicted"] == 1
+    assert not os.path.exists(paths[old]) and not os.path.exists(part)
+    assert not os.path.exists(paths[cold]) # Least recently used
+    assert os.path.exists(paths[warm]) and os.path.exists(paths[fresh])
+
+    # Files used in the grace period survive even above the cap
+    result = downloads.collect_downloads(now=now, ttl_seconds=86400, max_bytes=0)
+    assert not os.path.exists(paths[warm]) and os.path.exists(paths[fresh])
+    assert downloads.download_stats()["evicted"] >= 2
+    print("SUCCESS: the download store drops expired and least recently used files")
+
+
+if __name__ == "__main__":
+    test_publish_is_content_addressed()
+    test_download_ids_and_etags()
+    test_collect_expires_and_evicts_least_recently_used()
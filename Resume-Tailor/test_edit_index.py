@@ -0,0 +1,88 @@
+import os
+import sys
+import time
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from docx import Document
+from tailor import apply_edits_to_document, apply_edits_to_docx
+
+def _build_resume():
+    doc = Document()
+    doc.sections[0].header.paragraphs[0].text = "Jane Doe | jane@example.com"
+
+    p = doc.add_paragraph()
+    bold = p.add_run("Led a team ")
+    bold.bold = True
+    p.add_run("of five  engineers")
+
+    table = doc.add_table(rows=1, cols=2)
+    table.cell(0, 0).text = "Skills: Python, SQL"
+    nested = table.cell(0, 1).add_table(rows=1, cols=1)
+    nested.cell(0, 0).text = "Nested certification"
+    return doc
+
+def test_edits_reach_every_location():
+    doc = _build_resume()
+    edits = [
+        {"target_text": "Skills: Python, SQL", "new_content": "Skills: Python, SQL, FastAPI", "action": "replace"},
+        {"target_text": "jane@example.com", "new_content": "jane.doe@example.com", "action": "replace"},
+        {"target_text": "Nested certification", "new_content": "AWS Certified Developer", "action": "replace"},
+        # Spans two runs and has irregular whitespace
+        {"target_text": "team of five engineers", "new_content": "team of 5 backend engineers", "action": "replace"},
+        {"target_text": "Missing text", "new_content": "never applied", "action": "replace"},
+    ]
+    applied = apply_edits_to_document(doc, edits)
+    assert applied == 4, applied
+
+    assert "jane.doe@example.com" in doc.sections[0].header.paragraphs[0].text
+    body = doc.paragraphs[0]
+    assert body.text == "Led a team of 5 backend engineers"
+    # First run keeps its bold formatting after the cross-run splice
+    assert body.runs[0].bold is True
+    cell_text = doc.tables[0].cell(0, 0).text
+    assert cell_text == "Skills: Python, SQL, FastAPI"
+    assert doc.tables[0].cell(0, 1).tables[0].cell(0, 0).text == "AWS Certified Developer"
+    print("SUCCESS: Edits applied to header, body, table, nested table and cross-run text.")
+
+def test_many_edits_single_pass():
+    doc = Document()
+    for i in range(300):
+        doc.add_paragraph(f"Bullet point number {i} describing impact and ownership")
+    edits = [
+        {"target_text": f"Bullet point number {i} describing", "new_content": f"Delivered item {i} with", "action": "replace"}
+        for i in range(0, 300, 6)
+    ]
+    tmp_dir = tempfile.mkdtemp()
+    source = os.path.join(tmp_dir, "long.docx")
+    output = os.path.join(tmp_dir, "long_tailored.docx")
+    doc.save(source)
+
+    start = time.perf_counter()
+    apply_edits_to_docx(source, edits, output)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    result = Document(output)
+    assert result.paragraphs[6].text.startswith("Delivered item 6 with")
+    assert result.paragraphs[7].text.startswith("Bullet point number 7")
+    print(f"SUCCESS: {len(edits)} edits over 300 paragraphs applied in {elapsed_ms:.1f} ms (incl. load/save).")
+
+def test_later_edits_see_earlier_rewrites():
+    doc = Document()
+    doc.add_paragraph("Built APIs in Python")
+    edits = [
+        {"target_text": "Built APIs", "new_content": "Built REST APIs", "action": "replace"},
+        # Only exists once the first edit has run
+        {"target_text": "REST APIs in Python", "new_content": "REST APIs in Python and FastAPI", "action": "replace"},
+        # Earlier edits don't re-apply to text written after them
+        {"target_text": "FastAPI", "new_content": "FastAPI (async)", "action": "replace"},
+    ]
+    assert apply_edits_to_document(doc, edits) == 3
+    assert doc.paragraphs[0].text == "Built REST APIs in Python and FastAPI (async)"
+    print("SUCCESS: edits apply in order, each seeing the paragraph as the previous ones left it.")
+
+if __name__ == "__main__":
+    test_edits_reach_every_location()
+    test_many_edits_single_pass()
+    test_later_edits_see_earlier_rewrites()
@@ -0,0 +1,78 @@
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+import httpx
+from docx import Document
+
+import downloads
+import main
+from scratch import ScratchStore, with_ext
+
+EDITS = [{"section_name": "Experience", "edits": [{
+    "action": "replace",
+    "target_text": "Built data pipelines.",
+    "new_content": "Built streaming data pipelines on Kafka.",
+    "rationale": "",
+}]}]
+
+
+def make_upload():
+    """A scratch session holding a converted DOCX, as /analyze leaves it."""
+    main.scratch = ScratchStore(root=tempfile.mkdtemp(), ttl_seconds=3600, max_bytes=10**9)
+    downloads.DOWNLOADS_DIR = tempfile.mkdtemp()
+    handle = main.scratch.new_handle("cv.pdf")
+    doc = Document()
+    doc.add_paragraph("Jane Doe")
+    doc.add_paragraph("Built data pipelines.")
+    doc.save(main.scratch.path(handle, ".docx"))
+    return handle
+
+
+def fake_docx_to_pdf(docx_path):
+    # Slow enough for concurrent exports to overlap
+    time.sleep(0.05)
+    pdf_path = with_ext(docx_path, ".pdf")
+    shutil.copyfile(docx_path, pdf_path)
+    return pdf_path
+
+
+async def generate_concurrently(body, count):
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await asyncio.gather(*(client.post("/generate", json=body) for _ in range(count)))
+
+
+def test_concurrent_generates_on_one_upload():
+    handle = make_upload()
+    original = main.docx_to_pdf
+    main.docx_to_pdf = fake_docx_to_pdf
+    try:
+        responses = asyncio.run(generate_concurrently({"filename": handle, "sections": EDITS}, 8))
+        responses += asyncio.run(generate_concurrently({"filename": handle, "sections": EDITS, "export_pdf": True}, 8))
+    finally:
+        main.docx_to_pdf = original
+
+    assert [r.status_code for r in responses] == [200] * 16
+    bodies = [r.json() for r in responses]
+    # Same edits, same bytes: every request gets the same download
+    assert len({b["download_url"] for b in bodies}) == 1
+    assert len({b["pdf_download_url"] for b in bodies[8:]}) == 1
+    assert bodies[0]["download_url"].endswith("/cv_tailored.docx")
+    assert bodies[8]["pdf_download_url"].endswith("/cv_tailored.pdf")
+
+    tailored = Document(bodies[0]["pdf_path"])
+    assert "Built streaming data pipelines on Kafka." in [p.text for p in tailored.paragraphs]
+    # Nothing per-request is left in the session directory
+    session_dir = os.path.dirname(main.scratch.path(handle))
+    assert sorted(os.listdir(session_dir)) == ["cv.docx"]
+    print("SUCCESS: concurrent /generate calls on one upload don't share files")
+
+
+if __name__ == "__main__":
+    test_concurrent_generates_on_one_upload()
@@ -0,0 +1,132 @@
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+import openai
+
+from llm_client import LLMGateway
+
+
+class StubOpenAI(BaseHTTPRequestHandler):
+    """Minimal OpenAI-compatible /v1/chat/completions with scripted failures."""
+    protocol_version = "HTTP/1.1" # keep-alive, so connection reuse is visible
+    failures = []
+    delay = 0.0
+    requests = 0
+    connections = set()
+    active = 0
+    max_active = 0
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body: bytes, content_type="application/json", headers=()):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        cls = type(self)
+        with cls.lock:
+            cls.requests += 1
+            cls.connections.add(self.client_address)
+            cls.active += 1
+            cls.max_active = max(cls.max_active, cls.active)
+            status = cls.failures.pop(0) if cls.failures else 200
+        try:
+            time.sleep(cls.delay)
+            if status != 200:
+                error = {"error": {"message": "stub failure", "type": "server_error"}}
+                return self._send(status, json.dumps(error).encode(), headers=[("Retry-After", "0")])
+            base = {"id": "stub", "created": 0, "model": request["model"]}
+            if request.get("stream"):
+                events = [
+                    {**base, "object": "chat.completion.chunk", "choices": [{"index": 0, "delta": {"content": word}, "finish_reason": None}]}
+                    for word in ("Hello", " world")
+                ]
+                body = "".join(f"data: {json.dumps(e)}\n\n" for e in events) + "data: [DONE]\n\n"
+                return self._send(200, body.encode(), "text/event-stream")
+            reply = {**base, "object": "chat.completion", "choices": [
+                {"index": 0, "message": {"role": "assistant", "content": '{"ok": true}'}, "finish_reason": "stop"}
+            ]}
+            self._send(200, json.dumps(reply).encode())
+        finally:
+            with cls.lock:
+                cls.active -= 1
+
+
+def start_stub(failures=(), delay=0.0):
+    handler = type("Stub", (StubOpenAI,), {
+        "failures": list(failures), "delay": delay, "connections": set(), "lock": threading.Lock(),
+    })
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, handler, f"http://127.0.0.1:{server.server_port}/v1"
+
+
+def gateway(url, **kwargs):
+    return LLMGateway(base_url=url, api_key="test-key", backoff_base=0.01, **kwargs)
+
+
+def test_retries_with_backoff_on_one_pooled_connection():
+    server, stub, url = start_stub(failures=[429, 503])
+    llm = gateway(url)
+    response = llm.complete("gpt-4o", [{"role": "user", "content": "hi"}])
+    assert json.loads(response.choices[0].message.content) == {"ok": True}
+    # Two retries, and a second call reuses the kept-alive connection
+    llm.complete("gpt-4o", [{"role": "user", "content": "again"}])
+    server.shutdown()
+    assert stub.requests == 4 and llm.stats()["retries"] == 2
+    assert len(stub.connections) == 1
+    print("SUCCESS: 429/503 are retried and every call shares one kept-alive connection")
+
+
+def test_client_errors_are_not_retried():
+    server, stub, url = start_stub(failures=[400])
+    llm = gateway(url)
+    try:
+        llm.complete("gpt-4o", [{"role": "user", "content": "hi"}])
+        assert False, "expected BadRequestError"
+    except openai.BadRequestError:
+        pass
+    server.shutdown()
+    assert stub.requests == 1 and llm.stats()["failures"] == 1
+    print("SUCCESS: 400 fails immediately")
+
+
+def test_async_calls_respect_the_model_limit_and_stream():
+    server, stub, url = start_stub(delay=0.1)
+    os.environ["OPENAI_BASE_URL"] = url # The gateway reads it when no base_url is given
+    llm = LLMGateway(api_key="test-key", model_concurrency={"gpt-4o": 2})
+
+    async def run():
+        await asyncio.gather(*(llm.acomplete("gpt-4o", [{"role": "user", "content": str(i)}]) for i in range(6)))
+        return "".join([chunk.choices[0].delta.content async for chunk in llm.astream("gpt-4o", [{"role": "user", "content": "s"}])])
+
+    try:
+        text = asyncio.run(run())
+    finally:
+        del os.environ["OPENAI_BASE_URL"]
+        server.shutdown()
+    assert stub.max_active == 2
+    assert text == "Hello world"
+    assert llm.stats()["in_flight"] == {}
+    print("SUCCESS: at most two gpt-4o calls in flight, streaming works against the stub")
+
+
+if __name__ == "__main__":
+    test_retries_with_backoff_on_one_pooled_connection()
+    test_client_errors_are_not_retried()
+    test_async_calls_respect_the_model_limit_and_stream()
@@ -0,0 +1,106 @@
+import asyncio
+import json
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+import tailor
+from llm_client import llm
+from model_router import ModelRouter
+
+
+def reply(content, prompt_tokens=10, completion_tokens=5):
+    usage = SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))], usage=usage)
+
+
+class FakeGateway:
+    """Answers per model: the small one returns broken JSON, the large one a valid object."""
+    def __init__(self, answers):
+        self.answers = answers
+        self.calls = []
+
+    def complete(self, model, messages, **kwargs):
+        self.calls.append(model)
+        return reply(self.answers[model])
+
+    async def acomplete(self, model, messages, **kwargs):
+        return self.complete(model, messages, **kwargs)
+
+
+def test_tasks_route_and_fall_back_on_invalid_json():
+    gateway = FakeGateway({"small": '{"company": "Acme", "role": ', "large": '{"company": "Acme", "role": "Engineer"}'})
+    router = ModelRouter(gateway, task_models={"metadata": "small", "gap_analysis": "large"}, fallback_model="large")
+    assert router.model_for("metadata") == "small" and router.model_for("unknown task") == "large"
+
+    routed = router.complete("metadata", [{"role": "user", "content": "jd"}])
+    assert routed.data == {"company": "Acme", "role": "Engineer"}
+    assert routed.model == "large" and routed.fell_back
+    assert gateway.calls == ["small", "large"]
+
+    # Valid JSON that isn't an object counts as invalid output too
+    gateway.answers["small"] = '["Acme"]'
+    assert asyncio.run(router.acomplete("metadata", [])).fell_back
+
+    stats = router.stats()["tasks"]["metadata"]
+    assert stats["calls"] == 4 and stats["invalid_output"] == 2 and stats["fallbacks"] == 2
+    assert stats["models"] == {"small": 2, "large": 2}
+    assert stats["prompt_tokens"] == 40 and stats["completion_tokens"] == 20
+    assert stats["p50_ms"] >= 0
+    print("SUCCESS: invalid JSON from the small model is retried once on the fallback model")
+
+
+def test_no_fallback_from_the_fallback_model():
+    gateway = FakeGateway({"large": "not json"})
+    router = ModelRouter(gateway, task_models={"gap_analysis": "large"}, fallback_model="large")
+    try:
+        router.complete("gap_analysis", [])
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+    assert gateway.calls == ["large"]
+    assert router.stats()["tasks"]["gap_analysis"]["fallbacks"] == 0
+    print("SUCCESS: the fallback model's own invalid answers are not retried")
+
+
+def test_streamed_gap_analysis_falls_back():
+    analysis = {"company_name": "Acme Corp", "job_title": "Engineer", "sections": [
+        {"section_name": "Experience", "gaps": [], "suggestions": [], "edits": []},
+    ]}
+    models = []
+
+    async def fake_astream(model, messages, **kwargs):
+        models.append(model)
+        for piece in ('{"sections": [', '{"section_name": "Exp'):
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=piece))])
+
+    async def fake_acomplete(model, messages, **kwargs):
+        models.append(model)
+        return reply(json.dumps(analysis))
+
+    original = (llm.astream, llm.acomplete, dict(tailor.router.task_models))
+    llm.astream, llm.acomplete = fake_astream, fake_acomplete
+    tailor.router.task_models["gap_analysis"] = "gpt-4o-mini"
+    usage = {}
+
+    async def run():
+        return [event async for event in tailor._stream_gap_analysis("Resume", "JD", usage, None)]
+
+    try:
+        events = asyncio.run(run())
+    finally:
+        llm.astream, llm.acomplete = original[:2]
+        tailor.router.task_models = original[2]
+
+    assert models == ["gpt-4o-mini", tailor.router.fallback_model]
+    assert events[-1] == ("analysis", analysis)
+    assert usage["gap_analysis"]["model"] == tailor.router.fallback_model and usage["gap_analysis"]["fallback"]
+    print("SUCCESS: a truncated streamed analysis is redone on the fallback model")
+
+
+if __name__ == "__main__":
+    test_tasks_route_and_fall_back_on_invalid_json()
+    test_no_fallback_from_the_fallback_model()
+    test_streamed_gap_analysis_falls_back()
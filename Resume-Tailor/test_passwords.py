@@ -0,0 +1,42 @@
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from passwords import get_password_hash, hash_rounds, needs_rehash, verify_password
+from workers import PoolSaturatedError, WorkerPool
+
+
+def test_cost_factor_and_rehash():
+    old_hash = get_password_hash("Passw0rd!", rounds=4)
+    assert hash_rounds(old_hash) == 4
+    assert verify_password("Passw0rd!", old_hash)
+    assert not verify_password("wrong", old_hash)
+    assert not verify_password("Passw0rd!", "not-a-hash")
+
+    assert needs_rehash(old_hash, rounds=5)
+    new_hash = get_password_hash("Passw0rd!", rounds=5)
+    assert not needs_rehash(new_hash, rounds=5)
+    assert verify_password("Passw0rd!", new_hash)
+    print("SUCCESS: hashes with an outdated cost factor are flagged for rehashing")
+
+
+def test_bounded_hash_pool_rejects_overload():
+    pool = WorkerPool("hash", lambda: ThreadPoolExecutor(max_workers=1), max_workers=1, max_queue=1)
+
+    async def burst():
+        return await asyncio.gather(*(pool.run(time.sleep, 0.1) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(burst())
+    pool.shutdown()
+    assert sum(isinstance(r, PoolSaturatedError) for r in results) == 1
+    assert pool.stats()["rejected"] == 1
+    print("SUCCESS: hash pool runs one burst and rejects what doesn't fit in its queue")
+
+
+if __name__ == "__main__":
+    test_cost_factor_and_rehash()
+    test_bounded_hash_pool_rejects_overload()
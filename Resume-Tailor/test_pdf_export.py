@@ -0,0 +1,95 @@
+import os
+import shutil
+import sys
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+import pdf_export
+
+# Stands in for soffice --convert-to: writes a tiny PDF, or hangs for files named "hang"
+FAKE_SOFFICE = """#!{python}
+import pathlib, sys, time
+args = sys.argv[1:]
+src, out = args[-1], args[args.index("--outdir") + 1]
+if "hang" in src:
+    time.sleep(30)
+pathlib.Path(out, pathlib.Path(src).stem + ".pdf").write_bytes(b"%PDF-1.4 fake")
+"""
+
+
+def make_backend(workdir, **kwargs):
+    soffice = os.path.join(workdir, "soffice")
+    with open(soffice, "w") as f:
+        f.write(FAKE_SOFFICE.format(python=sys.executable))
+    os.chmod(soffice, 0o755)
+
+    pdf_export.SOFFICE_PROFILE_DIR = os.path.join(workdir, "profiles")
+    original = pdf_export.find_uno_python
+    pdf_export.find_uno_python = lambda soffice: None # force the CLI mode
+    try:
+        return pdf_export.LibreOfficeBackend(soffice, **kwargs)
+    finally:
+        pdf_export.find_uno_python = original
+
+
+def test_libreoffice_cli_export():
+    if os.name == "nt":
+        return
+    workdir = tempfile.mkdtemp()
+    try:
+        backend = make_backend(workdir, instances=2, timeout=2, queue_timeout=0.5)
+        docx_path = os.path.join(workdir, "resume.docx")
+        open(docx_path, "wb").close()
+
+        pdf_path = backend.export(docx_path, os.path.join(workdir, "resume.pdf"))
+        with open(pdf_path, "rb") as f:
+            assert f.read().startswith(b"%PDF")
+        assert backend.stats()["exports"] == 1
+        print("SUCCESS: LibreOffice backend exported a PDF")
+    finally:
+        shutil.rmtree(workdir)
+
+
+def test_export_timeout_and_busy_queue():
+    if os.name == "nt":
+        return
+    workdir = tempfile.mkdtemp()
+    try:
+        backend = make_backend(workdir, instances=1, timeout=1, queue_timeout=0.2)
+        hang_path = os.path.join(workdir, "hang.docx")
+        open(hang_path, "wb").close()
+
+        errors = []
+        def export():
+            try:
+                backend.export(hang_path, os.path.join(workdir, "hang.pdf"))
+            except pdf_export.PdfExportError as e:
+                errors.append(type(e))
+
+        threads = [threading.Thread(target=export) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sorted(e.__name__ for e in errors) == ["PdfExportBusy", "PdfExportTimeout"]
+        assert backend.stats()["timeouts"] == 1
+        print("SUCCESS: hung export timed out and the queue rejected the waiting request")
+    finally:
+        shutil.rmtree(workdir)
+
+
+def test_unavailable_backend():
+    try:
+        pdf_export.create_backend("none").export("resume.docx", "resume.pdf")
+        assert False, "expected PdfExportUnavailable"
+    except pdf_export.PdfExportUnavailable:
+        print("SUCCESS: disabled backend reports PDF export as unavailable")
+
+
+if __name__ == "__main__":
+    test_libreoffice_cli_export()
+    test_export_timeout_and_busy_queue()
+    test_unavailable_backend()
@@ -0,0 +1,74 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from prompt_budget import build_prompt, count_tokens, fit_lines, select_job_description
+
+MODEL = "gpt-4o"
+RESUME = """Jane Doe
+Senior Backend Engineer
+Built Python and FastAPI services on PostgreSQL and Kubernetes.
+Led a team of four engineers migrating batch jobs to Kafka streams."""
+
+JOB_DESCRIPTION = "\n".join([
+    "Senior Backend Engineer",
+    "Acme Corp, Berlin",
+    "About us: we are a fast-growing company with a vibrant culture and a dog-friendly office.",
+    "We offer great benefits, a competitive salary, paid time off and a 401k plan.",
+    "You must have 5+ years of experience with Python and PostgreSQL.",
+    "Experience running services on Kubernetes is required.",
+    "Our office has a ping pong table and free snacks on Fridays.",
+    "Knowledge of Kafka or other streaming platforms is a plus.",
+    "Acme is an equal opportunity employer and values diversity.",
+] + [f"Our mission statement paragraph number {i} talks about synergy and vision." for i in range(40)])
+
+
+def template(resume_text: str, job_description: str) -> str:
+    return f"Rate this resume.\nJOB DESCRIPTION:\n{job_description}\nRESUME:\n{resume_text}\n"
+
+
+def test_jd_keeps_requirements_in_order():
+    budget = 60
+    text, report = select_job_description(JOB_DESCRIPTION, RESUME, budget, MODEL)
+    assert count_tokens(text, MODEL) <= budget
+    lines = text.split("\n")
+    # Title/company pinned, requirements kept, boilerplate dropped
+    assert lines[:2] == ["Senior Backend Engineer", "Acme Corp, Berlin"]
+    assert "You must have 5+ years of experience with Python and PostgreSQL." in lines
+    assert "Experience running services on Kubernetes is required." in lines
+    assert not any("benefits" in line or "equal opportunity" in line for line in lines)
+    # Original posting order is preserved
+    assert lines.index("You must have 5+ years of experience with Python and PostgreSQL.") < lines.index("Experience running services on Kubernetes is required.")
+    assert report["sentences_kept"] < report["sentences_total"]
+    print("SUCCESS: long postings keep their requirements and drop boilerplate first")
+
+
+def test_short_inputs_pass_through_untouched():
+    prompt = build_prompt("test", template, RESUME, "Python developer, Berlin.", 1000, MODEL)
+    assert prompt.text == template(RESUME, "Python developer, Berlin.")
+    report = prompt.report
+    assert report["resume"] == report["resume_original"]
+    assert report["job_description"] == report["job_description_original"]
+    assert report["total"] == count_tokens(prompt.text, MODEL)
+    print("SUCCESS: prompts within budget are built exactly as before")
+
+
+def test_budget_is_shared_and_never_cuts_words():
+    long_resume = "\n".join(f"Delivered project {i} with Python, measurable impact and happy users." for i in range(200))
+    budget = 400
+    prompt = build_prompt("test", template, long_resume, JOB_DESCRIPTION, budget, MODEL)
+    report = prompt.report
+    assert report["total"] <= budget + 5 # a few joining newlines of slack
+    assert report["resume"] < report["resume_original"]
+    assert report["job_description"] > 0 # the JD keeps its minimum share
+    # Whole lines only
+    fitted, _ = fit_lines(long_resume, 100, MODEL)
+    assert all(line in long_resume.split("\n") for line in fitted.split("\n"))
+    print("SUCCESS: oversized inputs are trimmed by whole lines within the token budget")
+
+
+if __name__ == "__main__":
+    test_jd_keeps_requirements_in_order()
+    test_short_inputs_pass_through_untouched()
+    test_budget_is_shared_and_never_cuts_words()
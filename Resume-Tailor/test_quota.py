@@ -0,0 +1,113 @@
+import os
+import sys
+import tempfile
+from types import SimpleNamespace
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from sqlmodel import Session, SQLModel, create_engine, select, text
+
+from models import UsageLog, UsageDailyRollup
+from quota import count_anonymous_usage, ensure_indexes, rollup_and_prune, try_consume_anonymous
+
+
+def make_engine():
+    path = os.path.join(tempfile.mkdtemp(), "quota.db")
+    engine = create_engine(f"sqlite:///{path}")
+    SQLModel.metadata.create_all(engine)
+    ensure_indexes(engine)
+    return engine
+
+
+def test_anonymous_limit():
+    engine = make_engine()
+    with Session(engine) as session:
+        assert try_consume_anonymous(session, "1.1.1.1", limit=2)
+        assert try_consume_anonymous(session, "1.1.1.1", limit=2)
+        assert not try_consume_anonymous(session, "1.1.1.1", limit=2)
+        # Other IPs, logged-in rows and yesterday's rows don't count
+        assert try_consume_anonymous(session, "2.2.2.2", limit=2)
+        session.add(UsageLog(ip_address="3.3.3.3", user_id=7))
+        session.add(UsageLog(ip_address="3.3.3.3", created_at=datetime.now() - timedelta(days=1)))
+        session.commit()
+        assert count_anonymous_usage(session, "1.1.1.1") == 2
+        assert count_anonymous_usage(session, "3.3.3.3") == 0
+    print("SUCCESS: anonymous quota counts only today's anonymous rows per IP")
+
+
+def test_quota_count_uses_covering_index():
+    engine = make_engine()
+    with engine.connect() as conn:
+        plan = conn.execute(text(
+            "EXPLAIN QUERY PLAN SELECT count(*) FROM usagelog "
+            "WHERE ip_address = '1.1.1.1' AND user_id IS NULL AND created_at >= '2024-01-01'"
+        )).all()
+    detail = " ".join(str(row[-1]) for row in plan)
+    assert "COVERING INDEX ix_usagelog_quota" in detail, detail
+    print("SUCCESS: quota count is answered from the covering index")
+
+
+def test_rollup_and_prune():
+    engine = make_engine()
+    old = datetime.now() - timedelta(days=45)
+    with Session(engine) as session:
+        for _ in range(3):
+            session.add(UsageLog(ip_address="1.1.1.1", created_at=old))
+        session.add(UsageLog(ip_address="1.1.1.1", user_id=5, action="generate", created_at=old))
+        session.add(UsageLog(ip_address="1.1.1.1"))
+        session.commit()
+
+        result = rollup_and_prune(session, retention_days=30)
+        assert result["pruned_rows"] == 4
+        assert len(session.exec(select(UsageLog)).all()) == 1
+
+        rollups = {(r.user_id, r.action): r for r in session.exec(select(UsageDailyRollup)).all()}
+        assert rollups[(None, "tailor")].count == 3
+        assert rollups[(None, "tailor")].day == old.strftime("%Y-%m-%d")
+        assert rollups[(5, "generate")].count == 1
+
+        # Nothing left to fold on the next run
+        assert rollup_and_prune(session, retention_days=30)["pruned_rows"] == 0
+    print("SUCCESS: old usage rows are rolled up into daily totals and pruned")
+
+
+class RecordingPostgresSession:
+    """Stands in for a PostgreSQL session: records statements, the rollup lock is taken elsewhere."""
+    def __init__(self):
+        self.statements = []
+        self.rolled_back = False
+
+    def get_bind(self):
+        return SimpleNamespace(dialect=SimpleNamespace(name="postgresql"))
+
+    def execute(self, statement, params=None):
+        self.statements.append(str(statement))
+        return SimpleNamespace(rowcount=1, scalar=lambda: False)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        self.rolled_back = True
+
+
+def test_postgres_takes_advisory_locks():
+    session = RecordingPostgresSession()
+    try_consume_anonymous(session, "1.1.1.1")
+    # The per-IP lock comes before the guarded insert
+    assert "pg_advisory_xact_lock" in session.statements[0]
+    assert session.statements[1].startswith("INSERT INTO usagelog")
+
+    session = RecordingPostgresSession()
+    result = rollup_and_prune(session)
+    assert result["skipped"] and session.rolled_back
+    assert len(session.statements) == 1 and "pg_try_advisory_xact_lock" in session.statements[0]
+    print("SUCCESS: on PostgreSQL the quota insert and the rollup run under advisory locks")
+
+
+if __name__ == "__main__":
+    test_anonymous_limit()
+    test_quota_count_uses_covering_index()
+    test_rollup_and_prune()
+    test_postgres_takes_advisory_locks()
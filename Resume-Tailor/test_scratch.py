@@ -0,0 +1,109 @@
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from scratch import ACTIVE_GRACE_SECONDS, ScratchStore, safe_filename, with_ext
+
+
+def fill(store: ScratchStore, name: str, size: int, age_seconds: float = 0) -> str:
+    handle = store.new_handle(name)
+    with open(store.path(handle), "wb") as f:
+        f.write(b"x" * size)
+    with open(store.path(handle, ".docx"), "wb") as f:
+        f.write(b"y" * size)
+    then = time.time() - age_seconds
+    os.utime(os.path.dirname(store.path(handle)), (then, then))
+    return handle
+
+
+def test_handles_and_paths():
+    store = ScratchStore(root=tempfile.mkdtemp(), ttl_seconds=3600, max_bytes=10**9)
+    assert safe_filename("../../etc/My CV.PDF") == "My CV.pdf"
+    assert safe_filename("") == "resume.pdf"
+
+    handle = fill(store, "../My CV.PDF", 10)
+    assert "/" not in handle and handle.endswith("_My CV.pdf")
+    pdf_path = store.resolve(handle)
+    assert pdf_path and store.resolve(handle, ".docx").endswith("My CV.docx")
+    assert store.handle_for(pdf_path) == handle
+    # Foreign or traversal handles never resolve
+    assert store.resolve("../../etc/passwd") is None
+    assert store.resolve("temp_1234_cv.pdf") is None
+    store.remove(handle)
+    assert store.resolve(handle) is None
+    print("SUCCESS: scratch handles map to sharded session directories and nothing else")
+
+
+def test_sibling_paths_with_dotted_stems():
+    store = ScratchStore(root=tempfile.mkdtemp(), ttl_seconds=3600, max_bytes=10**9)
+    handle = store.new_handle("cv.pdf-final.pdf")
+    # Where conversion writes the DOCX is where /generate looks for it
+    assert with_ext(store.path(handle), ".docx") == store.path(handle, ".docx")
+    assert store.path(handle, ".docx").endswith("cv.pdf-final.docx")
+    assert with_ext("cv.docx-final.docx", "_tailored.docx") == "cv.docx-final_tailored.docx"
+    print("SUCCESS: only the last extension of a handle is swapped")
+
+
+def test_temp_paths_are_unique_per_call():
+    store = ScratchStore(root=tempfile.mkdtemp(), ttl_seconds=3600, max_bytes=10**9)
+    docx_path = store.path(store.new_handle("cv.pdf"), ".docx")
+    paths = {store.temp_path(docx_path, "_tailored.docx") for _ in range(20)}
+    assert len(paths) == 20
+    for path in paths:
+        assert os.path.dirname(path) == os.path.dirname(docx_path) and os.path.exists(path)
+        assert os.path.basename(path).startswith("cv_") and path.endswith("_tailored.docx")
+    print("SUCCESS: per-request outputs next to a session file never share a name")
+
+
+def test_ttl_and_lru_eviction():
+    store = ScratchStore(root=tempfile.mkdtemp(), ttl_seconds=3600, max_bytes=3000)
+    expired = fill(store, "expired.pdf", 100, age_seconds=7200)
+    oldest = fill(store, "oldest.pdf", 500, age_seconds=3000)
+    older = fill(store, "older.pdf", 500, age_seconds=2000)
+    recent = fill(store, "recent.pdf", 500, age_seconds=1000)
+    active = fill(store, "active.pdf", 500, age_seconds=10)
+
+    # Using a session makes it the most recently used
+    assert store.resolve(oldest)
+    result = store.collect()
+    assert result["expired"] == 1 and result["evicted"] == 1
+    assert store.resolve(expired) is None and store.resolve(older) is None
+    assert store.resolve(oldest) and store.resolve(recent) and store.resolve(active)
+    assert result["bytes_in_use"] == 3000 # 2 files of 500 bytes per session
+    print("SUCCESS: idle sessions expire and the least recently used go first over the size cap")
+
+
+def test_active_sessions_survive_the_cap():
+    store = ScratchStore(root=tempfile.mkdtemp(), ttl_seconds=3600, max_bytes=0)
+    busy = fill(store, "busy.pdf", 100, age_seconds=ACTIVE_GRACE_SECONDS / 2)
+    assert store.collect()["evicted"] == 0
+    assert store.resolve(busy)
+    print("SUCCESS: sessions in active use are never evicted")
+
+
+def test_legacy_temp_files_are_swept():
+    legacy_dir = tempfile.mkdtemp()
+    old = os.path.join(legacy_dir, "temp_abcd1234_cv.pdf")
+    new = os.path.join(legacy_dir, "temp_efgh5678_cv.pdf")
+    keep = os.path.join(legacy_dir, "applications.db")
+    for path in (old, new, keep):
+        open(path, "wb").close()
+    os.utime(old, (time.time() - 7200, time.time() - 7200))
+    os.utime(keep, (time.time() - 7200, time.time() - 7200))
+
+    store = ScratchStore(root=tempfile.mkdtemp(), ttl_seconds=3600, max_bytes=10**9)
+    store.collect(legacy_dir=legacy_dir)
+    assert sorted(os.listdir(legacy_dir)) == ["applications.db", "temp_efgh5678_cv.pdf"]
+    print("SUCCESS: expired temp_* files in the working directory are removed")
+
+
+if __name__ == "__main__":
+    test_handles_and_paths()
+    test_sibling_paths_with_dotted_stems()
+    test_temp_paths_are_unique_per_call()
+    test_ttl_and_lru_eviction()
+    test_active_sessions_survive_the_cap()
+    test_legacy_temp_files_are_swept()
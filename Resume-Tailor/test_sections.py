@@ -0,0 +1,109 @@
+import asyncio
+import json
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+import tailor
+from llm_client import llm
+from sections import split_sections
+
+RESUME = """Jane Doe
+jane@example.com | +1 555 123 4567
+Backend engineer with eight years of experience building Python services for fintech clients.
+EXPERIENCE
+Acme Corp, Senior Engineer (2019-2024)
+Built payment services in Python and Go handling three thousand requests per second.
+Skills:
+Languages:
+Python, Go, SQL, TypeScript, Bash and some Rust for performance critical command line tooling.
+Tools:
+Docker
+EDUCATION
+CERTIFICATIONS
+BSc Computer Science, University of Somewhere, with honours in distributed systems and networks.
+AWS SA
+PROJECTS
+Resume Tailor, a FastAPI and Next.js application that tailors resumes to job descriptions."""
+
+
+def test_split_sections_finds_headers():
+    sections = split_sections(RESUME)
+    assert [s.name for s in sections] == ["", "EXPERIENCE", "Skills / Languages", "EDUCATION / CERTIFICATIONS", "PROJECTS"]
+    assert [s.section_type for s in sections] == ["Summary", "Experience", "Skills", "Education", "Projects"]
+    # Sub-labels stay inside Skills, acronym lines aren't headers, header lines are kept for edits
+    assert "Tools:\nDocker" in sections[2].text
+    assert sections[3].text.endswith("AWS SA")
+    assert sections[1].text.startswith("EXPERIENCE\n")
+    assert "\n".join(s.text for s in sections) == RESUME
+    print("SUCCESS: resume text splits into its sections locally")
+
+
+def test_section_mode_fans_out_and_merges_in_order():
+    calls = {"active": 0, "max_active": 0}
+
+    async def fake_acomplete(model, messages, **kwargs):
+        prompt = messages[0]["content"]
+        calls["active"] += 1
+        calls["max_active"] = max(calls["max_active"], calls["active"])
+        try:
+            if "ATS Specialist" in prompt:
+                return reply({"initial_score": 40, "projected_score": 70, "reasoning": "ok"})
+            name = prompt.split('Resume Section "')[1].split('"')[0] if 'Resume Section "' in prompt else ""
+            # Earlier sections answer last, so completion order differs from document order
+            await asyncio.sleep({"": 0.2, "EXPERIENCE": 0.15, "Skills / Languages": 0.1}.get(name, 0.05))
+            if name == "PROJECTS":
+                return reply_text("not json")
+            return reply({
+                "company_name": "Unknown" if name else "Acme Corp",
+                "job_title": "Backend Engineer",
+                "section": {"section_name": name or "Professional Summary", "gaps": [], "suggestions": [], "edits": []},
+            })
+        finally:
+            calls["active"] -= 1
+
+    def reply(data):
+        return reply_text(json.dumps(data))
+
+    def reply_text(text):
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))], usage=None)
+
+    original = (llm.acomplete, tailor.extract_text_from_docx, tailor.ANALYSIS_MODE, tailor.SECTION_CONCURRENCY, tailor.SCORING_MODE)
+    llm.acomplete = fake_acomplete
+    tailor.extract_text_from_docx = lambda path: RESUME
+    tailor.ANALYSIS_MODE, tailor.SECTION_CONCURRENCY, tailor.SCORING_MODE = "sections", 3, "llm"
+    try:
+        started = time.perf_counter()
+        result = asyncio.run(tailor.analyze_gaps_async("resume.docx", "Backend Engineer at Acme Corp. Python required."))
+        elapsed = time.perf_counter() - started
+        streamed = asyncio.run(collect_stream())
+    finally:
+        llm.acomplete, tailor.extract_text_from_docx, tailor.ANALYSIS_MODE, tailor.SECTION_CONCURRENCY, tailor.SCORING_MODE = original
+
+    names = [s["section_name"] for s in result["sections"]]
+    # Document order, the unparseable PROJECTS answer dropped
+    assert names == ["Professional Summary", "EXPERIENCE", "Skills / Languages", "EDUCATION / CERTIFICATIONS"]
+    assert result["company_name"] == "Acme Corp" and result["initial_score"] == 40
+    assert "section:EXPERIENCE" in result["token_usage"]
+    # Three section calls plus the initial score may overlap, never more
+    assert calls["max_active"] <= 4
+    assert elapsed < 0.45 # well below the 0.55 s the section calls add up to
+    # The stream reports each section as it finishes, fastest first
+    assert streamed[0] != "Professional Summary" and sorted(streamed) == sorted(names)
+    print("SUCCESS: sections are analyzed concurrently and merged back in document order")
+
+
+async def collect_stream():
+    events = []
+    async for event, data in tailor.analyze_gaps_stream("resume.docx", "Backend Engineer at Acme Corp."):
+        if event == "section":
+            events.append(data["section_name"])
+    return events
+
+
+if __name__ == "__main__":
+    test_split_sections_finds_headers()
+    test_section_mode_fans_out_and_merges_in_order()
@@ -0,0 +1,37 @@
+import os
+import sys
+import json
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from stream_parser import SectionStreamParser
+
+def test_sections_emitted_incrementally():
+    analysis = {
+        "initial_score": 40,
+        "sections": [
+            {"section_name": "Summary", "gaps": ["[Kubernetes]"], "suggestions": ["Use \"metrics\" {here}"], "edits": []},
+            {"section_name": "Skills", "gaps": [], "suggestions": [], "edits": [{"target_text": "a]b}", "new_content": "x"}]}
+        ],
+        "company_name": "Acme",
+        "other": [{"section_name": "not a section"}]
+    }
+    raw = json.dumps(analysis, indent=2)
+    parser = SectionStreamParser()
+
+    emitted = []
+    first_section_at = None
+    for i in range(0, len(raw), 5):
+        for section in parser.feed(raw[i:i + 5]):
+            emitted.append(section)
+            if first_section_at is None:
+                first_section_at = i
+
+    assert emitted == analysis["sections"]
+    # The first section is available long before the document is complete
+    assert first_section_at < raw.index('"Skills"')
+    assert parser.text == raw
+    print("SUCCESS: Sections are emitted as soon as they close.")
+
+if __name__ == "__main__":
+    test_sections_emitted_incrementally()
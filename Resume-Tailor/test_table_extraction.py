@@ -1,6 +1,9 @@
 from docx import Document
-from backend.tailor import extract_text_from_docx
+import sys
 import os
+# backend modules import each other as top-level modules (run from backend/)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+from backend.tailor import extract_text_from_docx
 
 def test_table_extraction():
     # Setup: Create a docx with a table
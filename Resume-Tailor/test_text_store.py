@@ -0,0 +1,119 @@
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from sqlalchemy import update
+from sqlmodel import Session, SQLModel, create_engine, select, text
+
+from models import SavedResume, TextBlob
+from text_store import TEXT_ORPHAN_GRACE_MINUTES, ensure_columns, load_resume_payload, migrate_inline_payloads, prune_orphan_texts, put_text, store_resume_payload
+
+ORIGINAL = "John Doe\nSenior Python Engineer\n" + "Built data pipelines and APIs. " * 400
+
+
+def make_engine():
+    path = os.path.join(tempfile.mkdtemp(), "texts.db")
+    engine = create_engine(f"sqlite:///{path}")
+    SQLModel.metadata.create_all(engine)
+    return engine
+
+
+def test_payloads_are_deduplicated_and_compressed():
+    engine = make_engine()
+    with Session(engine) as session:
+        for i in range(3):
+            resume = SavedResume(user_id=1, filename=f"r{i}.pdf")
+            store_resume_payload(session, resume, f"Tailored {i}", [{"section_name": "Summary"}], original_text=ORIGINAL)
+        session.commit()
+
+        resumes = session.exec(select(SavedResume)).all()
+        assert len({r.original_text_digest for r in resumes}) == 1
+        assert all(r.original_text == "" and r.tailored_text == "" for r in resumes)
+        # one original, three tailored texts, one shared sections JSON
+        blobs = session.exec(select(TextBlob)).all()
+        assert len(blobs) == 5
+        original_blob = session.get(TextBlob, resumes[0].original_text_digest)
+        assert len(original_blob.data) < original_blob.size / 10
+
+        payload = load_resume_payload(session, resumes[2])
+        assert payload["original_text"] == ORIGINAL
+        assert payload["tailored_text"] == "Tailored 2"
+        assert payload["tailored_sections"] == [{"section_name": "Summary"}]
+    print("SUCCESS: identical resume texts are stored once, compressed")
+
+
+def test_legacy_rows_are_migrated():
+    path = os.path.join(tempfile.mkdtemp(), "legacy.db")
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as conn:
+        # savedresume as created before the blob split
+        conn.execute(text(
+            "CREATE TABLE savedresume (id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, filename VARCHAR NOT NULL, "
+            "original_text VARCHAR NOT NULL, tailored_text VARCHAR NOT NULL, tailored_sections_json VARCHAR NOT NULL, "
+            "initial_score INTEGER NOT NULL, projected_score INTEGER NOT NULL, created_at DATETIME NOT NULL)"
+        ))
+        conn.execute(text(
+            "INSERT INTO savedresume VALUES (1, 1, 'old.pdf', :original, 'Old tailored', '[{\"a\": 1}]', 40, 80, '2024-01-01 00:00:00')"
+        ), {"original": ORIGINAL})
+    SQLModel.metadata.create_all(engine)
+    ensure_columns(engine)
+
+    assert migrate_inline_payloads(engine) == 1
+    assert migrate_inline_payloads(engine) == 0
+    with Session(engine) as session:
+        resume = session.get(SavedResume, 1)
+        assert resume.original_text == "" and resume.tailored_text_digest
+        payload = load_resume_payload(session, resume)
+        assert payload["original_text"] == ORIGINAL
+        assert payload["tailored_sections"] == [{"a": 1}]
+    print("SUCCESS: inline texts of existing saved resumes move into the blob table")
+
+
+def test_orphan_texts_are_pruned():
+    engine = make_engine()
+    with Session(engine) as session:
+        resume = SavedResume(user_id=1, filename="r.pdf")
+        store_resume_payload(session, resume, "First draft", [], original_text=ORIGINAL)
+        session.commit()
+        store_resume_payload(session, resume, "Second draft", [])
+        session.commit()
+
+        # Still inside the grace period
+        assert prune_orphan_texts(session) == 0
+        later = datetime.now() + timedelta(minutes=TEXT_ORPHAN_GRACE_MINUTES + 1)
+        assert prune_orphan_texts(session, now=later) == 1
+        assert load_resume_payload(session, resume)["tailored_text"] == "Second draft"
+        assert len(session.exec(select(TextBlob)).all()) == 3
+    print("SUCCESS: texts replaced by an edit are pruned")
+
+
+def test_reused_orphan_survives_prune():
+    engine = make_engine()
+    with Session(engine) as session:
+        resume = SavedResume(user_id=1, filename="r.pdf")
+        store_resume_payload(session, resume, "First draft", [], original_text=ORIGINAL)
+        session.commit()
+        store_resume_payload(session, resume, "Second draft", [])
+        session.commit()
+        old = datetime.now() - timedelta(minutes=TEXT_ORPHAN_GRACE_MINUTES + 1)
+        session.execute(update(TextBlob).values(created_at=old))
+        session.commit()
+
+        # A save reuses the orphaned "First draft" blob and the pruner runs before the resume points at it
+        first_digest = put_text(session, "First draft")
+        assert prune_orphan_texts(session) == 0
+        resume.tailored_text_digest = first_digest
+        session.add(resume)
+        session.commit()
+        assert load_resume_payload(session, resume)["tailored_text"] == "First draft"
+    print("SUCCESS: a blob reused by an uncommitted save is not pruned")
+
+
+if __name__ == "__main__":
+    test_payloads_are_deduplicated_and_compressed()
+    test_legacy_rows_are_migrated()
+    test_orphan_texts_are_pruned()
+    test_reused_orphan_survives_prune()
@@ -0,0 +1,102 @@
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from sqlmodel import Session, SQLModel, create_engine, select, text
+
+from models import Application
+from downloads import etag_matches
+from tracker import InvalidCursor, build_page, build_page_query, decode_cursor, page_digest
+
+
+def make_session():
+    path = os.path.join(tempfile.mkdtemp(), "tracker.db")
+    engine = create_engine(f"sqlite:///{path}")
+    SQLModel.metadata.create_all(engine)
+    session = Session(engine)
+    start = datetime(2024, 1, 1)
+    for i in range(25):
+        session.add(Application(
+            user_id=1,
+            company_name=f"Company {i % 5}",
+            job_role="Engineer",
+            # Pairs of identical dates make sure ties are broken by id
+            date_applied=start + timedelta(days=i // 2),
+            status="Interview" if i % 3 == 0 else "Applied",
+            job_description="x" * 5000,
+        ))
+    session.add(Application(user_id=2, company_name="Other user", job_role="Engineer"))
+    session.commit()
+    return session
+
+
+def fetch_all(session, sort, limit, **filters):
+    ids, cursor, pages = [], None, 0
+    while True:
+        rows = session.exec(build_page_query(1, sort, limit, cursor, **filters)).all()
+        page = build_page(rows, sort, limit)
+        ids += [item["id"] for item in page["items"]]
+        pages += 1
+        cursor = page["next_cursor"]
+        if not cursor:
+            return ids, pages, page
+
+
+def test_keyset_pages_cover_every_row_once():
+    session = make_session()
+    for sort in ("date_desc", "date_asc", "company"):
+        ids, pages, last_page = fetch_all(session, sort, 7)
+        assert len(ids) == 25 and len(set(ids)) == 25, sort
+        assert pages == 4
+    ids, _, _ = fetch_all(session, "date_desc", 7)
+    own = session.exec(select(Application).where(Application.user_id == 1)).all()
+    expected = [a.id for a in sorted(own, key=lambda a: (a.date_applied, a.id), reverse=True)]
+    assert ids == expected
+    assert "job_description" not in last_page["items"][0]
+    assert last_page["items"][0]["has_job_description"]
+    print("SUCCESS: cursor pages return every application exactly once, in order, without job descriptions")
+
+
+def test_filters():
+    session = make_session()
+    ids, _, _ = fetch_all(session, "date_desc", 50, status="Interview")
+    assert len(ids) == 9
+    ids, _, _ = fetch_all(session, "company", 50, company="company 3")
+    assert len(ids) == 5
+    ids, _, _ = fetch_all(session, "company", 50, company="%")
+    assert ids == []
+    print("SUCCESS: status and company filters narrow the page")
+
+
+def test_list_query_uses_index():
+    session = make_session()
+    query = build_page_query(1, "date_desc", 50)
+    compiled = query.compile(session.get_bind(), compile_kwargs={"literal_binds": True})
+    plan = " ".join(str(row[-1]) for row in session.connection().execute(text(f"EXPLAIN QUERY PLAN {compiled}")).all())
+    assert "ix_application_user_date" in plan and "TEMP B-TREE" not in plan, plan
+    print("SUCCESS: date-sorted pages are read straight from the index, without a sort step")
+
+
+def test_bad_cursor_and_etag():
+    try:
+        decode_cursor("date_desc", "not-a-cursor")
+        assert False, "expected InvalidCursor"
+    except InvalidCursor:
+        pass
+    assert page_digest(b"[]") == page_digest(b"[]")
+    assert page_digest(b"[]") != page_digest(b"[1]")
+    # The page ETag is weak and If-None-Match is matched per tag, not as a substring
+    digest = page_digest(b"[]")
+    assert etag_matches(f'W/"{digest}"', digest)
+    assert not etag_matches(f'W/"{digest}0", "other"', digest)
+    print("SUCCESS: malformed cursors are rejected and ETags follow the page content")
+
+
+if __name__ == "__main__":
+    test_keyset_pages_cover_every_row_once()
+    test_filters()
+    test_list_query_uses_index()
+    test_bad_cursor_and_etag()
@@ -0,0 +1,104 @@
+import asyncio
+import hashlib
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from starlette.requests import Request
+
+from uploads import UnsupportedUpload, UploadTooLarge, receive_upload
+
+BOUNDARY = "----resume-test"
+
+
+def multipart_body(pdf: bytes, job_description: str = "Python developer") -> bytes:
+    return (
+        f"--{BOUNDARY}\r\n"
+        'Content-Disposition: form-data; name="job_description"\r\n\r\n'
+        f"{job_description}\r\n"
+        f"--{BOUNDARY}\r\n"
+        'Content-Disposition: form-data; name="resume"; filename="My CV.pdf"\r\n'
+        "Content-Type: application/pdf\r\n\r\n"
+    ).encode() + pdf + f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+def streaming_request(body: bytes, piece: int = 4096, content_length: bool = True):
+    """A Request whose body arrives in pieces; `sent` counts how many were read."""
+    pieces = [body[i:i + piece] for i in range(0, len(body), piece)]
+    sent = []
+
+    async def receive():
+        sent.append(1)
+        more = len(sent) < len(pieces)
+        return {"type": "http.request", "body": pieces[len(sent) - 1], "more_body": more}
+
+    headers = [(b"content-type", f"multipart/form-data; boundary={BOUNDARY}".encode())]
+    if content_length:
+        headers.append((b"content-length", str(len(body)).encode()))
+    scope = {"type": "http", "method": "POST", "path": "/analyze", "headers": headers}
+    return Request(scope, receive), sent, len(pieces)
+
+
+def run_upload(request, workdir, **kwargs):
+    return asyncio.run(receive_upload(request, "resume", lambda name: os.path.join(workdir, name), **kwargs))
+
+
+def test_upload_is_streamed_to_disk_and_hashed():
+    workdir = tempfile.mkdtemp()
+    pdf = b"%PDF-1.7\n" + os.urandom(600 * 1024)
+    request, sent, pieces = streaming_request(multipart_body(pdf))
+
+    upload = run_upload(request, workdir)
+    assert upload.fields == {"job_description": "Python developer"}
+    assert upload.filename == "My CV.pdf" and upload.size == len(pdf)
+    assert upload.digest == hashlib.sha256(pdf).hexdigest()
+    with open(upload.path, "rb") as f:
+        assert f.read() == pdf
+    assert len(sent) == pieces
+    print("SUCCESS: upload written to disk in chunks with its sha256 computed on the way")
+
+
+def test_non_pdf_is_rejected_from_its_first_bytes():
+    workdir = tempfile.mkdtemp()
+    request, sent, pieces = streaming_request(multipart_body(b"MZ\x90\x00" + b"\x00" * 200_000))
+    try:
+        run_upload(request, workdir)
+        assert False, "expected UnsupportedUpload"
+    except UnsupportedUpload:
+        pass
+    # Stopped after the first pieces, and the partial file is gone
+    assert len(sent) < pieces // 10
+    assert os.listdir(workdir) == []
+    print("SUCCESS: non-PDF uploads are refused before the rest of the body is read")
+
+
+def test_size_limit_before_and_during_the_body():
+    workdir = tempfile.mkdtemp()
+    body = multipart_body(b"%PDF-1.4\n" + b"0" * 1_300_000)
+
+    request, sent, _ = streaming_request(body)
+    try:
+        run_upload(request, workdir, max_bytes=100_000)
+        assert False, "expected UploadTooLarge"
+    except UploadTooLarge:
+        pass
+    assert sent == [] # Content-Length alone was enough
+
+    # Without Content-Length the bytes are counted as they arrive
+    request, sent, pieces = streaming_request(body, content_length=False)
+    try:
+        run_upload(request, workdir, max_bytes=100_000)
+        assert False, "expected UploadTooLarge"
+    except UploadTooLarge:
+        pass
+    assert len(sent) < pieces
+    assert os.listdir(workdir) == []
+    print("SUCCESS: oversized uploads are cut off without buffering them")
+
+
+if __name__ == "__main__":
+    test_upload_is_streamed_to_disk_and_hashed()
+    test_non_pdf_is_rejected_from_its_first_bytes()
+    test_size_limit_before_and_during_the_body()
@@ -11,16 +11,14 @@ from tailor import analyze_gaps
 
 class TestTailorAnalysis(unittest.TestCase):
 
-    @patch('tailor.openai.OpenAI')
+    @patch('tailor.SCORING_MODE', 'llm')
+    @patch('llm_client.llm.complete')
     @patch('tailor.extract_text_from_docx')
-    def test_analyze_gaps_with_suggestions(self, mock_extract, mock_openai_class):
+    def test_analyze_gaps_with_suggestions(self, mock_extract, mock_complete):
         # Mock DOCX text extraction
         mock_extract.return_value = "Sample Resume Content"
 
-        # Mock OpenAI Response
-        mock_client = MagicMock()
-        mock_openai_class.return_value = mock_client
-        
+        # Mock the shared LLM gateway
         # We need two responses: one for analyze_gaps (sections) and one for calculate_scores
         
         # 1. Mock Analysis Response
@@ -65,7 +63,7 @@ class TestTailorAnalysis(unittest.TestCase):
         mock_response_2.choices = [MagicMock(message=MagicMock(content=json.dumps(score_json)))]
 
         # Determine which call returns what. This is tricky with simple side_effect if args differ, but side_effect iterator works.
-        mock_client.chat.completions.create.side_effect = [mock_response_1, mock_response_2]
+        mock_complete.side_effect = [mock_response_1, mock_response_2]
 
         # ACT
         result = analyze_gaps("dummy.docx", "Job Description Here")